@@ -0,0 +1,367 @@
+# cache - persistent cache of parsed RDF/XML
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""Keep parsed graphs on disk, keyed by a hash of the parsed content,
+so unchanged documents don't have to be parsed again.
+
+A cache hit rebuilds a read-only model (see parser.ReadOnlyParser)
+without parsing any XML.
+"""
+
+import sys
+import os
+import collections
+import hashlib
+import marshal
+import tempfile
+import zlib
+
+from . import model, parser
+
+# The package has no version number of its own, so this is the
+# library version as far as the cache is concerned.  Bump it whenever
+# the parser or the serialised format changes in a way that makes old
+# cache entries invalid.
+FORMAT_VERSION = 1
+
+# marshal output is specific to the Python version
+_KEY_PREFIX = 'RDFMetadata-cache-{0}-py{1}.{2}\n'.format(
+    FORMAT_VERSION, sys.version_info[0], sys.version_info[1]).encode('ascii')
+
+_SUFFIX = '.cache'
+
+# What reading a damaged entry can raise
+_ENTRY_ERRORS = (zlib.error, ValueError, EOFError, TypeError,
+                 IndexError, KeyError)
+
+_READ_SIZE = 64 * 1024
+
+# Node kinds in the serialised form
+_RESOURCE = 0
+_EXTERNAL_BLANK = 1
+_INTERNAL_BLANK = 2
+
+
+class ParseCache(object):
+    """A size-bounded on-disk cache of parsed graphs.
+
+    Each entry is a list of (name, model.Root) pairs, typically one
+    for each rdf:RDF element in a file.  The names can be anything
+    that marshal supports, or None.
+
+    When the total size of the entries exceeds max_bytes, the least
+    recently used entries are removed.
+
+    Statistics:
+
+    - hits: number of get() calls that found an entry
+    - misses: number of get() calls that didn't
+    - evictions: number of entries removed to stay below max_bytes
+    """
+
+    def __init__(self, directory, max_bytes = 64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        # Entries in least recently used order, mapping key to size
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._scan()
+
+
+    def _scan(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(_SUFFIX):
+                try:
+                    st = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                files.append((st.st_mtime, name[:-len(_SUFFIX)], st.st_size))
+
+        files.sort()
+        for mtime, key, size in files:
+            self._entries[key] = size
+            self._size += size
+
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _SUFFIX)
+
+
+    @staticmethod
+    def content_key(data):
+        """Return a cache key for the raw bytes of a document."""
+        return hashlib.sha1(_KEY_PREFIX + data).hexdigest()
+
+
+    @staticmethod
+    def file_key(f):
+        """Return the content_key() of the data read from the binary
+        file f, without reading all of it into memory.
+        """
+        h = ParseCache.content_hash()
+        for data in iter(lambda: f.read(_READ_SIZE), b''):
+            h.update(data)
+        return h.hexdigest()
+
+
+    @staticmethod
+    def content_hash():
+        """Return a hash object which gives the content_key() of the
+        data it is updated with as hexdigest().
+        """
+        return hashlib.sha1(_KEY_PREFIX)
+
+
+    @staticmethod
+    def element_key(element):
+        """Return a cache key for the XML of a DOM element, typically
+        an rdf:RDF element.
+        """
+        return ParseCache.content_key(element.toxml().encode('utf-8'))
+
+
+    def get(self, key):
+        """Return the list of (name, model.Root) pairs stored for key,
+        or None if there is no such entry.  Damaged entries are removed
+        and treated as missing.
+        """
+
+        if key not in self._entries:
+            self.misses += 1
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            # Mark as recently used, both here and for other processes
+            os.utime(path, None)
+        except (IOError, OSError):
+            self._forget(key)
+            self.misses += 1
+            return None
+
+        try:
+            roots = [(name, deserialize(graph))
+                     for name, graph in marshal.loads(zlib.decompress(data))]
+        except _ENTRY_ERRORS:
+            self._forget(key)
+            _remove_file(path)
+            self.misses += 1
+            return None
+
+        self._entries[key] = self._entries.pop(key)
+        self.hits += 1
+        return roots
+
+
+    def put(self, key, roots):
+        """Store a list of (name, model.Root) pairs for key, evicting old
+        entries if necessary.
+        """
+
+        data = zlib.compress(marshal.dumps(
+                [(name, serialize(root)) for name, root in roots]))
+
+        # Write atomically, so other processes never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir = self.directory, suffix = '.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.rename(tmp_path, self._path(key))
+        except Exception:
+            _remove_file(tmp_path)
+            raise
+
+        self._forget(key)
+        self._entries[key] = len(data)
+        self._size += len(data)
+
+        self._evict()
+
+
+    def parse_element(self, doc, root_element, strict = True):
+        """Return a read-only model.Root for root_element, from the cache
+        if possible.  Otherwise the element is parsed and the result
+        added to the cache.
+        """
+
+        key = self.element_key(root_element)
+        entry = self.get(key)
+        if entry is not None:
+            return entry[0][1]
+
+        root = parser.parse_RDFXML(doc, root_element, strict = strict,
+                                   read_only = True)
+        self.put(key, [(None, root)])
+        return root
+
+
+    def _forget(self, key):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last = False)
+            self._size -= size
+            self.evictions += 1
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def __str__(self):
+        return ('{0.__class__.__name__}({1} entries, {0._size} bytes, '
+                '{0.hits} hits, {0.misses} misses, {0.evictions} evictions)'.format(
+                self, len(self)))
+
+
+def _remove_file(path):
+    # In a function of its own, so that a failure doesn't replace the
+    # exception being handled by the caller
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+#
+# Serialisation of model graphs into compact tuples of strings and ints
+#
+
+def serialize(root):
+    """Return a marshallable representation of the graph in root.
+
+    All strings are stored once in a table and referred to by index.
+    """
+
+    strings = _StringTable()
+    model_nodes = list(root.resource_nodes.values()) + list(root.blank_nodes.values())
+    nodes = []
+    node_index = {}
+
+    for node in model_nodes:
+        node_index[node] = len(nodes)
+        if isinstance(node, model.ResourceNode):
+            nodes.append((_RESOURCE, _encode_uri(node.uri, strings)))
+        elif node.uri.external:
+            nodes.append((_EXTERNAL_BLANK, strings.add(node.uri.node_id)))
+        else:
+            nodes.append((_INTERNAL_BLANK, ))
+
+    predicates = []
+    for subject, node in enumerate(model_nodes):
+        for pred in node:
+            obj = pred.object
+            if isinstance(obj, model.LiteralNode):
+                if obj.type_uri is None:
+                    type_uri = -1
+                else:
+                    type_uri = strings.add(obj.type_uri)
+                encoded = (strings.add(obj.value), type_uri)
+            else:
+                encoded = node_index[obj]
+
+            predicates.append((subject, _encode_uri(pred.uri, strings), encoded))
+
+    return (tuple(strings.strings), tuple(nodes), tuple(predicates))
+
+
+def deserialize(data):
+    """Return a read-only model.Root built from the output of serialize().
+    """
+
+    strings, nodes, predicates = data
+    root = model.Root(None)
+
+    # QNames are immutable, so share them between predicates
+    qnames = {}
+
+    model_nodes = []
+    for encoded in nodes:
+        kind = encoded[0]
+        if kind == _RESOURCE:
+            node = root._get_resource_node(_decode_uri(encoded[1], strings))
+        elif kind == _EXTERNAL_BLANK:
+            node = root._get_blank_node(model.NodeID(strings[encoded[1]]))
+        else:
+            node = root._get_blank_node(model.NodeID(None))
+        model_nodes.append(node)
+
+    for subject, pred_uri, encoded in predicates:
+        if isinstance(encoded, tuple):
+            value, type_uri = encoded
+            obj = model.LiteralNode(
+                None, strings[value], None if type_uri < 0 else strings[type_uri])
+        else:
+            obj = model_nodes[encoded]
+
+        try:
+            uri = qnames[pred_uri]
+        except KeyError:
+            uri = qnames[pred_uri] = _decode_uri(pred_uri, strings)
+
+        model_nodes[subject]._add_static_predicate(uri, obj)
+
+    return root
+
+
+class _StringTable(object):
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def add(self, s):
+        try:
+            return self.index[s]
+        except KeyError:
+            i = self.index[s] = len(self.strings)
+            self.strings.append(s)
+            return i
+
+
+def _encode_uri(uri, strings):
+    """Plain URIs are encoded as a string index, QNames as a tuple of
+    indices.
+    """
+    if isinstance(uri, model.QName):
+        if uri.ns_prefix is None:
+            prefix = -1
+        else:
+            prefix = strings.add(uri.ns_prefix)
+        return (strings.add(uri.ns_uri), prefix, strings.add(uri.local_name))
+    else:
+        return strings.add(uri)
+
+
+def _decode_uri(encoded, strings):
+    if isinstance(encoded, tuple):
+        ns_uri, prefix, local_name = encoded
+        return model.QName(strings[ns_uri],
+                           None if prefix < 0 else strings[prefix],
+                           strings[local_name])
+    else:
+        return strings[encoded]
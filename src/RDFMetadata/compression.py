@@ -0,0 +1,86 @@
+# compression - Streaming gzip support for .svgz and similar files
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""Read and write gzip-compressed XML files, e.g. .svgz, as streams.
+
+The files are decompressed and compressed as they are read and
+written, without temporary files or holding the whole file in memory.
+
+Files opened with reader() can be seeked, but seeking backwards starts
+decompressing from the beginning of the file again.  Code that is
+given such files should therefore read them in order where possible.
+"""
+
+import os
+import gzip
+import zlib
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+COMPRESSED_EXTENSIONS = ('.svgz', '.gz')
+
+DEFAULT_LEVEL = 6
+
+READ_SIZE = 64 * 1024
+
+
+def is_compressed(f):
+    """Return True if the seekable binary file f is gzip-compressed.
+    The file position is not changed.
+    """
+
+    pos = f.tell()
+    try:
+        return f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+    finally:
+        f.seek(pos)
+
+
+def is_compressed_name(filename):
+    """Return True if filename has an extension for compressed files."""
+
+    return os.path.splitext(filename)[1].lower() in COMPRESSED_EXTENSIONS
+
+
+def reader(f):
+    """Return a file object reading the decompressed data of the
+    seekable binary file f.
+    """
+
+    # Don't let the gzip module take the name from the file object
+    return gzip.GzipFile(filename = '', mode = 'rb', fileobj = f)
+
+
+def writer(f, level = DEFAULT_LEVEL):
+    """Return a file object compressing data written to it into the
+    binary file f.  It must be closed to write the end of the gzip
+    stream, which leaves f open.
+    """
+
+    return gzip.GzipFile(filename = '', mode = 'wb', fileobj = f,
+                         compresslevel = level)
+
+
+def decompress_stream(chunks):
+    """Generate the decompressed data of an iterable of gzip-compressed
+    strings, e.g. read from a pipe.
+    """
+
+    # Tell zlib to expect a gzip header
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    for data in chunks:
+        while data:
+            yield decompressor.decompress(data)
+
+            # Concatenated gzip streams
+            data = decompressor.unused_data
+            if data:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    yield decompressor.flush()
@@ -54,20 +54,28 @@ class Root(observer.Subject, object):
         # Necessary to know when adding top-level resources
         self.root_element_is_rdf = is_rdf_element(element, 'RDF')
 
-        # Some circular dependencies between models.  Might resolve
-        # that later, but I'm wary about adding too much stuff into
-        # these classes and this module
-        from . import parser
-        self.parser = parser.RDFXMLParser(self)
+        # Set by parse_into_model() if literals should be interned
+        self.literal_pool = None
 
-    def parse_into_model(self, strict = True):
+        # The parser module depends on this one, so it sets this to
+        # its RDFXMLParser rather than having it imported here
+        self.parser = None
+
+    def parse_into_model(self, strict = True, intern_literals = False):
         """Return a new model.Root object that contains all
         nodes and predicates under this DOM root node.
+
+        If intern_literals is True, equal literal values share a
+        single string object through a model.LiteralPool, available
+        as the literal_pool attribute of the model root.
         """
 
+        if intern_literals:
+            self.literal_pool = model.LiteralPool()
+
         # Create the model, which will add an observer that reacts
         # to parse events 
-        model_root = model.Root(self)
+        model_root = model.Root(self, self.literal_pool)
 
         # Only do strict parsing on original document, and be forgiving
         # on later DOM updates
@@ -83,6 +91,31 @@ class Root(observer.Subject, object):
     def get_ns_prefix(self, uri, preferred_prefix):
         return self.repr.namespaces.get_prefix(uri, preferred_prefix)
 
+    def intern_text(self, text_node):
+        """Return the data of text_node, interned in the literal pool
+        if there is one.  The text node is updated to refer to the
+        pooled string too, so the DOM doesn't keep a duplicate alive.
+        """
+
+        if self.literal_pool is None:
+            return text_node.data
+
+        # Assigning data directly does not emit any DOM events, which
+        # is fine since the value is unchanged
+        text = text_node.data = self.literal_pool.intern(text_node.data)
+        return text
+
+    def intern_uri(self, uri):
+        if self.literal_pool is None:
+            return uri
+        return self.literal_pool.intern(uri)
+
+    def consolidate_namespaces(self):
+        """Hoist namespace declarations to the root element and drop
+        redundant ones, see namespaces.consolidate().
+        """
+        return namespaces.consolidate(self.element)
+
     def dump(self):
         self.element.writexml(sys.stderr)
 
@@ -180,8 +213,16 @@ class TypedRepr(observer.Subject, object):
         self.element.register_observer(self._on_dom_update)
 
     def to(self, cls):
+        self._detach()
         return cls(self.root, self.element, self.namespaces)
 
+    def _detach(self):
+        """Stop listening to the element, when this object no longer
+        represents it.  The element may be linked into the tree again
+        later (e.g. by an undo), and will then get new reprs.
+        """
+        self.element.unregister_observer(self._on_dom_update)
+
     def set_literal_value(self, text):
         raise UnsupportedFunctionError('set_literal_value', self)
 
@@ -289,6 +330,7 @@ class ElementNode(TypedRepr):
             domwrapper.notify(el, NodeUnlinked(node = el))
 
         # Then we can unlink ourselves
+        self._detach()
         self.notify_observers(model.NodeReprRemoved(repr = self))
 
 
@@ -374,6 +416,7 @@ class ImpliedTypeProperty(TypedRepr):
 
     def _unlinked(self):
         # The predicate is gone, as well as the type resource
+        self._detach()
         self.notify_observers(model.PredicateReprRemoved(repr = self))
         self.notify_observers(model.NodeReprRemoved(repr = self))
 
@@ -398,7 +441,7 @@ class Property(TypedRepr):
 
         # This will always result in a new repr, so stop listening to
         # element events
-        self.element.unregister_observer(self._on_dom_update)
+        self._detach()
 
         
 
@@ -440,6 +483,7 @@ class ResourceProperty(Property):
         elif isinstance(event, NodeUnlinked):
             assert event.node is self.element
 
+            self._detach()
             self.notify_observers(model.PredicateReprRemoved(repr = self))
 
             # We must also notify down, telling the node it's repr has been unlinked
@@ -509,7 +553,7 @@ class LiteralProperty(Property):
         elif isinstance(event, domwrapper.AttributeSet):
             if (event.attr.namespaceURI == RDF_NS
                 and event.attr._get_localName() == 'datatype'):
-                self._update_type(event.attr.value)
+                self._update_type(self.root.intern_uri(event.attr.value))
 
         elif isinstance(event, domwrapper.AttributeRemoved):
             if (event.attr.namespaceURI == RDF_NS
@@ -518,6 +562,7 @@ class LiteralProperty(Property):
 
         elif isinstance(event, NodeUnlinked):
             assert event.node is self.element
+            self._detach()
             self.notify_observers(model.PredicateReprRemoved(repr = self))
 
 
@@ -527,7 +572,7 @@ class LiteralProperty(Property):
         assert len(text_nodes) <= 1
         
         if text_nodes:
-            text = text_nodes[0].data
+            text = self.root.intern_text(text_nodes[0])
         else:
             text = ''
 
@@ -579,6 +624,7 @@ class EmptyPropertyResource(Property):
 
         elif isinstance(event, NodeUnlinked):
             assert event.node is self.element
+            self._detach()
             self.notify_observers(model.PredicateReprRemoved(repr = self))
             self.notify_observers(model.NodeReprRemoved(repr = self))
 
@@ -611,6 +657,7 @@ class EmptyPropertyBlankNode(Property):
 
         elif isinstance(event, NodeUnlinked):
             assert event.node is self.element
+            self._detach()
             self.notify_observers(model.PredicateReprRemoved(repr = self))
             self.notify_observers(model.NodeReprRemoved(repr = self))
 
@@ -33,6 +33,7 @@ class ChildRemoved(observer.Event):
 
     - parent: the parent Node
     - child: the removed child Node
+    - after: the child was removed from after this Node, or None
     """
     pass
 
@@ -44,6 +45,7 @@ class AttributeSet(observer.Event):
 
     - element: the parent Element
     - attr: the new or updated Attr 
+    - old_value: the previous value, or None if the attribute was not set
     """
     pass
 
@@ -57,6 +59,20 @@ class AttributeRemoved(observer.Event):
     """
     pass
 
+class AttributesChanged(observer.Event):
+    """Event when a batch of attributes, possibly on several elements,
+    have been changed by change_attributes().  This is sent instead of
+    individual AttributeSet and AttributeRemoved events, and only to
+    the node passed to change_attributes().
+
+    Parameters:
+
+    - node: the Node that the event was sent to
+    - changes: list of (element, name, old_value, new_value), where the
+      values are None if the attribute was not set
+    """
+    pass
+
 #
 # Helper methods
 # 
@@ -76,6 +92,36 @@ def notify(node, event):
     n(event)
     
 
+def change_attributes(node, changes):
+    """Set or remove several attributes and send a single
+    AttributesChanged event to the observers of NODE.
+
+    CHANGES is a list of (element, name, value) where NAME is the
+    qualified attribute name.  The attribute is removed if VALUE is
+    None.  The elements should be NODE or below it.
+    """
+
+    done = []
+    for element, name, value in changes:
+        old_attr = element.getAttributeNode(name)
+        old_value = old_attr.value if old_attr else None
+
+        # Bypass the wrappers to not emit any individual events
+        if value is None:
+            if old_attr:
+                minidom.Element.removeAttribute(element, name)
+        else:
+            minidom.Element.setAttribute(element, name, value)
+
+        if old_value != value:
+            done.append((element, name, old_value, value))
+
+    if done:
+        notify(node, AttributesChanged(node = node, changes = done))
+
+    return done
+
+
 #
 # DOM wrappers
 #
@@ -134,7 +180,8 @@ def wrap(node):
             replaceChild(newChild, oldChild)
             node.notify_observers(
                 ChildRemoved(parent = node,
-                             child = oldChild))
+                             child = oldChild,
+                             after = after))
             node.notify_observers(
                 ChildAdded(parent = node,
                            child = newChild,
@@ -146,10 +193,12 @@ def wrap(node):
         removeChild = node.removeChild
         @wraps(removeChild)
         def wrap_removeChild(oldChild):
+            after = oldChild.previousSibling
             removeChild(oldChild)
             node.notify_observers(
                 ChildRemoved(parent = node,
-                             child = oldChild))
+                             child = oldChild,
+                             after = after))
      
         node.removeChild = wrap_removeChild
 
@@ -163,10 +212,13 @@ def wrap(node):
         setAttribute = node.setAttribute
         @wraps(setAttribute)
         def wrap_setAttribute(attname, value):
+            old_attr = node.getAttributeNode(attname)
+            old_value = old_attr.value if old_attr else None
             setAttribute(attname, value)
             node.notify_observers(
                 AttributeSet(element = node,
-                             attr = node.getAttributeNode(attname)))
+                             attr = node.getAttributeNode(attname),
+                             old_value = old_value))
 
         node.setAttribute = wrap_setAttribute
 
@@ -174,11 +226,13 @@ def wrap(node):
         setAttributeNS = node.setAttributeNS
         @wraps(setAttributeNS)
         def wrap_setAttributeNS(namespaceURI, qualifiedName, value):
+            localName = minidom._nssplit(qualifiedName)[1]
+            old_attr = node.getAttributeNodeNS(namespaceURI, localName)
+            old_value = old_attr.value if old_attr else None
             setAttributeNS(namespaceURI, qualifiedName, value)
-            attr = node.getAttributeNodeNS(namespaceURI,
-                                           minidom._nssplit(qualifiedName)[1])
+            attr = node.getAttributeNodeNS(namespaceURI, localName)
             node.notify_observers(
-                AttributeSet(element = node, attr = attr))
+                AttributeSet(element = node, attr = attr, old_value = old_value))
 
         node.setAttributeNS = wrap_setAttributeNS
 
@@ -0,0 +1,440 @@
+# journal - undo and redo changes to the DOM behind a model
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""Record changes to the DOM under a model.Root as small inverse
+operations, so they can be undone and redone.
+
+All model changes end up as DOM changes, and all model updates are
+driven by the resulting DOM events.  The journal therefore listens to
+the DOM events from domwrapper and undoes them with the opposite DOM
+operation.  The domrepr layer then updates the model as usual,
+including changing the repr type of a property when needed.
+"""
+
+import sys
+from contextlib import contextmanager
+
+from . import observer, domwrapper
+
+
+class JournalChanged(observer.Event):
+    """Sent by a Journal when what can be undone or redone has changed.
+
+    Parameter:
+
+    - journal: the Journal
+    """
+    pass
+
+
+#
+# Operations.  Each one records a DOM change that has been made, and
+# can undo and redo it.
+#
+
+class Operation(object):
+    """Base class for the operations.
+
+    Subclasses have undo() and redo() methods that reverse and repeat
+    the change, and set size to an estimate of the memory used to
+    record it.
+    """
+
+    __slots__ = ('size', )
+
+
+class InsertChild(Operation):
+    """child was inserted into parent after the node after.
+
+    The children of child are remembered too, since they may have
+    been moved into it while it wasn't in the document (and thus not
+    watched by the journal).
+    """
+
+    __slots__ = ('parent', 'child', 'after', 'contents')
+
+    def __init__(self, parent, child, after):
+        self.parent = parent
+        self.child = child
+        self.after = after
+        self.contents = tuple(child.childNodes)
+        self.size = (sys.getsizeof(self) + sys.getsizeof(self.contents)
+                     + _node_size(child))
+
+    def undo(self):
+        self.parent.removeChild(self.child)
+
+    def redo(self):
+        for node in self.contents:
+            if node.parentNode is not self.child:
+                self.child.appendChild(node)
+
+        _insert_after(self.parent, self.child, self.after)
+
+
+class RemoveChild(Operation):
+    """child was removed from parent, where it was after the node after."""
+
+    __slots__ = ('parent', 'child', 'after')
+
+    def __init__(self, parent, child, after):
+        self.parent = parent
+        self.child = child
+        self.after = after
+        self.size = sys.getsizeof(self) + _node_size(child)
+
+    def undo(self):
+        _insert_after(self.parent, self.child, self.after)
+
+    def redo(self):
+        self.parent.removeChild(self.child)
+
+
+class ChangeAttribute(Operation):
+    """An attribute of element was set or removed.  The values are None
+    when the attribute isn't set.
+    """
+
+    __slots__ = ('element', 'namespace_uri', 'name', 'old_value', 'new_value')
+
+    def __init__(self, element, attr, old_value, new_value):
+        self.element = element
+        self.namespace_uri = attr.namespaceURI
+        self.name = attr.name
+        self.old_value = old_value
+        self.new_value = new_value
+        self.size = (sys.getsizeof(self) + sys.getsizeof(old_value)
+                     + sys.getsizeof(new_value))
+
+    def undo(self):
+        self._set(self.old_value)
+
+    def redo(self):
+        self._set(self.new_value)
+
+    def _set(self, value):
+        if self.namespace_uri:
+            if value is None:
+                self.element.removeAttributeNS(
+                    self.namespace_uri, self.name.split(':')[-1])
+            else:
+                self.element.setAttributeNS(self.namespace_uri, self.name, value)
+        else:
+            if value is None:
+                self.element.removeAttribute(self.name)
+            else:
+                self.element.setAttribute(self.name, value)
+
+
+class ChangeAttributes(Operation):
+    """A batch of attributes were changed by
+    domwrapper.change_attributes(), notifying node.
+    """
+
+    __slots__ = ('node', 'changes')
+
+    def __init__(self, node, changes):
+        self.node = node
+        self.changes = changes
+        self.size = sys.getsizeof(self) + sys.getsizeof(changes)
+        for element, name, old_value, new_value in changes:
+            self.size += sys.getsizeof(old_value) + sys.getsizeof(new_value)
+
+    def undo(self):
+        domwrapper.change_attributes(
+            self.node, [(element, name, old_value)
+                        for element, name, old_value, new_value
+                        in reversed(self.changes)])
+
+    def redo(self):
+        domwrapper.change_attributes(
+            self.node, [(element, name, new_value)
+                        for element, name, old_value, new_value
+                        in self.changes])
+
+
+class Step(object):
+    """A list of operations that are undone and redone together.
+
+    If text_element is set, the step only contains changes to the
+    text of that element, and further text changes to it can be
+    coalesced into the step.
+    """
+
+    def __init__(self, label = None, text_element = None):
+        self.label = label
+        self.text_element = text_element
+        self.ops = []
+        self.size = sys.getsizeof(self)
+
+    def add(self, op):
+        # Coalesce repeated text edits: a text node that was inserted
+        # and later removed within this step does not need to be kept,
+        # unless another operation refers to it.
+
+        if self.text_element is not None and isinstance(op, RemoveChild):
+            for i in range(len(self.ops) - 1, -1, -1):
+                prev = self.ops[i]
+                if isinstance(prev, InsertChild) and prev.child is op.child:
+                    if not any(o.after is op.child for o in self.ops[i + 1:]):
+                        del self.ops[i]
+                        self.size -= prev.size
+                        return
+                    break
+
+        self.ops.append(op)
+        self.size += op.size
+
+    def undo(self):
+        for op in reversed(self.ops):
+            op.undo()
+
+    def redo(self):
+        for op in self.ops:
+            op.redo()
+
+
+class Journal(observer.Subject):
+    """Undo and redo changes to the DOM of a model.Root.
+
+    Each DOM change is recorded as a separate undo step, except:
+
+    - Changes made inside a transaction() are undone in one step.
+
+    - Consecutive changes to the text of the same element (e.g. a
+      literal being edited a keystroke at a time) are coalesced into
+      one step, until some other change is made or checkpoint() is
+      called.
+
+    When the estimated size of the recorded steps exceeds max_bytes,
+    the oldest undo steps are dropped.
+
+    Observers are notified with JournalChanged.
+    """
+
+    def __init__(self, root, max_bytes = 1024 * 1024):
+        super(Journal, self).__init__()
+
+        self.root = root
+        self.max_bytes = max_bytes
+
+        self.undo_steps = []
+        self.redo_steps = []
+        self.size = 0
+
+        self._transaction = None
+        self._transaction_depth = 0
+        self._replaying = False
+        self._coalescing = False
+
+        self._watched = set()
+        self._watch(root.repr.element)
+
+
+    def close(self):
+        """Stop recording changes and drop all steps."""
+
+        for node in self._watched:
+            node.unregister_observer(self._on_dom_update)
+        self._watched.clear()
+
+        self.undo_steps = []
+        self.redo_steps = []
+        self.size = 0
+
+
+    def can_undo(self):
+        return bool(self.undo_steps)
+
+    def can_redo(self):
+        return bool(self.redo_steps)
+
+
+    def undo(self):
+        """Undo the latest step."""
+
+        assert self._transaction is None, 'cannot undo inside a transaction'
+        step = self.undo_steps.pop()
+        self._replay(step.undo)
+        self.redo_steps.append(step)
+        self._coalescing = False
+        self.notify_observers(JournalChanged(journal = self))
+
+
+    def redo(self):
+        """Redo the latest undone step."""
+
+        assert self._transaction is None, 'cannot redo inside a transaction'
+        step = self.redo_steps.pop()
+        self._replay(step.redo)
+        self.undo_steps.append(step)
+        self._coalescing = False
+        self.notify_observers(JournalChanged(journal = self))
+
+
+    def checkpoint(self):
+        """Stop coalescing text changes into the latest step."""
+        self._coalescing = False
+
+
+    @contextmanager
+    def transaction(self, label = None):
+        """Context manager that records all changes made within it as
+        a single undo step.  Transactions can be nested, in which case
+        the outermost one makes up the step.
+        """
+
+        if self._transaction_depth == 0:
+            self._transaction = Step(label)
+            self._coalescing = False
+
+        self._transaction_depth += 1
+        try:
+            yield self._transaction
+        finally:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                step = self._transaction
+                self._transaction = None
+                if step.ops:
+                    self._push(step)
+
+
+    def _replay(self, func):
+        self._replaying = True
+        try:
+            func()
+        finally:
+            self._replaying = False
+
+
+    def _push(self, step):
+        self.undo_steps.append(step)
+        self.size += step.size
+        self._drop_redo()
+        self._enforce_limit()
+        self.notify_observers(JournalChanged(journal = self))
+
+
+    def _drop_redo(self):
+        for step in self.redo_steps:
+            self.size -= step.size
+        del self.redo_steps[:]
+
+
+    def _enforce_limit(self):
+        # Always keep the latest step, even if it is too large on its own
+        drop = 0
+        while self.size > self.max_bytes and drop < len(self.undo_steps) - 1:
+            self.size -= self.undo_steps[drop].size
+            drop += 1
+
+        if drop:
+            del self.undo_steps[:drop]
+
+
+    def _record(self, op, text_element):
+        if self._transaction is not None:
+            self._transaction.add(op)
+            return
+
+        if (self._coalescing and text_element is not None
+            and self.undo_steps[-1].text_element is text_element):
+            step = self.undo_steps[-1]
+            self.size -= step.size
+            step.add(op)
+            self.size += step.size
+            self._enforce_limit()
+            return
+
+        step = Step(text_element = text_element)
+        step.add(op)
+        self._coalescing = text_element is not None
+        self._push(step)
+
+
+    def _watch(self, node):
+        """Listen to DOM events on node and all elements below it."""
+
+        if node.nodeType != node.ELEMENT_NODE:
+            return
+
+        if node not in self._watched:
+            domwrapper.wrap(node)
+            node.register_observer(self._on_dom_update)
+            self._watched.add(node)
+
+        for child in node.childNodes:
+            self._watch(child)
+
+
+    def _on_dom_update(self, event):
+        if isinstance(event, domwrapper.ChildAdded):
+            # Always watch new elements, also when they are added by
+            # undo or redo
+            self._watch(event.child)
+
+        if self._replaying:
+            return
+
+        if isinstance(event, domwrapper.ChildAdded):
+            self._record(InsertChild(event.parent, event.child, event.after),
+                         _text_parent(event.parent, event.child))
+
+        elif isinstance(event, domwrapper.ChildRemoved):
+            self._record(RemoveChild(event.parent, event.child, event.after),
+                         _text_parent(event.parent, event.child))
+
+        elif isinstance(event, domwrapper.AttributeSet):
+            if event.attr.value != event.old_value:
+                self._record(ChangeAttribute(event.element, event.attr,
+                                             event.old_value, event.attr.value),
+                             None)
+
+        elif isinstance(event, domwrapper.AttributeRemoved):
+            self._record(ChangeAttribute(event.element, event.attr,
+                                         event.attr.value, None),
+                         None)
+
+        elif isinstance(event, domwrapper.AttributesChanged):
+            self._record(ChangeAttributes(event.node, event.changes), None)
+
+
+def _text_parent(parent, child):
+    if child.nodeType == child.TEXT_NODE:
+        return parent
+    else:
+        return None
+
+
+def _insert_after(parent, child, after):
+    if after is None:
+        ref = parent.firstChild
+    else:
+        ref = after.nextSibling
+
+    if ref is None:
+        parent.appendChild(child)
+    else:
+        parent.insertBefore(child, ref)
+
+
+def _node_size(node):
+    """Return a rough estimate of the memory used by a DOM subtree."""
+
+    size = sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+
+    if node.nodeType == node.ELEMENT_NODE:
+        for value in node.attributes.values():
+            size += sys.getsizeof(value.value)
+        for child in node.childNodes:
+            size += _node_size(child)
+    else:
+        size += sys.getsizeof(getattr(node, 'data', None))
+
+    return size
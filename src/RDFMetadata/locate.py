@@ -0,0 +1,350 @@
+# locate - find rdf:RDF elements without building a DOM of the whole file
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""Find the rdf:RDF elements in an XML file by streaming it through
+expat, and parse only those elements into DOMs.
+
+In e.g. an SVG file the drawing is usually much larger than the
+metadata, so this saves both time and memory compared to parsing the
+whole file with minidom.
+
+Each element is parsed inside a skeleton of its ancestor elements,
+which only have their namespace declarations and id attributes.  The
+namespaces used in the element therefore resolve as in the original
+file, and the owning object can be found by walking up from it.
+
+The byte ranges of the elements can be used to write them back into
+the file with splice(), leaving everything else untouched.
+
+Files that can't be seeked, e.g. pipes, can be handled by read_rdf()
+instead, which finds and parses the elements in a single pass.
+"""
+
+import io
+import codecs
+from xml.dom import minidom
+from xml.parsers import expat
+from xml.sax.saxutils import quoteattr
+
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+
+READ_SIZE = 64 * 1024
+
+_BOMS = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE, b'<\0', b'\0<')
+
+# What can follow the name in an end tag
+_END_TAG_FOLLOWERS = (b'>', b' ', b'\t', b'\r', b'\n')
+
+
+class UnsupportedEncoding(ValueError):
+    """The file encoding can't be handled by byte offsets.  Parse the
+    whole file instead.
+    """
+    pass
+
+
+class RDFLocation(object):
+    """An rdf:RDF element found by find_rdf().
+
+    - start, end: byte offsets of the element in the file, end exclusive
+    - tag_name: the element tag name, e.g. 'rdf:RDF'
+    - ancestors: a (tag name, id attribute, namespace declarations)
+      tuple for each enclosing element, outermost first.  The id is
+      None if not set, and the declarations is a list of (prefix, URI).
+    - encoding: the encoding of the file
+    """
+
+    def __init__(self, start, tag_name, ancestors, encoding):
+        self.start = start
+        self.end = None
+        self.tag_name = tag_name
+        self.ancestors = ancestors
+        self.encoding = encoding
+
+    def __repr__(self):
+        return '<RDFLocation {0}-{1} in {2}>'.format(
+            self.start, self.end, '/'.join(a[0] for a in self.ancestors))
+
+
+def find_rdf(f):
+    """Return a list of RDFLocation for the rdf:RDF elements in the
+    seekable binary file f, in document order.  rdf:RDF elements
+    inside other rdf:RDF elements are not included.
+
+    Raises UnsupportedEncoding if the file isn't in an ASCII-compatible
+    encoding.
+    """
+
+    start_pos = f.tell()
+    scanner = _Scanner()
+
+    data = f.read(READ_SIZE)
+    if data.startswith(_BOMS):
+        raise UnsupportedEncoding('UTF-16 and UTF-32 files are not supported')
+
+    while data:
+        scanner.parser.Parse(data, False)
+        data = f.read(READ_SIZE)
+    scanner.parser.Parse(b'', True)
+
+    for location in scanner.locations:
+        location.start += start_pos
+        location.end = _element_end(f, location, location.end + start_pos)
+
+    return scanner.locations
+
+
+def parse_location(f, location):
+    """Parse the element at location in the binary file f, and return
+    the rdf:RDF DOM element.
+    """
+
+    f.seek(location.start)
+    return _parse_element(f.read(location.end - location.start), location)
+
+
+def read_rdf(chunks):
+    """Find and parse the rdf:RDF elements in the XML document read
+    from chunks, an iterable of binary strings (e.g. read from a pipe),
+    without going back in the data.  Only the rdf:RDF elements being
+    read are kept in memory, not the whole document.
+
+    Return a list of (RDFLocation, rdf:RDF DOM element), as returned by
+    find_rdf() and parse_location().  Raises UnsupportedEncoding like
+    find_rdf().
+    """
+
+    scanner = _Scanner()
+    result = []
+
+    # The data from offset buf_start that may still be needed
+    buf = bytearray()
+    buf_start = 0
+
+    for data in chunks:
+        if not data:
+            continue
+
+        if buf_start == 0 and not buf and data.startswith(_BOMS):
+            raise UnsupportedEncoding('UTF-16 and UTF-32 files are not supported')
+
+        buf += data
+        scanner.parser.Parse(data, False)
+        buf_start = _take_elements(scanner, buf, buf_start, result)
+
+    scanner.parser.Parse(b'', True)
+    _take_elements(scanner, buf, buf_start, result)
+
+    return result
+
+
+def _take_elements(scanner, buf, buf_start, result):
+    """Parse the elements found since the last call and drop the data
+    that isn't needed any more from buf.  Return the new buf_start.
+    """
+
+    for location in scanner.locations[len(result):]:
+        location.end = _buffer_element_end(buf, location, location.end - buf_start) + buf_start
+        data = bytes(buf[location.start - buf_start:location.end - buf_start])
+        result.append((location, _parse_element(data, location)))
+
+    if scanner.current is not None:
+        keep = scanner.current.start - buf_start
+    else:
+        # An element start tag that has only been partly read starts
+        # at the last <, since it can't contain any
+        keep = buf.rfind(b'<')
+        if keep < 0:
+            keep = len(buf)
+
+    del buf[:keep]
+    return buf_start + keep
+
+
+def _parse_element(data, location):
+    head = [u'<?xml version="1.0" encoding="{0}"?>'.format(location.encoding)]
+    for tag_name, element_id, declarations in location.ancestors:
+        attrs = []
+        for prefix, uri in declarations:
+            name = u'xmlns:' + prefix if prefix else u'xmlns'
+            attrs.append(u' {0}={1}'.format(name, quoteattr(uri or u'')))
+        if element_id is not None:
+            attrs.append(u' id={0}'.format(quoteattr(element_id)))
+        head.append(u'<{0}{1}>'.format(tag_name, u''.join(attrs)))
+
+    tail = u''.join(u'</{0}>'.format(ancestor[0])
+                    for ancestor in reversed(location.ancestors))
+
+    doc = minidom.parseString(
+        _encode(u''.join(head), location.encoding) + data
+        + _encode(tail, location.encoding))
+
+    # The ancestors can't be rdf:RDF elements, so this is the first one
+    return doc.getElementsByTagNameNS(RDF_NS, 'RDF')[0]
+
+
+def serialize_element(element, encoding):
+    """Return the XML for element, encoded for a file in encoding."""
+
+    out = io.BytesIO()
+    element.writexml(codecs.getwriter(encoding)(out, 'xmlcharrefreplace'))
+    return out.getvalue()
+
+
+def splice(src, out, replacements):
+    """Copy the binary file src to out, replacing byte ranges.
+
+    replacements is a list of (start, end, data) sorted by start.
+    Return a list of the (start, end) of the new data in out.
+    """
+
+    ranges = []
+    pos = 0
+    out_pos = 0
+
+    for start, end, data in replacements:
+        out_pos += _copy(src, out, pos, start)
+
+        out.write(data)
+        ranges.append((out_pos, out_pos + len(data)))
+        out_pos += len(data)
+        pos = end
+
+    _copy(src, out, pos, None)
+    return ranges
+
+
+class _Scanner(object):
+    def __init__(self):
+        self.parser = expat.ParserCreate(namespace_separator = ' ')
+        self.parser.namespace_prefixes = True
+        self.parser.StartElementHandler = self._start_element
+        self.parser.EndElementHandler = self._end_element
+        self.parser.StartNamespaceDeclHandler = self._start_namespace
+        self.parser.XmlDeclHandler = self._xml_decl
+
+        self.encoding = 'utf-8'
+        self.locations = []
+
+        # Enclosing elements, when not inside an rdf:RDF element
+        self.ancestors = []
+
+        # Declarations for the next element
+        self.declarations = []
+
+        # The rdf:RDF element being scanned, and the depth within it
+        self.current = None
+        self.depth = 0
+
+
+    def _xml_decl(self, version, encoding, standalone):
+        if encoding:
+            try:
+                ascii_compatible = _encode(u'<', encoding) == b'<'
+            except LookupError:
+                ascii_compatible = False
+            if not ascii_compatible:
+                raise UnsupportedEncoding(
+                    'unsupported encoding: {0}'.format(encoding))
+            self.encoding = encoding
+
+
+    def _start_namespace(self, prefix, uri):
+        self.declarations.append((prefix, uri))
+
+
+    def _start_element(self, name, attrs):
+        declarations = self.declarations
+        self.declarations = []
+
+        if self.current is not None:
+            self.depth += 1
+            return
+
+        parts = name.split(' ')
+        if len(parts) == 3:
+            ns_uri, local_name, prefix = parts
+            tag_name = prefix + ':' + local_name
+        else:
+            ns_uri = parts[0] if len(parts) == 2 else None
+            local_name = tag_name = parts[-1]
+
+        if ns_uri == RDF_NS and local_name == 'RDF':
+            self.current = RDFLocation(self.parser.CurrentByteIndex, tag_name,
+                                       list(self.ancestors), self.encoding)
+            self.depth = 0
+        else:
+            self.ancestors.append((tag_name, attrs.get('id'), declarations))
+
+
+    def _end_element(self, name):
+        if self.current is None:
+            self.ancestors.pop()
+        elif self.depth:
+            self.depth -= 1
+        else:
+            # This is either the start of the end tag, or the end of an
+            # empty element tag
+            self.current.end = self.parser.CurrentByteIndex
+            self.locations.append(self.current)
+            self.current = None
+
+
+def _element_end(f, location, pos):
+    """Return the offset after the end tag of the element at
+    location, given the byte index expat reported for the end of it.
+    """
+
+    end_tag = _encode(u'</' + location.tag_name, location.encoding)
+
+    f.seek(pos)
+    data = f.read(len(end_tag) + 1)
+    if not (data.startswith(end_tag) and data[len(end_tag):] in _END_TAG_FOLLOWERS):
+        # An empty element tag, which expat reports the end of
+        return pos
+
+    while True:
+        i = data.find(b'>')
+        if i >= 0:
+            return pos + i + 1
+
+        pos += len(data)
+        data = f.read(READ_SIZE)
+        if not data:
+            raise expat.ExpatError('unterminated end tag: {0}'.format(location))
+
+
+def _buffer_element_end(buf, location, pos):
+    """Like _element_end(), but for an element that is all in buf."""
+
+    end_tag = _encode(u'</' + location.tag_name, location.encoding)
+
+    if not (buf[pos:pos + len(end_tag)] == end_tag
+            and buf[pos + len(end_tag):pos + len(end_tag) + 1] in _END_TAG_FOLLOWERS):
+        return pos
+
+    # expat has seen the whole end tag
+    return buf.find(b'>', pos) + 1
+
+
+def _encode(text, encoding):
+    return codecs.lookup(encoding).encode(text)[0]
+
+
+def _copy(src, out, start, end):
+    src.seek(start)
+    copied = 0
+    while end is None or start + copied < end:
+        size = READ_SIZE if end is None else min(READ_SIZE, end - start - copied)
+        data = src.read(size)
+        if not data:
+            break
+        out.write(data)
+        copied += len(data)
+    return copied
+
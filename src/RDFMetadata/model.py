@@ -11,7 +11,9 @@ underlying RDF/XML.
 """
 
 
+import sys
 import collections
+import hashlib
 import uuid
 
 from . import observer
@@ -156,17 +158,40 @@ class PredicateReprRemoved(observer.Event):
     """
     
     
+class ReadOnlyError(Exception):
+    """Raised when trying to change a read-only model, i.e. one that
+    isn't linked to a DOM.
+    """
+    pass
+
+
 class Root(observer.Subject, collections.Mapping):
-    def __init__(self, repr):
+    """The root of a model graph.
+
+    If repr is None the model is read-only: it is built directly by
+    parser.ReadOnlyParser (or similar) and is not linked to any DOM.
+    Nodes are still added with _get_node() and friends, and predicates
+    with SubjectNode._add_static_predicate(), but no events are sent.
+    """
+
+    def __init__(self, repr, literal_pool = None):
         super(Root, self).__init__()
 
         self.repr = repr
-        self.repr.register_observer(self._on_repr_update)
-        
+        if self.repr is not None:
+            self.repr.register_observer(self._on_repr_update)
+
+        # Optional LiteralPool shared with the parser
+        self.literal_pool = literal_pool
+
         # There is exactly one instance for each URI or nodeID
         self.resource_nodes = {}
         self.blank_nodes = {}
 
+    @property
+    def read_only(self):
+        return self.repr is None
+
 
     def _on_repr_update(self, event):
         if isinstance(event, ResourceNodeReprAdded):
@@ -204,8 +229,9 @@ class Root(observer.Subject, collections.Mapping):
         except KeyError:
             node = ResourceNode(self, uri)
             self.resource_nodes[uri] = node
-            node.register_observer(self._on_node_update)
-            self.notify_observers(ResourceNodeAdded(node = node))
+            if self.repr is not None:
+                node.register_observer(self._on_node_update)
+                self.notify_observers(ResourceNodeAdded(node = node))
 
         return node
 
@@ -219,8 +245,9 @@ class Root(observer.Subject, collections.Mapping):
         except KeyError:
             node = BlankNode(self, id)
             self.blank_nodes[id] = node
-            node.register_observer(self._on_node_update)
-            self.notify_observers(BlankNodeAdded(node = node))
+            if self.repr is not None:
+                node.register_observer(self._on_node_update)
+                self.notify_observers(BlankNodeAdded(node = node))
 
         return node
 
@@ -255,12 +282,65 @@ class Root(observer.Subject, collections.Mapping):
         return len(self.resource_nodes)
     
 
+class LiteralPool(object):
+    """Intern pool for literal values and datatype URIs.
+
+    Metadata documents tend to repeat the same strings (creator names,
+    licence texts, dates), so when a Root is parsed with a pool all
+    equal values share one string object.
+
+    Statistics:
+
+    - lookups: number of values passed to intern()
+    - hits: number of values that were replaced by an already
+            pooled string
+    - saved_bytes: size of the duplicate strings that were replaced
+    - len(pool): number of distinct values
+    """
+
+    def __init__(self):
+        self._values = {}
+        self.lookups = 0
+        self.hits = 0
+        self.saved_bytes = 0
+
+    def intern(self, value):
+        """Return the pooled string equal to value, adding value to
+        the pool if it isn't known yet.  None is returned as is.
+        """
+
+        if value is None:
+            return None
+
+        self.lookups += 1
+        try:
+            shared = self._values[value]
+        except KeyError:
+            self._values[value] = value
+            return value
+
+        if shared is not value:
+            self.hits += 1
+            self.saved_bytes += sys.getsizeof(value)
+
+        return shared
+
+    def __len__(self):
+        return len(self._values)
+
+    def __str__(self):
+        return ('{0.__class__.__name__}({1} values, {0.lookups} lookups, '
+                '{0.hits} hits, {0.saved_bytes} bytes saved)'.format(self, len(self)))
+
+
 class URI(object):
     """Base class for representing different kinds of URIs.
 
     Must be immutable (TODO: figure out decorators for that.)
     """
 
+    __slots__ = ('uri', )
+
     def __init__(self, uri):
         self.uri = uri
 
@@ -282,16 +362,21 @@ class QName(URI):
 
     """
 
+    __slots__ = ('ns_uri', 'ns_prefix', 'local_name')
+
     def __init__(self, ns_uri, ns_prefix, local_name):
         self.ns_uri = ns_uri
         self.ns_prefix = ns_prefix
         self.local_name = local_name
-        if ns_prefix:
-            self.tag_name = ns_prefix + ':' + local_name
-        else:
-            self.tag_name = local_name
         super(QName, self).__init__(ns_uri + local_name)
 
+    @property
+    def tag_name(self):
+        if self.ns_prefix:
+            return self.ns_prefix + ':' + self.local_name
+        else:
+            return self.local_name
+
     def __eq__(self, other):
         if isinstance(other, QName):
             return self.ns_uri == other.ns_uri and \
@@ -308,6 +393,9 @@ class NodeID(URI):
     This isn't really an URI, but it's easier on users of the model if
     they can easily refer to it as that.
     """
+
+    __slots__ = ('node_id', 'external')
+
     def __init__(self, node_id):
         if node_id:
             self.node_id = node_id
@@ -325,23 +413,36 @@ class NodeID(URI):
             return '{0.__class__.__name__}(None)'.format(self)
 
 
-class Node(observer.Subject, object):
-    def __init__(self, root):
-        super(Node, self).__init__()
-        self.root = root
+#
+# Model objects use __slots__ to keep large graphs compact.  Lists
+# that are usually empty start out as the shared empty tuple and are
+# only created when something is added to them.
+#
+
+class Node(object):
+    __slots__ = ()
 
 
-class SubjectNode(Node, collections.Sequence):
+class SubjectNode(Node, observer.Subject):
+    """Common base for ResourceNode and BlankNode.
+
+    Supports the read-only sequence interface to access the predicates.
+    """
+
+    __slots__ = ('root', 'uri', 'reprs', 'predicates')
 
     def __init__(self, root, uri):
-        super(SubjectNode, self).__init__(root)
+        super(SubjectNode, self).__init__()
 
+        self.root = root
         self.uri = uri
-        self.reprs = []
-        self.predicates = []
+        self.reprs = ()
+        self.predicates = ()
         
     def _add_repr(self, repr):
         assert repr not in self.reprs
+        if not self.reprs:
+            self.reprs = []
         self.reprs.append(repr)
         repr.register_observer(self._on_repr_update)
 
@@ -352,7 +453,7 @@ class SubjectNode(Node, collections.Sequence):
             self._add_predicate(event.repr, event.predicate_uri, node)
 
         elif isinstance(event, PredicateLiteralReprAdded):
-            node = LiteralNode(self.root, event.repr, event.value, event.type_uri)
+            node = LiteralNode(event.repr, event.value, event.type_uri)
             self._add_predicate(event.repr, event.predicate_uri, node)
 
         elif isinstance(event, NodeReprRemoved):
@@ -364,6 +465,8 @@ class SubjectNode(Node, collections.Sequence):
     def _add_predicate(self, repr, uri, object):
         pred = Predicate(self.root, repr, uri, object)
         
+        if not self.predicates:
+            self.predicates = []
         self.predicates.append(pred)
         self.notify_observers(PredicateAdded(node = self, predicate = pred))
 
@@ -371,6 +474,19 @@ class SubjectNode(Node, collections.Sequence):
         pred.register_observer(self._on_predicate_update)
 
 
+    def _add_static_predicate(self, uri, object):
+        """Add a predicate to a node in a read-only model.  There is
+        no repr to listen to, so no events are sent.
+        """
+
+        pred = Predicate(self.root, None, uri, object)
+
+        if not self.predicates:
+            self.predicates = []
+        self.predicates.append(pred)
+        return pred
+
+
     def _repr_removed(self, r):
         r.unregister_observer(self._on_repr_update)
         self.reprs.remove(r)
@@ -400,19 +516,28 @@ class SubjectNode(Node, collections.Sequence):
 
 
     def add_predicate_literal(self, qname, value = '', type_uri = None):
+        if self.root.read_only:
+            raise ReadOnlyError('cannot add predicates to a read-only model')
+
         # This must be true, right?
         assert self.reprs
 
         self.reprs[0].add_predicate_literal(self, qname, value, type_uri)
 
     def add_predicate_blank(self, qname, node_id=None):
+        if self.root.read_only:
+            raise ReadOnlyError('cannot add predicates to a read-only model')
+
         # This must be true, right?
         assert self.reprs
 
         self.reprs[0].add_predicate_blank(self, qname, node_id)
 
     #
-    # Support read-only sequence interface to access the predicates
+    # Support read-only sequence interface to access the predicates.
+    # collections.Sequence can't be inherited since it would add a
+    # __dict__ to every node, so the mixin methods are spelled out
+    # here and the class is registered as a Sequence below.
     #
         
     def __getitem__(self, item):
@@ -424,9 +549,24 @@ class SubjectNode(Node, collections.Sequence):
     def __len__(self):
         return len(self.predicates)
 
+    def __contains__(self, pred):
+        return pred in self.predicates
+
+    def __reversed__(self):
+        return reversed(self.predicates)
+
+    def index(self, pred):
+        return self.predicates.index(pred)
+
+    def count(self, pred):
+        return self.predicates.count(pred)
+
+collections.Sequence.register(SubjectNode)
 
 
 class ResourceNode(SubjectNode):
+    __slots__ = ()
+
     REMOVED_EVENT = ResourceNodeRemoved
 
     def __str__(self):
@@ -442,6 +582,8 @@ class ResourceNode(SubjectNode):
 
 
 class BlankNode(SubjectNode):
+    __slots__ = ()
+
     REMOVED_EVENT = BlankNodeRemoved
 
     def __str__(self):
@@ -457,33 +599,35 @@ class BlankNode(SubjectNode):
 
 
 class LiteralNode(Node):
-    def __init__(self, root, repr, value, type_uri = None):
-        super(LiteralNode, self).__init__(root)
+    """The literal object of a predicate.
+
+    It shares the repr with its Predicate, which also keeps value and
+    type_uri up to date when the repr changes.  In a read-only model
+    repr is None.
+    """
+
+    __slots__ = ('repr', 'value', 'type_uri')
+
+    def __init__(self, repr, value, type_uri = None):
         self.repr = repr
         self.value = value
         self.type_uri = type_uri
 
-        repr.register_observer(self._on_repr_update)
-
     def set_value(self, value):
+        if self.repr is None:
+            raise ReadOnlyError('literal is not linked to a DOM')
         self.repr.set_literal_value(value)
 
 
     def set_type_uri(self, type_uri):
+        if self.repr is None:
+            raise ReadOnlyError('literal is not linked to a DOM')
         self.repr.set_datatype(type_uri)
 
-        
-    def _on_repr_update(self, event):
-        if isinstance(event, PredicateLiteralReprValueChanged):
-            assert self.repr.is_event_source(event)
-            self.value = event.value
 
-        elif isinstance(event, PredicateLiteralReprTypeChanged):
-            assert self.repr.is_event_source(event)
-            self.type_uri = event.type_uri
-            
+class Predicate(observer.Subject):
+    __slots__ = ('root', 'repr', 'uri', 'object')
 
-class Predicate(observer.Subject, object):
     def __init__(self, root, repr, uri, object):
         super(Predicate, self).__init__()
 
@@ -492,14 +636,12 @@ class Predicate(observer.Subject, object):
         self.uri = uri
         self.object = object
 
-        repr.register_observer(self._on_repr_update)
-
-        # As a special case, also listen on updates to literal nodes
-        # so we can propagate changes in its value to model observers
-        if isinstance(object, LiteralNode):
-            object.repr.register_observer(self._on_object_repr_update)
+        if repr is not None:
+            repr.register_observer(self._on_repr_update)
 
     def remove(self):
+        if self.repr is None:
+            raise ReadOnlyError('predicate is not linked to a DOM')
         self.repr.remove()
 
     def _on_repr_update(self, event):
@@ -513,28 +655,33 @@ class Predicate(observer.Subject, object):
             self.repr.unregister_observer(self._on_repr_update)
             self.repr = None
 
-            if isinstance(self.object, LiteralNode):
-                self.object.repr.unregister_observer(self._on_object_repr_update)
-
         elif isinstance(event, PredicateChangedToLiteralRepr):
-            if isinstance(self.object, LiteralNode):
-                self.object.repr.unregister_observer(self._on_object_repr_update)
-
-            self.object = LiteralNode(self.root, event.new_repr, event.value, event.type_uri)
-            self.object.repr.register_observer(self._on_object_repr_update)
-
+            self.object = LiteralNode(event.new_repr, event.value, event.type_uri)
             self._change_repr(event.new_repr)
             self.notify_observers(PredicateObjectChanged(
                     predicate = self, object = self.object))
 
         elif isinstance(event, PredicateChangedToNodeRepr):
-            if isinstance(self.object, LiteralNode):
-                self.object.repr.unregister_observer(self._on_object_repr_update)
-
             self.object = self.root._get_node(event.object_uri)
             self._change_repr(event.new_repr)
             self.notify_observers(PredicateObjectChanged(
                     predicate = self, object = self.object))
+
+        # A literal object shares our repr, so we also get its updates
+
+        elif isinstance(event, PredicateLiteralReprValueChanged):
+            assert isinstance(self.object, LiteralNode)
+            assert self.object.repr.is_event_source(event)
+            self.object.value = event.value
+            self.notify_observers(PredicateObjectChanged(
+                    predicate = self, object = self.object))
+
+        elif isinstance(event, PredicateLiteralReprTypeChanged):
+            assert isinstance(self.object, LiteralNode)
+            assert self.object.repr.is_event_source(event)
+            self.object.type_uri = event.type_uri
+            self.notify_observers(PredicateObjectChanged(
+                    predicate = self, object = self.object))
             
 
     def _change_repr(self, repr):
@@ -542,14 +689,6 @@ class Predicate(observer.Subject, object):
         self.repr = repr
         self.repr.register_observer(self._on_repr_update)
 
-    def _on_object_repr_update(self, event):
-        if (isinstance(event, PredicateLiteralReprValueChanged)
-            or isinstance(event, PredicateLiteralReprTypeChanged)):
-            assert self.object.repr.is_event_source(event)
-            self.notify_observers(
-                PredicateObjectChanged(
-                    predicate = self, object = self.object))
-
 
     def __str__(self):
         if isinstance(self.object, LiteralNode):
@@ -567,3 +706,217 @@ class Predicate(observer.Subject, object):
 
     def __repr__(self):
         return '<Predicate {0} at 0x{1:#x}>'.format(self.uri, id(self))
+
+
+#
+# Graph comparison and fingerprinting
+#
+
+class Triple(collections.namedtuple('Triple', 'subject predicate object')):
+    """A single statement in a model graph.
+
+    - subject: the SubjectNode
+    - predicate: the Predicate object
+    - object: the object node of the predicate
+    """
+    __slots__ = ()
+
+
+class Diff(collections.namedtuple('Diff', 'added removed')):
+    """The result of diff().
+
+    - added: list of Triples only found in the second graph
+    - removed: list of Triples only found in the first graph
+    """
+    __slots__ = ()
+
+
+def diff(root_a, root_b):
+    """Compare two model graphs, typically two revisions of the
+    metadata of the same asset, and return a Diff.
+
+    Blank nodes are matched by their structure rather than by their
+    node IDs, so blank nodes with generated IDs from NodeID(None) do
+    not show up as changes.  Both graphs are indexed by hashing, so
+    the cost is roughly linear in the number of triples.
+
+    A blank node whose own predicates changed gets a new structural
+    label, so all its triples (and the triples referring to it) are
+    reported as removed from root_a and added in root_b.
+    """
+
+    triples_a = list(_iter_triples(_root_nodes(root_a)))
+    triples_b = list(_iter_triples(_root_nodes(root_b)))
+
+    # A label depends on the number of refinement rounds, so the same
+    # number must be used for both graphs for unchanged blank nodes to
+    # get the same labels
+    labels_a, rounds_a = _blank_node_labels(triples_a)
+    labels_b, rounds_b = _blank_node_labels(triples_b)
+    if rounds_a < rounds_b:
+        labels_a, rounds_a = _blank_node_labels(triples_a, rounds_b)
+    elif rounds_b < rounds_a:
+        labels_b, rounds_b = _blank_node_labels(triples_b, rounds_a)
+
+    keys_a = _triple_keys(triples_a, labels_a)
+    keys_b = _triple_keys(triples_b, labels_b)
+
+    counts_a = collections.Counter(keys_a)
+    counts_b = collections.Counter(keys_b)
+
+    return Diff(added = _unmatched(triples_b, keys_b, counts_a),
+                removed = _unmatched(triples_a, keys_a, counts_b))
+
+
+def fingerprint(graph):
+    """Return a canonical hash of a graph as a hex string, suitable as
+    a cache key or for finding duplicated metadata.
+
+    graph is either a Root, or a SubjectNode in which case only the
+    subgraph reachable from that node is included.
+
+    The hash does not depend on blank node IDs, the order of
+    predicates or the namespace prefixes used in the RDF/XML.
+    Repeated triples only count once.
+    """
+
+    if isinstance(graph, SubjectNode):
+        nodes = _reachable_nodes(graph)
+    else:
+        nodes = _root_nodes(graph)
+
+    triples = list(_iter_triples(nodes))
+    labels, rounds = _blank_node_labels(triples)
+    keys = _triple_keys(triples, labels)
+    digests = set(_digest(*(subject + (pred_uri, ) + object))
+                  for subject, pred_uri, object in keys)
+
+    return _digest(*sorted(digests))
+
+
+def _root_nodes(root):
+    nodes = list(root.resource_nodes.values())
+    nodes.extend(root.blank_nodes.values())
+    return nodes
+
+
+def _reachable_nodes(start):
+    nodes = [start]
+    seen = set(nodes)
+    for node in nodes:
+        for pred in node:
+            obj = pred.object
+            if isinstance(obj, SubjectNode) and obj not in seen:
+                seen.add(obj)
+                nodes.append(obj)
+    return nodes
+
+
+def _iter_triples(nodes):
+    for node in nodes:
+        for pred in node:
+            yield Triple(node, pred, pred.object)
+
+
+def _unmatched(triples, keys, other_counts):
+    """Return the triples whose keys are not matched by other_counts,
+    preserving the order of triples.  Repeated triples are matched
+    one by one.
+    """
+
+    result = []
+    for triple, key in zip(triples, keys):
+        if other_counts[key] > 0:
+            other_counts[key] -= 1
+        else:
+            result.append(triple)
+    return result
+
+
+def _triple_keys(triples, labels):
+    """Return a list of hashable keys, one for each triple, that are
+    independent of blank node IDs and namespace prefixes.  labels are
+    the blank node labels from _blank_node_labels().
+    """
+
+    return [(_term(t.subject, labels),
+             _uri_text(t.predicate.uri),
+             _term(t.object, labels))
+            for t in triples]
+
+
+def _blank_node_labels(triples, min_rounds = 0):
+    """Return (labels, rounds), where labels is a dict mapping each
+    BlankNode in triples to a label derived from its structure instead
+    of its node ID.
+
+    This refines the labels iteratively: each round hashes the
+    predicates going in and out of a blank node, using the labels from
+    the previous round for any neighbouring blank nodes.  This stops
+    when a round no longer splits any group of equally labelled nodes,
+    which for typical metadata happens after a few rounds, but not
+    before min_rounds rounds.
+
+    After n rounds a label only depends on the part of the graph
+    within n predicates of the node.  Labels from two graphs can
+    therefore only be compared if the same number of rounds, returned
+    in rounds, was used for both.
+    """
+
+    edges = collections.defaultdict(list)
+    for t in triples:
+        pred_uri = _uri_text(t.predicate.uri)
+        if isinstance(t.subject, BlankNode):
+            edges[t.subject].append((u'>', pred_uri, t.object))
+        if isinstance(t.object, BlankNode):
+            edges[t.object].append((u'<', pred_uri, t.subject))
+
+    if not edges:
+        return {}, 0
+
+    labels = dict.fromkeys(edges, u'')
+    count = 1
+    rounds = 0
+
+    while True:
+        new_labels = {}
+        for node, node_edges in edges.items():
+            signature = sorted(
+                _digest(direction, pred_uri, *_term(other, labels))
+                for direction, pred_uri, other in node_edges)
+            new_labels[node] = _digest(labels[node], *signature)
+
+        labels = new_labels
+        rounds += 1
+        new_count = len(set(labels.values()))
+        if new_count == count and rounds >= min_rounds:
+            return labels, rounds
+        count = new_count
+
+
+def _term(node, blank_labels):
+    """Return a tuple of strings identifying node, using blank_labels
+    for blank nodes.
+    """
+
+    if isinstance(node, LiteralNode):
+        return (u'L', node.value, _uri_text(node.type_uri) or u'')
+    elif isinstance(node, BlankNode):
+        return (u'B', blank_labels[node])
+    else:
+        return (u'R', _uri_text(node.uri))
+
+
+def _uri_text(uri):
+    """Return the plain URI string, ignoring any QName prefix."""
+    if isinstance(uri, URI):
+        return uri.uri
+    return uri
+
+
+def _digest(*parts):
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
@@ -7,9 +7,22 @@
 # Distributed under an GPLv2 license, please see LICENSE in the top dir.
 
 
+from . import domwrapper
+
+# Marks a missing entry, since None is a valid prefix
+_missing = object()
+
+
 class Namespaces(object):
     """Keep track of namespaces scope for each element
     and update it as necessary.
+
+    Each scope maps both ways between URIs and prefixes declared in
+    it, and memoises the prefixes found further up the tree.  All the
+    scopes under one root share a generation counter that is bumped
+    whenever an xmlns attribute changes on any of their elements,
+    which makes every scope reread its declarations and drop its
+    memoised lookups on the next call.
     """
 
     def __init__(self, parent, element):
@@ -18,14 +31,29 @@ class Namespaces(object):
 
         self.parent = parent
         self.element = element
-        self.uri_prefix_map = {}
 
         if parent is None:
+            self._tracker = _DeclarationTracker()
+        else:
+            self._tracker = parent._tracker
+
+        self._load()
+
+
+    def _load(self):
+        self.uri_prefix_map = {}
+        self.prefix_uri_map = {}
+
+        # Prefixes for URIs resolved by the parent scopes
+        self._resolved = {}
+        self._generation = self._tracker.generation
+
+        if self.parent is None:
             # Grab everything up to root
-            self._populate(element, None)
+            self._populate(self.element, None)
         else:
             # Grab everything up to parent element
-            self._populate(element, parent.element)
+            self._populate(self.element, self.parent.element)
 
 
     def _populate(self, element, stop_element):
@@ -44,13 +72,34 @@ class Namespaces(object):
         if attrs is None:
             return
 
+        self._tracker.watch(element)
+
         # Add all attributes
         for (name, value) in attrs.items():
             if name.startswith('xmlns:'):
-                self.uri_prefix_map[value] = name[6:]
+                self._bind(value, name[6:])
             elif name == 'xmlns':
-                self.uri_prefix_map[value] = None
-                
+                self._bind(value, None)
+
+
+    def _bind(self, uri, prefix):
+        # A redeclared prefix hides whatever URI it meant further up
+        old_uri = self.prefix_uri_map.get(prefix, _missing)
+        if old_uri is not _missing and old_uri != uri:
+            del self.uri_prefix_map[old_uri]
+
+        old_prefix = self.uri_prefix_map.get(uri, _missing)
+        if old_prefix is not _missing and old_prefix != prefix:
+            del self.prefix_uri_map[old_prefix]
+
+        self.uri_prefix_map[uri] = prefix
+        self.prefix_uri_map[prefix] = uri
+
+
+    def _refresh(self):
+        if self._generation != self._tracker.generation:
+            self._load()
+
                 
     def get_prefix(self, uri, preferred_prefix):
         """Return a prefix for URI in the current scope.
@@ -63,11 +112,17 @@ class Namespaces(object):
         
         assert preferred_prefix, 'prefix must be non-empty'
 
+        self._refresh()
+
         try:
             return self.uri_prefix_map[uri]
         except KeyError:
             pass
 
+        try:
+            return self._resolved[uri]
+        except KeyError:
+            pass
 
         # Recurse if we have a parent
         if self.parent:
@@ -79,24 +134,162 @@ class Namespaces(object):
             new_prefix = self._check_prefix(prefix)
             if new_prefix != prefix:
                 prefix = new_prefix
-                self.uri_prefix_map[uri] = prefix
-                self.element.setAttribute('xmlns:' + prefix, uri)
+                self._declare(uri, prefix)
+            elif self._generation == self._tracker.generation:
+                self._resolved[uri] = prefix
             
             return prefix
 
         else:
             # Reached root, so add namespace to this scope and element
             prefix = self._check_prefix(preferred_prefix)
-            self.uri_prefix_map[uri] = prefix
-            self.element.setAttribute('xmlns:' + prefix, uri)
+            self._declare(uri, prefix)
             return prefix
 
 
     def _check_prefix(self, preferred_prefix):
-        prefix = preferred_prefix
-        c = 1
-        while prefix in self.uri_prefix_map.itervalues():
+        if preferred_prefix not in self.prefix_uri_map:
+            return preferred_prefix
+
+        c = 2
+        while preferred_prefix + str(c) in self.prefix_uri_map:
             c += 1
-            prefix = preferred_prefix + str(c)
 
-        return prefix
+        return preferred_prefix + str(c)
+
+
+    def _declare(self, uri, prefix):
+        # Setting the attribute bumps the generation, but this scope
+        # can be brought up to date directly.  The new prefix may hide
+        # one that was resolved further up.
+        self.element.setAttribute('xmlns:' + prefix, uri)
+        self._bind(uri, prefix)
+        self._resolved = {}
+        self._generation = self._tracker.generation
+
+
+def consolidate(root_element):
+    """Remove redundant namespace declarations below root_element,
+    hoisting them to root_element where that is safe.
+
+    A prefixed declaration is hoisted if the prefix is not in scope at
+    root_element and is bound to the same URI wherever it is declared
+    below it.  Declarations that only repeat what is already in scope
+    are removed.  The default namespace is never hoisted.
+
+    All changes are made with domwrapper.change_attributes(), sending
+    a single AttributesChanged event to root_element.
+
+    Returns the number of declarations removed below root_element.
+    """
+
+    scope = in_scope(root_element)
+
+    # Find all prefix bindings below the root
+    bindings = {}
+    for element in _iter_subelements(root_element):
+        for prefix, uri in _declarations(element):
+            bindings.setdefault(prefix, set()).add(uri)
+
+    changes = []
+    for prefix, uris in sorted(bindings.items()):
+        if prefix is not None and prefix not in scope and len(uris) == 1:
+            uri = uris.pop()
+            scope[prefix] = uri
+            changes.append((root_element, 'xmlns:' + prefix, uri))
+
+    removed = _remove_redundant(root_element, scope, changes)
+
+    domwrapper.change_attributes(root_element, changes)
+    return removed
+
+
+def in_scope(element):
+    """Return a dict mapping the prefixes in scope at element to
+    their URIs.  The default namespace has the prefix None.
+    """
+
+    chain = []
+    while element is not None and element.nodeType == element.ELEMENT_NODE:
+        chain.append(element)
+        element = element.parentNode
+
+    scope = {}
+    for element in reversed(chain):
+        scope.update(_declarations(element))
+
+    return scope
+
+
+def _remove_redundant(element, scope, changes):
+    removed = 0
+
+    for child in element.childNodes:
+        if child.nodeType != child.ELEMENT_NODE:
+            continue
+
+        child_scope = scope
+        for prefix, uri in _declarations(child):
+            if scope.get(prefix, _missing) == uri:
+                if prefix is None:
+                    changes.append((child, 'xmlns', None))
+                else:
+                    changes.append((child, 'xmlns:' + prefix, None))
+                removed += 1
+            else:
+                if child_scope is scope:
+                    child_scope = dict(scope)
+                child_scope[prefix] = uri
+
+        removed += _remove_redundant(child, child_scope, changes)
+
+    return removed
+
+
+def _declarations(element):
+    """Return (prefix, uri) for the namespace declarations on element."""
+
+    result = []
+    for name, value in element.attributes.items():
+        if name.startswith('xmlns:'):
+            result.append((name[6:], value))
+        elif name == 'xmlns':
+            result.append((None, value))
+    return result
+
+
+def _iter_subelements(element):
+    for child in element.childNodes:
+        if child.nodeType == child.ELEMENT_NODE:
+            yield child
+            for sub in _iter_subelements(child):
+                yield sub
+
+
+class _DeclarationTracker(object):
+    """Count changes to xmlns attributes on the elements of a set of
+    scopes.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self._watched = set()
+
+    def watch(self, element):
+        if element not in self._watched:
+            domwrapper.wrap(element)
+            element.register_observer(self._on_dom_update)
+            self._watched.add(element)
+
+    def _on_dom_update(self, event):
+        if isinstance(event, (domwrapper.AttributeSet, domwrapper.AttributeRemoved)):
+            if _is_declaration(event.attr.name):
+                self.generation += 1
+
+        elif isinstance(event, domwrapper.AttributesChanged):
+            if any(_is_declaration(name) for _, name, _, _ in event.changes):
+                self.generation += 1
+
+
+def _is_declaration(name):
+    return name == 'xmlns' or name.startswith('xmlns:')
@@ -18,12 +18,19 @@ class Event(object):
 
 
 class Subject(object):
+    # Most subjects never have more than a few observers and never
+    # queue anything, so the lists are only created when needed.
+    # Until then they are the shared empty tuple.
+
+    __slots__ = ('_observers', '_pending_deletions', '_pending_additions',
+                 '_pending_events', '_notification_in_progress')
+
     def __init__(self):
         super(Subject, self).__init__()
-        self._observers = []
-        self._pending_deletions = []
-        self._pending_additions = []
-        self._pending_events = []
+        self._observers = ()
+        self._pending_deletions = ()
+        self._pending_additions = ()
+        self._pending_events = ()
         self._notification_in_progress = False
 
     def register_observer(self, observer):
@@ -38,8 +45,12 @@ class Subject(object):
 
         if self._notification_in_progress:
             assert observer not in self._pending_additions
+            if not self._pending_additions:
+                self._pending_additions = []
             self._pending_additions.append(observer)
         else:
+            if not self._observers:
+                self._observers = []
             self._observers.append(observer)
             
 
@@ -55,6 +66,8 @@ class Subject(object):
             assert (observer in self._observers
                     or observer in self._pending_additions)
 
+            if not self._pending_deletions:
+                self._pending_deletions = []
             self._pending_deletions.append(observer)
         else:
             assert observer in self._observers
@@ -69,6 +82,8 @@ class Subject(object):
         """
 
         if self._notification_in_progress:
+            if not self._pending_events:
+                self._pending_events = []
             self._pending_events.append(event)
             return
         
@@ -89,13 +104,16 @@ class Subject(object):
         # Process additions and deletions that resulted from this event
 
         if self._pending_additions:
-            self._observers.extend(self._pending_additions)
-            del self._pending_additions[:]
+            if self._observers:
+                self._observers.extend(self._pending_additions)
+            else:
+                self._observers = self._pending_additions
+            self._pending_additions = ()
 
         if self._pending_deletions:
             for obs in self._pending_deletions:
                 self._observers.remove(obs)
-            del self._pending_deletions[:]
+            self._pending_deletions = ()
                 
         # Process any further events that resulted from this event.
         # Doing it recursively is easier, and also means that if the
@@ -104,6 +122,8 @@ class Subject(object):
 
         if self._pending_events:
             ev = self._pending_events.pop(0)
+            if not self._pending_events:
+                self._pending_events = ()
             self.notify_observers(ev)
 
 
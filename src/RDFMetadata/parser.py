@@ -21,9 +21,25 @@ class RDFXMLError(Exception):
         super(RDFXMLError, self).__init__(msg)
 
 
-def parse_RDFXML(doc, root_element, strict = True):
+def parse_RDFXML(doc, root_element, strict = True, intern_literals = False,
+                 read_only = False):
+    """Parse the RDF/XML in root_element and return a model.Root.
+
+    By default the model is linked to the DOM, so changes to one are
+    reflected in the other.  If read_only is True the model is instead
+    built directly from the DOM without any links to it, which is much
+    faster and uses less memory, but the model cannot be changed.
+    """
+
+    if read_only:
+        ro_parser = ReadOnlyParser(root_element, strict = strict,
+                                   intern_literals = intern_literals)
+        return ro_parser.parse()
+
     repr_root = domrepr.Root(doc, root_element)
-    return repr_root.parse_into_model(strict = strict)
+    repr_root.parser = RDFXMLParser(repr_root)
+    return repr_root.parse_into_model(strict = strict,
+                                      intern_literals = intern_literals)
 
 
 class RDFXMLParser(object):
@@ -201,7 +217,7 @@ class RDFXMLParser(object):
         assert len(text_nodes) < 2
         
         if text_nodes:
-            text = text_nodes[0].data
+            text = self.repr_root.intern_text(text_nodes[0])
             self.parse_literal_property_element(parent, element, text, reparsing)
         else:
             self.parse_empty_property_element(parent, element, reparsing)
@@ -254,7 +270,9 @@ class RDFXMLParser(object):
         ns = parent.get_child_ns(element)
 
         type_uri = element.getAttributeNS(RDF_NS, 'datatype')
-        if not type_uri:
+        if type_uri:
+            type_uri = self.repr_root.intern_uri(type_uri)
+        else:
             type_uri = None
             
         # TODO: xml:lang
@@ -371,6 +389,166 @@ class RDFXMLParser(object):
         parent.notify_observers(event)
 
 
+class ReadOnlyParser(object):
+    """Parse RDFXML directly into a read-only model.Root.
+
+    This follows the same grammar as RDFXMLParser, but does not wrap
+    the DOM nodes or create any domrepr objects.  The DOM is not
+    modified, and the resulting model is not linked to it.
+    """
+
+    def __init__(self, root_element, strict = True, intern_literals = False):
+        self.root_element = root_element
+        self.strict = strict
+
+        if intern_literals:
+            pool = model.LiteralPool()
+        else:
+            pool = None
+
+        self.model_root = model.Root(None, pool)
+
+        # QNames are immutable, so share them between predicates
+        self.qnames = {}
+
+        rdf_prefix = lookup_ns_prefix(root_element, RDF_NS)
+        self.rdf_type = model.QName(RDF_NS, rdf_prefix or 'rdf', 'type')
+
+
+    def parse(self):
+        """Parse all nodes under the root element and return the model."""
+
+        root_element_is_rdf = is_rdf_element(self.root_element, 'RDF')
+
+        for el in iter_subelements(self.root_element):
+            # Only use typed nodes when in rdf:RDF
+            if root_element_is_rdf or is_rdf_element(el, 'Description'):
+                self.parse_node_element(el, top_level = True)
+
+        return self.model_root
+
+
+    def parse_node_element(self, element, top_level = False):
+        """Parse a nodeElement and return its SubjectNode.
+        """
+
+        root = self.model_root
+
+        fragment_id = element.getAttributeNS(RDF_NS, 'ID')
+        node_id = element.getAttributeNS(RDF_NS, 'nodeID')
+        about = element.getAttributeNS(RDF_NS, 'about')
+
+        if fragment_id:
+            # TODO: turn ID into an about
+            assert False, 'not implemented yet'
+            return None
+
+        if node_id:
+            if self.strict and about:
+                raise RDFXMLError('specifying rdf:nodeID on a non-blank node', element)
+
+            node = root._get_blank_node(model.NodeID(node_id))
+
+        elif about:
+            node = root._get_resource_node(about)
+
+        elif top_level:
+            # treat this as an empty rdf:about
+            node = root._get_resource_node("")
+
+        else:
+            # internally generated node ID
+            node = root._get_blank_node(model.NodeID(None))
+
+        if not is_rdf_element(element, 'Description'):
+            # Typed node: add the implied rdf:type predicate
+            type_node = root._get_resource_node(self.get_element_uri(element))
+            node._add_static_predicate(self.rdf_type, type_node)
+
+        for el in iter_subelements(element):
+            self.parse_property_element(node, el)
+
+        return node
+
+
+    def parse_property_element(self, node, element):
+        """Parse a propertyElt and add it to node.
+        """
+
+        root = self.model_root
+        pool = root.literal_pool
+
+        element_nodes = [n for n in element.childNodes if n.nodeType == n.ELEMENT_NODE]
+
+        if element_nodes:
+            # resourcePropertyElt
+            if self.strict and len(element_nodes) > 1:
+                raise RDFXMLError('more than one sub-element in a predicate',
+                                  element)
+
+            obj = self.parse_node_element(element_nodes[0])
+
+        else:
+            text_nodes = [n for n in element.childNodes if n.nodeType == n.TEXT_NODE]
+
+            if text_nodes:
+                # literalPropertyElt.  Don't normalize() the element,
+                # since that would modify the DOM.
+                if len(text_nodes) == 1:
+                    text = text_nodes[0].data
+                else:
+                    text = u''.join(n.data for n in text_nodes)
+
+                type_uri = element.getAttributeNS(RDF_NS, 'datatype') or None
+
+                if pool is not None:
+                    text = pool.intern(text)
+                    type_uri = pool.intern(type_uri)
+
+                obj = model.LiteralNode(None, text, type_uri)
+
+            else:
+                # emptyPropertyElt
+                resource_uri = element.getAttributeNS(RDF_NS, 'resource')
+                node_id = element.getAttributeNS(RDF_NS, 'nodeID')
+
+                if resource_uri and node_id and self.strict:
+                    raise RDFXMLError('both rdf:resource and rdf:nodeID attributes',
+                                      element)
+
+                if resource_uri:
+                    obj = root._get_resource_node(resource_uri)
+                elif node_id:
+                    obj = root._get_blank_node(model.NodeID(node_id))
+                else:
+                    obj = model.LiteralNode(None, '', None)
+
+        node._add_static_predicate(self.get_element_uri(element), obj)
+
+
+    def get_element_uri(self, element):
+        key = (element.namespaceURI, element.prefix, element.localName)
+        try:
+            return self.qnames[key]
+        except KeyError:
+            qname = self.qnames[key] = model.QName(*key)
+            return qname
+
+
+def lookup_ns_prefix(element, uri):
+    """Return the prefix declared for namespace URI in the scope of
+    element, without modifying the DOM, or None if there isn't one.
+    """
+
+    while element is not None and element.nodeType == element.ELEMENT_NODE:
+        for name, value in element.attributes.items():
+            if value == uri and name.startswith('xmlns:'):
+                return name[6:]
+        element = element.parentNode
+
+    return None
+
+
 def iter_subelements(element):
     """Return an iterator over all child nodes that are elements"""
 
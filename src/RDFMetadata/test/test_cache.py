@@ -0,0 +1,156 @@
+# test_cache - Test the persistent parse cache
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+from xml.dom import minidom
+
+from .. import cache, model, parser
+
+XML = '''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:dc="http://purl.org/dc/elements/1.1/"
+         xmlns:cc="http://creativecommons.org/ns#">
+  <cc:Work rdf:about="">
+    <dc:title>Test title</dc:title>
+    <dc:date rdf:datatype="http://www.w3.org/2001/XMLSchema#date">2013-01-01</dc:date>
+    <dc:creator>
+      <rdf:Description>
+        <cc:attributionName>Test Person</cc:attributionName>
+      </rdf:Description>
+    </dc:creator>
+    <dc:contributor rdf:nodeID="1" />
+    <cc:license rdf:resource="http://creativecommons.org/licenses/by/3.0/" />
+  </cc:Work>
+
+  <rdf:Description rdf:nodeID="1">
+    <dc:title>Test</dc:title>
+  </rdf:Description>
+</rdf:RDF>
+'''
+
+def get_root(xml):
+    doc = minidom.parseString(xml)
+    return parser.parse_RDFXML(doc = doc, root_element = doc.documentElement)
+
+
+class TestSerialize(unittest.TestCase):
+    def test_roundtrip(self):
+        r = get_root(XML)
+        r2 = cache.deserialize(cache.serialize(r))
+
+        self.assertTrue(r2.read_only)
+        self.assertEqual(sorted(r), sorted(r2))
+
+        d = model.diff(r, r2)
+        self.assertEqual(d.added, [])
+        self.assertEqual(d.removed, [])
+
+        # External node IDs are kept
+        self.assertIn('_:1', r2.blank_nodes)
+
+        # Prefixes are kept
+        pred = r2[''][1]
+        self.assertEqual(pred.uri.tag_name, 'dc:title')
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_hit_and_miss(self):
+        c = cache.ParseCache(self.dir)
+        doc = minidom.parseString(XML)
+
+        r1 = c.parse_element(doc, doc.documentElement)
+        self.assertEqual((c.hits, c.misses), (0, 1))
+        self.assertEqual(len(c), 1)
+
+        r2 = c.parse_element(doc, doc.documentElement)
+        self.assertEqual((c.hits, c.misses), (1, 1))
+        self.assertIsNot(r1, r2)
+        self.assertEqual(model.fingerprint(r1), model.fingerprint(r2))
+
+        # A new cache object finds the entry on disk
+        c = cache.ParseCache(self.dir)
+        key = c.content_key(XML.encode('utf-8'))
+        self.assertIsNone(c.get(key))
+
+        c.put(key, [('test', r1)])
+        name, r3 = c.get(key)[0]
+        self.assertEqual(name, 'test')
+        self.assertEqual(model.fingerprint(r1), model.fingerprint(r3))
+        self.assertEqual((c.hits, c.misses), (1, 1))
+
+
+    def test_damaged_entry(self):
+        r = get_root(XML)
+
+        c = cache.ParseCache(self.dir)
+        c.put('a', [(None, r)])
+
+        path = os.path.join(self.dir, 'a.cache')
+        with open(path, 'r+b') as f:
+            f.truncate(20)
+
+        self.assertIsNone(c.get('a'))
+        self.assertEqual((c.hits, c.misses), (0, 1))
+        self.assertEqual(len(c), 0)
+        self.assertFalse(os.path.exists(path))
+
+        # Bad data that decompresses fine
+        c.put('b', [(None, r)])
+        with open(os.path.join(self.dir, 'b.cache'), 'wb') as f:
+            f.write(zlib.compress(b'not marshal data'))
+
+        self.assertIsNone(c.get('b'))
+        self.assertEqual((c.hits, c.misses), (0, 2))
+
+
+    def test_failed_put(self):
+        c = cache.ParseCache(self.dir)
+        self.assertRaises(AttributeError, c.put, 'a', [(None, None)])
+
+        # The temporary file is removed, and the entry not added
+        self.assertEqual(os.listdir(self.dir), [])
+        self.assertEqual(len(c), 0)
+
+
+    def test_file_key(self):
+        data = XML.encode('utf-8') * 1000
+        self.assertEqual(cache.ParseCache.file_key(io.BytesIO(data)),
+                         cache.ParseCache.content_key(data))
+
+
+    def test_lru_eviction(self):
+        r = get_root(XML)
+
+        c = cache.ParseCache(self.dir)
+        c.put('a', [(None, r)])
+        entry_size = os.path.getsize(os.path.join(self.dir, 'a.cache'))
+
+        c.max_bytes = entry_size * 2
+        c.put('b', [(None, r)])
+
+        # Use a, so b is evicted next
+        self.assertIsNotNone(c.get('a'))
+
+        c.put('c', [(None, r)])
+        self.assertEqual(c.evictions, 1)
+        self.assertEqual(len(c), 2)
+        self.assertIsNotNone(c.get('a'))
+        self.assertIsNone(c.get('b'))
+        self.assertIsNotNone(c.get('c'))
+        self.assertFalse(os.path.exists(os.path.join(self.dir, 'b.cache')))
@@ -0,0 +1,87 @@
+# test_compression - Test streaming gzip support
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+import io
+import os
+import re
+import sys
+import gzip
+import unittest
+import subprocess
+
+from .. import compression, locate
+from .test_locate import SVG
+
+
+def compress(data):
+    f = io.BytesIO()
+    with compression.writer(f) as gz:
+        gz.write(data)
+    return f.getvalue()
+
+
+class TestCompression(unittest.TestCase):
+    def test_detect(self):
+        f = io.BytesIO(compress(SVG))
+        f.seek(0)
+        self.assertTrue(compression.is_compressed(f))
+        self.assertEqual(f.tell(), 0)
+
+        self.assertFalse(compression.is_compressed(io.BytesIO(SVG)))
+
+        self.assertTrue(compression.is_compressed_name('drawing.SVGZ'))
+        self.assertFalse(compression.is_compressed_name('drawing.svg'))
+
+
+    def test_round_trip(self):
+        data = compress(SVG)
+        self.assertEqual(gzip.GzipFile(fileobj = io.BytesIO(data)).read(), SVG)
+        self.assertEqual(compression.reader(io.BytesIO(data)).read(), SVG)
+
+
+    def test_decompress_stream(self):
+        data = compress(SVG) + compress(SVG)
+        chunks = [data[i:i + 100] for i in range(0, len(data), 100)]
+        self.assertEqual(b''.join(compression.decompress_stream(chunks)), SVG * 2)
+
+
+    def test_splice(self):
+        # Scanning, parsing and splicing all work on the decompressed data
+        f = compression.reader(io.BytesIO(compress(SVG)))
+        locations = locate.find_rdf(f)
+        rdf = locate.parse_location(f, locations[0])
+
+        out = io.BytesIO()
+        with compression.writer(out) as gz:
+            locate.splice(f, gz, [(locations[0].start, locations[0].end,
+                                   locate.serialize_element(rdf, 'utf-8'))])
+
+        data = compression.reader(io.BytesIO(out.getvalue())).read()
+        self.assertEqual(len(locate.find_rdf(io.BytesIO(data))), 3)
+        self.assertEqual(data[:locations[0].start], SVG[:locations[0].start])
+        self.assertEqual(data[-100:], SVG[-100:])
+
+
+class TestRDFXMLToTriples(unittest.TestCase):
+    script = os.path.join(os.path.dirname(__file__), '..', '..',
+                          'rdfxml_to_triples.py')
+
+    def run_script(self, data):
+        proc = subprocess.Popen([sys.executable, self.script],
+                                stdin = subprocess.PIPE, stdout = subprocess.PIPE)
+        out, err = proc.communicate(data)
+        self.assertEqual(proc.returncode, 0)
+
+        # Blank node IDs are random
+        return sorted(re.sub(br'_:[-0-9a-f]{36}', b'_:x', out).splitlines())
+
+
+    def test_compressed_pipe(self):
+        expected = self.run_script(SVG)
+        self.assertIn(b'### /svg/metadata/rdf:RDF', expected)
+        self.assertEqual(self.run_script(compress(SVG)), expected)
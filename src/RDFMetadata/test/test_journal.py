@@ -0,0 +1,169 @@
+# test_journal - Test undo and redo of model changes
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+import unittest
+from xml.dom import minidom
+
+from .. import parser, model, journal
+
+XML = '''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:dc="http://purl.org/dc/elements/1.1/"
+         xmlns:cc="http://creativecommons.org/ns#">
+  <cc:Work rdf:about="">
+    <dc:title>Test title</dc:title>
+    <dc:creator>
+      <rdf:Description>
+        <cc:attributionName>Test Person</cc:attributionName>
+      </rdf:Description>
+    </dc:creator>
+    <cc:license rdf:resource="http://creativecommons.org/licenses/by/3.0/" />
+  </cc:Work>
+</rdf:RDF>
+'''
+
+DC_NS = 'http://purl.org/dc/elements/1.1/'
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.doc = minidom.parseString(XML)
+        self.root = parser.parse_RDFXML(doc = self.doc,
+                                        root_element = self.doc.documentElement)
+        self.journal = journal.Journal(self.root)
+
+        self.orig_xml = self.doc.toxml()
+        self.orig_graph = model.fingerprint(self.root)
+
+    def tearDown(self):
+        self.journal.close()
+
+    def assertOriginal(self):
+        self.assertEqual(self.doc.toxml(), self.orig_xml)
+        self.assertEqual(model.fingerprint(self.root), self.orig_graph)
+
+
+    def test_add_predicate(self):
+        res = self.root['']
+        res.add_predicate_literal(model.QName(DC_NS, 'dc', 'date'), '2013')
+        self.assertEqual(len(res), 5)
+        changed_xml = self.doc.toxml()
+
+        self.assertTrue(self.journal.can_undo())
+        self.journal.undo()
+        self.assertEqual(len(res), 4)
+        self.assertOriginal()
+
+        self.assertTrue(self.journal.can_redo())
+        self.journal.redo()
+        self.assertEqual(len(res), 5)
+        self.assertEqual(res[4].object.value, '2013')
+        self.assertEqual(self.doc.toxml(), changed_xml)
+
+
+    def test_add_predicate_new_namespace(self):
+        res = self.root['']
+        with self.journal.transaction('add'):
+            res.add_predicate_literal(model.QName('urn:new#', 'new', 'thing'), 'x')
+
+        self.assertEqual(len(self.journal.undo_steps), 1)
+        self.journal.undo()
+        self.assertOriginal()
+
+
+    def test_remove_predicates(self):
+        res = self.root['']
+
+        # Remove the blank node and the implied rdf:type, which
+        # changes the cc:Work element into an rdf:Description
+        with self.journal.transaction():
+            res[2].remove()
+            res[0].remove()
+
+        # The resource node is recreated for the new element
+        self.assertEqual(len(self.root['']), 2)
+        self.assertEqual(len(self.root.blank_nodes), 0)
+        changed_xml = self.doc.toxml()
+
+        self.journal.undo()
+        self.assertOriginal()
+        self.assertEqual(len(self.root['']), 4)
+        self.assertEqual(len(self.root.blank_nodes), 1)
+
+        self.journal.redo()
+        self.assertEqual(len(self.root['']), 2)
+        self.assertEqual(self.doc.toxml(), changed_xml)
+
+
+    def test_coalesce_literal_edits(self):
+        literal = self.root[''][1].object
+
+        for text in ['T', 'Te', 'Tes', 'Test', '']:
+            literal.set_value(text)
+        literal.set_value('Test!')
+
+        self.assertEqual(len(self.journal.undo_steps), 1)
+        self.assertEqual(len(self.journal.undo_steps[0].ops), 2)
+
+        self.journal.undo()
+        self.assertOriginal()
+        self.assertEqual(self.root[''][1].object.value, 'Test title')
+
+        self.journal.redo()
+        self.assertEqual(self.root[''][1].object.value, 'Test!')
+
+        # Datatype changes are separate steps, and stop coalescing
+        self.root[''][1].object.set_type_uri('test:type')
+        self.root[''][1].object.set_value('Test?')
+        self.assertEqual(len(self.journal.undo_steps), 3)
+
+        self.journal.undo()
+        self.journal.undo()
+        self.assertIsNone(self.root[''][1].object.type_uri)
+        self.journal.undo()
+        self.assertOriginal()
+
+
+    def test_new_change_drops_redo(self):
+        literal = self.root[''][1].object
+        literal.set_value('A')
+        self.journal.undo()
+        self.assertTrue(self.journal.can_redo())
+
+        self.root[''][2].remove()
+        self.assertFalse(self.journal.can_redo())
+
+
+    def test_memory_cap(self):
+        self.journal.max_bytes = 1
+
+        res = self.root['']
+        res.add_predicate_literal(model.QName(DC_NS, 'dc', 'date'), '2013')
+        res.add_predicate_literal(model.QName(DC_NS, 'dc', 'date'), '2014')
+
+        # Only the last step is kept
+        self.assertEqual(len(self.journal.undo_steps), 1)
+        self.journal.undo()
+        self.assertFalse(self.journal.can_undo())
+        self.assertEqual(len(res), 5)
+
+
+    def test_consolidate_namespaces(self):
+        res = self.root['']
+        res[2].object.add_predicate_literal(model.QName('urn:x#', 'x', 'foo'), 'a')
+        self.root.repr.consolidate_namespaces()
+        changed_xml = self.doc.toxml()
+
+        self.journal.undo()
+        self.assertNotEqual(self.doc.toxml(), changed_xml)
+        self.journal.redo()
+        self.assertEqual(self.doc.toxml(), changed_xml)
+
+        self.journal.undo()
+        self.journal.undo()
+        self.assertOriginal()
@@ -0,0 +1,141 @@
+# test_locate - Test finding rdf:RDF elements with expat
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+import io
+import unittest
+from xml.dom import minidom
+
+from .. import locate, parser, model
+
+SVG = b'''<?xml version="1.0" encoding="UTF-8"?>
+<svg xmlns="http://www.w3.org/2000/svg"
+     xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+     xmlns:dc="http://purl.org/dc/elements/1.1/"
+     id="svg2">
+  <metadata id="metadata7">
+    <rdf:RDF>
+      <rdf:Description rdf:about="">
+        <dc:title>Drawing &amp; title</dc:title>
+      </rdf:Description>
+    </rdf:RDF >
+  </metadata>
+  <g id="layer1">
+    <path d="M 0,0 L 10,10" />
+    <rect id="rect1">
+      <metadata id="metadata8">
+        <RDF xmlns="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+             xmlns:cc="http://creativecommons.org/ns#">
+          <Description about="">
+            <cc:license resource="http://creativecommons.org/licenses/by/3.0/" />
+          </Description>
+        </RDF>
+      </metadata>
+    </rect>
+    <metadata><rdf:RDF attr="a>b"/></metadata>
+  </g>
+</svg>
+'''
+
+class TestFindRDF(unittest.TestCase):
+    def test_locations(self):
+        locations = locate.find_rdf(io.BytesIO(SVG))
+        self.assertEqual(len(locations), 3)
+
+        loc = locations[0]
+        self.assertEqual(loc.tag_name, 'rdf:RDF')
+        self.assertEqual(loc.encoding, 'UTF-8')
+        self.assertTrue(SVG[loc.start:loc.end].startswith(b'<rdf:RDF>'))
+        self.assertTrue(SVG[loc.start:loc.end].endswith(b'</rdf:RDF >'))
+
+        self.assertEqual([(tag, element_id) for tag, element_id, decls in loc.ancestors],
+                         [('svg', 'svg2'), ('metadata', 'metadata7')])
+        self.assertIn(('rdf', 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'),
+                      loc.ancestors[0][2])
+
+        loc = locations[1]
+        self.assertEqual(loc.tag_name, 'RDF')
+        self.assertEqual(loc.ancestors[-2][:2], ('rect', 'rect1'))
+        self.assertTrue(SVG[loc.start:loc.end].endswith(b'</RDF>'))
+
+        # Empty element
+        loc = locations[2]
+        self.assertEqual(SVG[loc.start:loc.end], b'<rdf:RDF attr="a>b"/>')
+
+
+    def test_unsupported_encoding(self):
+        data = SVG.decode('utf-8').replace(u'UTF-8', u'UTF-16').encode('utf-16')
+        self.assertRaises(locate.UnsupportedEncoding,
+                          locate.find_rdf, io.BytesIO(data))
+
+
+class TestParseLocation(unittest.TestCase):
+    def test_same_as_full_parse(self):
+        f = io.BytesIO(SVG)
+        doc = minidom.parseString(SVG)
+        full_rdfs = doc.getElementsByTagNameNS(locate.RDF_NS, 'RDF')
+
+        for loc, full_rdf in zip(locate.find_rdf(f), full_rdfs):
+            rdf = locate.parse_location(f, loc)
+
+            # The skeleton has the owning element
+            self.assertEqual(rdf.parentNode.parentNode.getAttribute('id'),
+                             full_rdf.parentNode.parentNode.getAttribute('id'))
+
+            r1 = parser.parse_RDFXML(doc = rdf.ownerDocument, root_element = rdf)
+            r2 = parser.parse_RDFXML(doc = doc, root_element = full_rdf)
+            self.assertEqual(model.fingerprint(r1), model.fingerprint(r2))
+
+
+class TestReadRDF(unittest.TestCase):
+    def test_same_as_find_rdf(self):
+        f = io.BytesIO(SVG)
+        expected = [(loc.start, loc.end, model.fingerprint(parser.parse_RDFXML(
+                        doc = None, root_element = locate.parse_location(f, loc),
+                        read_only = True)))
+                    for loc in locate.find_rdf(f)]
+
+        # Split elements and tags across chunks in different ways
+        for size in (1, 7, 100, len(SVG)):
+            chunks = [SVG[i:i + size] for i in range(0, len(SVG), size)]
+            result = [(loc.start, loc.end, model.fingerprint(parser.parse_RDFXML(
+                            doc = None, root_element = rdf, read_only = True)))
+                      for loc, rdf in locate.read_rdf(chunks)]
+            self.assertEqual(result, expected)
+
+
+    def test_unsupported_encoding(self):
+        data = SVG.decode('utf-8').replace(u'UTF-8', u'UTF-16').encode('utf-16')
+        self.assertRaises(locate.UnsupportedEncoding, locate.read_rdf, [data])
+
+
+class TestSplice(unittest.TestCase):
+    def test_replace_element(self):
+        f = io.BytesIO(SVG)
+        locations = locate.find_rdf(f)
+        loc = locations[0]
+
+        rdf = locate.parse_location(f, loc)
+        title = rdf.getElementsByTagNameNS('http://purl.org/dc/elements/1.1/', 'title')[0]
+        title.firstChild.data = u'New \xe5 title'
+
+        out = io.BytesIO()
+        ranges = locate.splice(f, out, [
+                (loc.start, loc.end, locate.serialize_element(rdf, loc.encoding))])
+        data = out.getvalue()
+
+        # Everything outside the element is kept
+        self.assertEqual(data[:ranges[0][0]], SVG[:loc.start])
+        self.assertEqual(data[ranges[0][1]:], SVG[loc.end:])
+
+        # The new locations match the returned ranges
+        new_locations = locate.find_rdf(io.BytesIO(data))
+        self.assertEqual((new_locations[0].start, new_locations[0].end), ranges[0])
+        self.assertIn(u'New \xe5 title'.encode('utf-8'), data)
+
+        doc = minidom.parseString(data)
+        self.assertEqual(len(doc.getElementsByTagNameNS(locate.RDF_NS, 'RDF')), 3)
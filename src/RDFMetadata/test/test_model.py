@@ -0,0 +1,258 @@
+# test_model - Test model functions working on whole graphs
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+import unittest
+import collections
+from xml.dom import minidom
+
+from .. import parser, model
+
+def get_root(xml):
+    """Test helper function: parse XML and return a model.Root from the
+    XML root element.
+    """
+    doc = minidom.parseString(xml)
+    return parser.parse_RDFXML(doc = doc, root_element = doc.documentElement)
+
+
+LICENSE_XML = '''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:dc="http://purl.org/dc/elements/1.1/"
+         xmlns:cc="http://creativecommons.org/ns#">
+  <rdf:Description rdf:about="">
+    <dc:title>Test title</dc:title>
+    <dc:creator>
+      <rdf:Description>
+        <cc:attributionName>Test Person</cc:attributionName>
+      </rdf:Description>
+    </dc:creator>
+    <cc:license rdf:resource="http://creativecommons.org/licenses/by/3.0/" />
+  </rdf:Description>
+</rdf:RDF>
+'''
+
+
+class TestDiff(unittest.TestCase):
+    def test_identical(self):
+        # Generated blank node IDs differ between the two parses
+        r1 = get_root(LICENSE_XML)
+        r2 = get_root(LICENSE_XML)
+
+        d = model.diff(r1, r2)
+        self.assertEqual(d.added, [])
+        self.assertEqual(d.removed, [])
+
+
+    def test_node_id_and_prefix_ignored(self):
+        r1 = get_root(LICENSE_XML)
+        r2 = get_root('''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:foo="http://purl.org/dc/elements/1.1/"
+         xmlns:cc="http://creativecommons.org/ns#">
+  <rdf:Description rdf:about="">
+    <cc:license rdf:resource="http://creativecommons.org/licenses/by/3.0/" />
+    <foo:creator rdf:nodeID="person" />
+    <foo:title>Test title</foo:title>
+  </rdf:Description>
+  <rdf:Description rdf:nodeID="person">
+    <cc:attributionName>Test Person</cc:attributionName>
+  </rdf:Description>
+</rdf:RDF>
+''')
+
+        d = model.diff(r1, r2)
+        self.assertEqual(d.added, [])
+        self.assertEqual(d.removed, [])
+
+
+    def test_changed_literal(self):
+        r1 = get_root(LICENSE_XML)
+        r2 = get_root(LICENSE_XML.replace('Test title', 'New title'))
+
+        d = model.diff(r1, r2)
+
+        self.assertEqual(len(d.removed), 1)
+        t = d.removed[0]
+        self.assertIs(t.subject, r1[''])
+        self.assertEqual(t.predicate.uri.uri, 'http://purl.org/dc/elements/1.1/title')
+        self.assertEqual(t.object.value, 'Test title')
+
+        self.assertEqual(len(d.added), 1)
+        t = d.added[0]
+        self.assertIs(t.subject, r2[''])
+        self.assertEqual(t.object.value, 'New title')
+
+
+    def test_changed_blank_node(self):
+        r1 = get_root(LICENSE_XML)
+        r2 = get_root(LICENSE_XML.replace('Test Person', 'Other Person'))
+
+        d = model.diff(r1, r2)
+
+        # The blank node changed identity, so the link to it changed too
+        self.assertEqual(len(d.removed), 2)
+        self.assertEqual(len(d.added), 2)
+        self.assertEqual(
+            set(t.predicate.uri.local_name for t in d.added),
+            set(['creator', 'attributionName']))
+
+
+    def test_unrelated_blank_node_added(self):
+        xml = '''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <rdf:Description rdf:about="http://a">
+    <dc:creator><rdf:Description><dc:title>P</dc:title></rdf:Description></dc:creator>
+  </rdf:Description>
+  {0}
+</rdf:RDF>
+'''
+        r1 = get_root(xml.format(''))
+        r2 = get_root(xml.format('''
+  <rdf:Description rdf:about="http://b">
+    <dc:creator><rdf:Description><dc:title>Q</dc:title></rdf:Description></dc:creator>
+  </rdf:Description>'''))
+
+        d = model.diff(r1, r2)
+
+        # The blank node of http://a is unchanged, even though the
+        # labelling of the second graph needs more rounds
+        self.assertEqual(d.removed, [])
+        self.assertEqual(len(d.added), 2)
+        self.assertEqual(
+            set(t.predicate.uri.local_name for t in d.added),
+            set(['creator', 'title']))
+        self.assertIn(r2['http://b'], [t.subject for t in d.added])
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_identical(self):
+        r1 = get_root(LICENSE_XML)
+        r2 = get_root(LICENSE_XML)
+
+        self.assertEqual(model.fingerprint(r1), model.fingerprint(r2))
+        self.assertEqual(model.fingerprint(r1['']), model.fingerprint(r2['']))
+
+
+    def test_changed_literal(self):
+        r1 = get_root(LICENSE_XML)
+        r2 = get_root(LICENSE_XML.replace('Test Person', 'Other Person'))
+
+        self.assertNotEqual(model.fingerprint(r1), model.fingerprint(r2))
+
+
+    def test_subgraph(self):
+        # The same attribution block, but with a named node ID,
+        # different prefixes and in a different context
+
+        r1 = get_root(LICENSE_XML)
+        r2 = get_root('''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:dc="http://purl.org/dc/elements/1.1/"
+         xmlns:ns="http://creativecommons.org/ns#">
+  <rdf:Description rdf:about="http://example.org/other">
+    <dc:contributor rdf:nodeID="person" />
+  </rdf:Description>
+  <rdf:Description rdf:nodeID="person">
+    <ns:attributionName>Test Person</ns:attributionName>
+  </rdf:Description>
+</rdf:RDF>
+''')
+
+        block1 = r1[''][1].object
+        block2 = r2['http://example.org/other'][0].object
+        self.assertIsInstance(block1, model.BlankNode)
+
+        self.assertEqual(model.fingerprint(block1), model.fingerprint(block2))
+        self.assertNotEqual(model.fingerprint(r1), model.fingerprint(r2))
+
+
+class TestCompactModel(unittest.TestCase):
+    def test_no_instance_dicts(self):
+        r = get_root(LICENSE_XML)
+
+        res = r['']
+        self.assertFalse(hasattr(res, '__dict__'))
+        self.assertFalse(hasattr(res.uri, '__dict__'))
+
+        for pred in res:
+            self.assertFalse(hasattr(pred, '__dict__'))
+            self.assertFalse(hasattr(pred.uri, '__dict__'))
+            self.assertFalse(hasattr(pred.object, '__dict__'))
+
+
+    def test_sequence_interface(self):
+        r = get_root(LICENSE_XML)
+
+        res = r['']
+        self.assertIsInstance(res, collections.Sequence)
+        self.assertIn(res[1], res)
+        self.assertEqual(res.index(res[2]), 2)
+        self.assertEqual(list(reversed(res)), list(res)[::-1])
+
+        # Object-only nodes share the empty predicate list
+        license = r['http://creativecommons.org/licenses/by/3.0/']
+        self.assertEqual(len(license), 0)
+        self.assertIs(license.predicates, ())
+
+
+class TestLiteralPool(unittest.TestCase):
+    XML = '''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <rdf:Description rdf:about="http://example.org/a">
+    <dc:creator>Test Person</dc:creator>
+    <dc:date rdf:datatype="http://www.w3.org/2001/XMLSchema#date">2013-01-01</dc:date>
+  </rdf:Description>
+  <rdf:Description rdf:about="http://example.org/b">
+    <dc:creator>Test Person</dc:creator>
+    <dc:date rdf:datatype="http://www.w3.org/2001/XMLSchema#date">2013-01-01</dc:date>
+  </rdf:Description>
+</rdf:RDF>
+'''
+
+    def test_no_pool(self):
+        r = get_root(self.XML)
+        self.assertIsNone(r.literal_pool)
+
+
+    def test_shared_values(self):
+        doc = minidom.parseString(self.XML)
+        r = parser.parse_RDFXML(doc = doc, root_element = doc.documentElement,
+                                intern_literals = True)
+
+        a = r['http://example.org/a']
+        b = r['http://example.org/b']
+
+        self.assertEqual(a[0].object.value, 'Test Person')
+        self.assertIs(a[0].object.value, b[0].object.value)
+        self.assertIs(a[1].object.value, b[1].object.value)
+        self.assertIs(a[1].object.type_uri, b[1].object.type_uri)
+
+        # The DOM text nodes share the strings too
+        self.assertIs(a[0].object.value,
+                      b[0].repr.repr.element.firstChild.data)
+
+        pool = r.literal_pool
+        self.assertEqual(len(pool), 3)
+        self.assertEqual(pool.lookups, 6)
+        self.assertEqual(pool.hits, 3)
+        self.assertTrue(pool.saved_bytes > 0)
+
+
+    def test_edited_values(self):
+        doc = minidom.parseString(self.XML)
+        r = parser.parse_RDFXML(doc = doc, root_element = doc.documentElement,
+                                intern_literals = True)
+
+        a = r['http://example.org/a']
+        b = r['http://example.org/b']
+
+        b[0].object.set_value(u''.join([u'Other', u' Person']))
+        a[0].object.set_value(u''.join([u'Other', u' Person']))
+        self.assertIs(a[0].object.value, b[0].object.value)
@@ -13,7 +13,7 @@ from xml.dom import minidom
 # https://pypi.python.org/pypi/py-dom-xpath
 import xpath
 
-from .. import parser
+from .. import parser, model
 
 
 class TestNamespaceParsing(unittest.TestCase):
@@ -106,3 +106,99 @@ class TestNamespaceParsing(unittest.TestCase):
         self.assertEqual("http://www.w3.org/1999/02/22-rdf-syntax-ns#",
                          ns2.element.getAttribute("xmlns:rdf2"))
         
+
+    def test_redeclared_prefix_hides_uri(self):
+        # xmlns:rdf on the root element is hidden by rdf:RDF, so
+        # that URI needs a new prefix
+
+        ns = self.root.repr.namespaces
+        self.assertEqual(ns.get_prefix("urn:not-rdf-top#", "rdf"), "rdf2")
+        self.assertEqual("urn:not-rdf-top#", ns.element.getAttribute("xmlns:rdf2"))
+
+
+    def test_many_conflicts(self):
+        ns = self.root.repr.namespaces
+
+        for i in range(2, 10):
+            self.assertEqual(ns.get_prefix("urn:new{0}#".format(i), "dc"),
+                             "dc{0}".format(i))
+
+        self.assertEqual(ns.prefix_uri_map["dc5"], "urn:new5#")
+
+
+    def test_xmlns_attribute_changed(self):
+        pred = self.root[""][0].object[1]
+        ns = pred.repr.repr.namespaces
+
+        # Memoise the lookup
+        self.assertEqual(ns.get_prefix("urn:dc#", "dcx"), "dc")
+
+        # Redeclare dc: on rdf:RDF, which must hide the old lookup
+        rdf = self.root.repr.element
+        rdf.setAttribute("xmlns:dc", "urn:other-dc#")
+
+        self.assertEqual(ns.get_prefix("urn:other-dc#", "dcx"), "dc")
+        self.assertEqual(self.root.repr.namespaces.get_prefix("urn:dc#", "dc"), "dc2")
+        self.assertEqual(ns.get_prefix("urn:dc#", "dcx"), "dc2")
+
+        # Removing it must drop the memoised lookup too
+        rdf.removeAttribute("xmlns:dc")
+        self.assertEqual(ns.get_prefix("urn:other-dc#", "dcx"), "dcx")
+        self.assertEqual("urn:other-dc#", rdf.getAttribute("xmlns:dcx"))
+
+
+class TestConsolidate(unittest.TestCase):
+    XML = '''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <rdf:Description rdf:about="" xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:title>Test</dc:title>
+    <cc:license xmlns:cc="http://creativecommons.org/ns#"
+                rdf:resource="http://creativecommons.org/licenses/by/3.0/" />
+    <dc:creator>
+      <rdf:Description xmlns:cc="http://creativecommons.org/ns#">
+        <cc:attributionName>Test Person</cc:attributionName>
+        <x:foo xmlns:x="urn:x1#">a</x:foo>
+        <x:foo xmlns:x="urn:x2#">b</x:foo>
+      </rdf:Description>
+    </dc:creator>
+  </rdf:Description>
+</rdf:RDF>
+'''
+
+    def setUp(self):
+        self.doc = minidom.parseString(self.XML)
+        self.root = parser.parse_RDFXML(doc = self.doc,
+                                        root_element = self.doc.documentElement)
+
+    def test_consolidate(self):
+        rdf = self.root.repr.element
+        events = []
+        rdf.register_observer(events.append)
+
+        # dc: is redundant and cc: hoisted (twice), but x: means
+        # different things and must stay
+        self.assertEqual(self.root.repr.consolidate_namespaces(), 3)
+
+        self.assertEqual(rdf.getAttribute('xmlns:cc'), 'http://creativecommons.org/ns#')
+        self.assertFalse(rdf.hasAttribute('xmlns:x'))
+        self.assertEqual(self.doc.toxml().count('xmlns:dc='), 1)
+        self.assertEqual(self.doc.toxml().count('xmlns:cc='), 1)
+        self.assertEqual(self.doc.toxml().count('xmlns:x='), 2)
+
+        # All changes in one event
+        self.assertEqual(len(events), 1)
+        self.assertEqual(len(events[0].changes), 4)
+
+        # Still the same graph when parsed again
+        doc = minidom.parseString(self.doc.toxml())
+        r = parser.parse_RDFXML(doc = doc, root_element = doc.documentElement)
+        self.assertEqual(model.fingerprint(r), model.fingerprint(self.root))
+
+        # Namespace lookups see the change
+        ns = self.root[''].reprs[0].repr.namespaces
+        self.assertEqual(ns.get_prefix('http://creativecommons.org/ns#', 'cc2'), 'cc')
+
+        # Nothing more to do
+        self.assertEqual(self.root.repr.consolidate_namespaces(), 0)
+        self.assertEqual(len(events), 1)
@@ -553,3 +553,74 @@ class TestBlankNodes(unittest.TestCase):
         self.assertIsInstance(obj, model.LiteralNode)
         self.assertEqual(obj.value, 'Test')
         self.assertIsNone(obj.type_uri)
+
+
+class TestReadOnly(unittest.TestCase):
+    XML = '''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:dc="http://purl.org/dc/elements/1.1/"
+         xmlns:cc="http://creativecommons.org/ns#">
+  <cc:Work rdf:about="">
+    <dc:title>Test title</dc:title>
+    <dc:date rdf:datatype="http://www.w3.org/2001/XMLSchema#date">2013-01-01</dc:date>
+    <dc:description />
+    <dc:creator>
+      <rdf:Description>
+        <cc:attributionName>Test Person</cc:attributionName>
+      </rdf:Description>
+    </dc:creator>
+    <dc:contributor rdf:nodeID="1" />
+    <cc:license rdf:resource="http://creativecommons.org/licenses/by/3.0/" />
+  </cc:Work>
+
+  <rdf:Description rdf:nodeID="1">
+    <dc:title>Test</dc:title>
+  </rdf:Description>
+</rdf:RDF>
+'''
+
+    def get_roots(self):
+        doc = minidom.parseString(self.XML)
+        ro = parser.parse_RDFXML(doc = doc, root_element = doc.documentElement,
+                                 read_only = True)
+        rw = parser.parse_RDFXML(doc = doc, root_element = doc.documentElement)
+        return ro, rw
+
+
+    def test_same_graph(self):
+        ro, rw = self.get_roots()
+
+        self.assertTrue(ro.read_only)
+        self.assertFalse(rw.read_only)
+        self.assertIsNone(ro.repr)
+
+        self.assertEqual(sorted(ro), sorted(rw))
+        self.assertEqual(len(ro.blank_nodes), len(rw.blank_nodes))
+        self.assertEqual(len(ro['']), 7)
+
+        d = model.diff(ro, rw)
+        self.assertEqual(d.added, [])
+        self.assertEqual(d.removed, [])
+
+
+    def test_dom_untouched(self):
+        doc = minidom.parseString(self.XML)
+        before = doc.toxml()
+
+        parser.parse_RDFXML(doc = doc, root_element = doc.documentElement,
+                            read_only = True)
+
+        self.assertEqual(doc.toxml(), before)
+        self.assertFalse(hasattr(doc.documentElement, 'register_observer'))
+
+
+    def test_cannot_change(self):
+        ro, rw = self.get_roots()
+
+        res = ro['']
+        self.assertIsNone(res[1].repr)
+
+        self.assertRaises(model.ReadOnlyError, res[1].object.set_value, 'x')
+        self.assertRaises(model.ReadOnlyError, res[1].remove)
+        self.assertRaises(model.ReadOnlyError, res.add_predicate_literal,
+                          model.QName('http://purl.org/dc/elements/1.1/', 'dc', 'title'))
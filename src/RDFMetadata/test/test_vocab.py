@@ -0,0 +1,164 @@
+# test_vocab - Test the vocabulary term index
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Artem Popov <artfwo@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import vocab
+from ..vocab import schema
+
+SCHEMA = '''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#">
+  <rdf:Property rdf:about="urn:test#b">
+    <rdfs:label>B</rdfs:label>
+    <rdfs:comment>The B property.</rdfs:comment>
+  </rdf:Property>
+  <rdf:Property rdf:about="urn:test#a">
+    <rdfs:label>A</rdfs:label>
+  </rdf:Property>
+  <rdfs:Class rdf:about="urn:test#Unlabelled" />
+  <rdf:Property rdf:about="urn:other#c">
+    <rdfs:label>C</rdfs:label>
+  </rdf:Property>
+</rdf:RDF>
+'''
+
+
+class VocabTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.saved_cache_dir = vocab.cache_dir
+        vocab.cache_dir = os.path.join(self.dir, 'cache')
+
+    def tearDown(self):
+        vocab.cache_dir = self.saved_cache_dir
+        shutil.rmtree(self.dir)
+
+
+class TestIndex(VocabTest):
+    def test_get_terms(self):
+        terms = vocab.get_terms(vocab.dc.NS_URI)
+        self.assertEqual(len(terms), 15)
+        self.assertIn(vocab.dc.title, terms)
+
+        names = [t.qname.local_name for t in terms]
+        self.assertEqual(names, sorted(names))
+
+        self.assertIn(vocab.cc.license, vocab.get_terms('common_terms'))
+
+
+    def test_lookup(self):
+        self.assertIs(vocab.get_term(vocab.dc.NS_URI, 'title'), vocab.dc.title)
+        self.assertIs(vocab.find_term(vocab.dc.NS_URI, 'title'), vocab.dc.title)
+        self.assertIs(vocab.find_term_by_uri(vocab.cc.NS_URI + 'license'),
+                      vocab.cc.license)
+        self.assertEqual(vocab.dc.title.label, 'Title')
+        self.assertEqual(vocab.dc.title.qname.tag_name, 'dc:title')
+
+
+    def test_missing(self):
+        self.assertIsNone(vocab.find_term(vocab.dc.NS_URI, 'NS_URI'))
+        self.assertIsNone(vocab.find_term('urn:unknown#', 'title'))
+        self.assertIsNone(vocab.find_term_by_uri('urn:unknown#title'))
+
+        self.assertRaises(LookupError, vocab.get_term, vocab.dc.NS_URI, 'foo')
+        self.assertRaises(LookupError, vocab.get_term, 'urn:unknown#', 'foo')
+        self.assertRaises(AttributeError, getattr, vocab.dc, 'foo')
+
+
+class TestSearch(VocabTest):
+    def test_ranking(self):
+        terms = vocab.search_terms('Title')
+        self.assertEqual([t.qname.tag_name for t in terms],
+                         ['dc:title', 'dcterms:title', 'dcterms:alternative'])
+
+        terms = vocab.search_terms('creat')
+        self.assertEqual([t.qname.tag_name for t in terms],
+                         ['dc:creator', 'dcterms:creator', 'dcterms:created'])
+
+
+    def test_keys(self):
+        # Prefixed name, later label word and URI
+        self.assertEqual(vocab.search_terms('cc:attributionn'),
+                         [vocab.cc.attributionName])
+        self.assertEqual(vocab.search_terms('name'), [vocab.cc.attributionName])
+        self.assertEqual(vocab.search_terms(vocab.dc.NS_URI + 'ti'), [vocab.dc.title])
+
+        self.assertEqual(vocab.search_terms('t', limit = 2),
+                         vocab.search_terms('t')[:2])
+        self.assertEqual(vocab.search_terms('nosuchterm'), [])
+        self.assertEqual(vocab.search_terms(' '), [])
+
+
+class TestSchema(VocabTest):
+    def setUp(self):
+        super(TestSchema, self).setUp()
+        self.path = os.path.join(self.dir, 'test.rdf')
+        with open(self.path, 'w') as f:
+            f.write(SCHEMA)
+
+    def tearDown(self):
+        vocab.vocabularies.pop('urn:test#', None)
+        vocab.generation += 1
+        super(TestSchema, self).tearDown()
+
+
+    def test_read_schema(self):
+        self.assertEqual(schema.read_schema(self.path), {
+                'urn:test#': [('a', 'A', None), ('b', 'B', 'The B property.')],
+                'urn:other#': [('c', 'C', None)],
+                })
+
+
+    def test_register_lazily(self):
+        generation = vocab.generation
+        v = vocab.register_schema(self.path, 'urn:test#', 'test')
+        self.assertIsNone(v._terms)
+        self.assertNotEqual(vocab.generation, generation)
+        self.assertFalse(os.path.exists(vocab.cache_dir))
+
+        self.assertEqual(vocab.get_term('urn:test#', 'a').desc, '')
+        self.assertEqual(vocab.get_term('urn:test#', 'b').desc, 'The B property.')
+        self.assertEqual([t.qname.tag_name for t in vocab.get_terms('urn:test#')],
+                         ['test:a', 'test:b'])
+        self.assertEqual(len(os.listdir(vocab.cache_dir)), 1)
+
+
+    def test_compiled_cache(self):
+        expected = schema.load_schema(self.path, vocab.cache_dir)
+
+        # Must not parse the file again
+        read_schema = schema.read_schema
+        schema.read_schema = None
+        try:
+            self.assertEqual(schema.load_schema(self.path, vocab.cache_dir), expected)
+        finally:
+            schema.read_schema = read_schema
+
+        # But does when it has changed
+        with open(self.path, 'w') as f:
+            f.write(SCHEMA.replace('>A<', '>New A<'))
+        os.utime(self.path, (0, 0))
+
+        namespaces = schema.load_schema(self.path, vocab.cache_dir)
+        self.assertEqual(namespaces['urn:test#'][0], ('a', 'New A', None))
+
+
+    def test_search_non_ascii(self):
+        with open(self.path, 'w') as f:
+            f.write(SCHEMA.replace('>A<', '>\xc3\x85ngstr\xc3\xb6m<')
+                    .replace('>B<', '>B \xc3\xa5ngstr\xc3\xb6m<'))
+        vocab.register_schema(self.path, 'urn:test#', 'test')
+
+        # Both unicode and UTF-8 text, as given by Gtk.Entry
+        for text in (u'\xe5ng', u'\xe5ng'.encode('utf-8')):
+            self.assertEqual([t.qname.tag_name for t in vocab.search_terms(text)],
+                             ['test:a', 'test:b'])
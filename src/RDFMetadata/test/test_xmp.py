@@ -0,0 +1,216 @@
+# test_xmp - Test finding XMP packets in binary files
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+import os
+import mmap
+import zlib
+import struct
+import tempfile
+import unittest
+
+from .. import xmp, model
+
+XMPMETA = b'''<x:xmpmeta xmlns:x="adobe:ns:meta/">
+  <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+           xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <rdf:Description rdf:about="">
+      <dc:title>Test title</dc:title>
+    </rdf:Description>
+  </rdf:RDF>
+</x:xmpmeta>'''
+
+PACKET = (b'<?xpacket begin="\xef\xbb\xbf" id="W5M0MpCehiHzreSzNTczkc9d"?>\n'
+          + XMPMETA + b'\n' + b' ' * 200 + b'\n<?xpacket end="w"?>')
+
+# Roughly a JPEG with the packet in an APP1 segment
+JPEG = (b'\xff\xd8\xff\xe1'
+        + struct.pack('>H', len(PACKET) + 31) + b'http://ns.adobe.com/xap/1.0/\x00'
+        + PACKET + b'\xff\xdb\x00\x43' + b'\x00\xff' * 100
+        # Something that looks like the start of a packet
+        + b'<?xpacket begin=' + b'\x00' * 50
+        + b'\xff\xd9')
+
+
+class TestFindPackets(unittest.TestCase):
+    def test_wrapped_packet(self):
+        packets = list(xmp.find_packets(JPEG))
+        self.assertEqual(len(packets), 1)
+
+        p = packets[0]
+        self.assertEqual(JPEG[p.start:p.end], PACKET)
+        self.assertEqual(JPEG[p.content_start:p.content_end], XMPMETA)
+        self.assertEqual(p.padding_end - p.content_end, 202)
+        self.assertTrue(JPEG[p.padding_end:].startswith(b'<?xpacket end'))
+        self.assertTrue(p.writable)
+
+
+    def test_read_only_packet(self):
+        data = PACKET.replace(b'end="w"', b"end='r'")
+        packets = list(xmp.find_packets(data))
+        self.assertEqual(len(packets), 1)
+        self.assertFalse(packets[0].writable)
+
+
+    def test_bare_packets(self):
+        data = b'\x00' * 10 + XMPMETA + b'\x00' * 10 + PACKET + XMPMETA
+        packets = list(xmp.find_packets(data))
+        self.assertEqual([data[p.content_start:p.content_end] for p in packets],
+                         [XMPMETA] * 3)
+        self.assertEqual([p.start for p in packets],
+                         [10, 10 + len(XMPMETA) + 10,
+                          10 + len(XMPMETA) + 10 + len(PACKET)])
+        self.assertEqual(packets[0].padding_end, packets[0].content_end)
+
+
+    def test_false_header(self):
+        data = b'<?xpacket begin="" ?>' + b'\x00' * 10 + JPEG
+        packets = list(xmp.find_packets(data))
+        self.assertEqual(len(packets), 1)
+        self.assertEqual(data[packets[0].start:packets[0].end], PACKET)
+
+
+def png_chunk(chunk_type, data):
+    return (struct.pack('>I', len(data)) + chunk_type + data
+            + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+PNG = (b'\x89PNG\r\n\x1a\n'
+       + png_chunk(b'IHDR', b'\x00' * 13)
+       + png_chunk(b'iTXt', b'XML:com.adobe.xmp\x00\x00\x00\x00\x00' + PACKET)
+       + png_chunk(b'IEND', b''))
+
+
+def png_chunks(data):
+    pos = 8
+    while pos < len(data):
+        length, = struct.unpack('>I', data[pos:pos + 4])
+        chunk = data[pos + 4:pos + 8 + length]
+        crc, = struct.unpack('>I', data[pos + 8 + length:pos + 12 + length])
+        yield chunk[:4], chunk[4:], crc == zlib.crc32(chunk) & 0xffffffff
+        pos += length + 12
+
+
+class TestExtract(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix = '.jpg')
+        os.write(fd, JPEG)
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+
+    def test_extract(self):
+        result = xmp.extract(self.filename)
+        self.assertEqual(len(result), 1)
+
+        packet, roots = result[0]
+        self.assertEqual(packet.start, JPEG.find(PACKET))
+        self.assertEqual(len(roots), 1)
+
+        res = roots[0]['']
+        self.assertIsInstance(res, model.ResourceNode)
+        self.assertEqual([(str(p.uri), p.object.value) for p in res],
+                         [('http://purl.org/dc/elements/1.1/title', 'Test title')])
+
+
+    def test_small_windows(self):
+        # Put the packet header across a window boundary
+        window_size = 2 * mmap.ALLOCATIONGRANULARITY
+        data = (b'\x00' * (window_size - 5) + PACKET
+                + b'\x00' * window_size + XMPMETA)
+        with open(self.filename, 'wb') as f:
+            f.write(data)
+
+        result = xmp.extract(self.filename, window_size = window_size)
+        self.assertEqual([(p.start, len(roots)) for p, roots in result],
+                         [(window_size - 5, 1),
+                          (window_size * 2 - 5 + len(PACKET), 1)])
+
+
+    def test_empty_file(self):
+        with open(self.filename, 'wb'):
+            pass
+        self.assertEqual(xmp.extract(self.filename), [])
+
+
+class TestWritePacket(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+
+    def write_and_edit(self, data, title):
+        with open(self.filename, 'wb') as f:
+            f.write(data)
+
+        packet, roots = xmp.extract(self.filename, read_only = False)[0]
+        roots[0][''][0].object.set_value(title)
+        new_packet = xmp.write_packet(self.filename, packet, roots[0].repr.doc)
+
+        with open(self.filename, 'rb') as f:
+            new_data = f.read()
+
+        # The returned packet matches what's in the file now
+        packets = list(xmp.find_packets(new_data))
+        self.assertEqual(len(packets), 1)
+        self.assertEqual(vars(packets[0]), vars(new_packet))
+
+        roots = xmp.parse_packet(new_data, new_packet)
+        self.assertEqual(roots[0][''][0].object.value, title)
+
+        return packet, new_packet, new_data
+
+
+    def test_in_place(self):
+        packet, new_packet, data = self.write_and_edit(JPEG, u'New \xe5 title')
+
+        self.assertEqual(len(data), len(JPEG))
+        self.assertEqual(data[:packet.content_start], JPEG[:packet.content_start])
+        self.assertEqual(data[packet.padding_end:], JPEG[packet.padding_end:])
+        self.assertEqual((new_packet.start, new_packet.padding_end),
+                         (packet.start, packet.padding_end))
+
+
+    def test_rewrite_jpeg(self):
+        title = u'Long title ' * 50
+        packet, new_packet, data = self.write_and_edit(JPEG, title)
+
+        self.assertEqual(new_packet.padding_end - new_packet.content_end,
+                         xmp.PADDING_SIZE)
+        self.assertEqual(data[:4], JPEG[:4])
+        length, = struct.unpack('>H', data[4:6])
+        self.assertEqual(length, new_packet.end - 4)
+        self.assertEqual(data[new_packet.end:], JPEG[packet.end:])
+
+
+    def test_rewrite_png(self):
+        title = u'Long title ' * 50
+        self.write_and_edit(PNG, title)
+
+        with open(self.filename, 'rb') as f:
+            chunks = list(png_chunks(f.read()))
+
+        self.assertEqual([(chunk_type, crc_ok) for chunk_type, data, crc_ok in chunks],
+                         [(b'IHDR', True), (b'iTXt', True), (b'IEND', True)])
+
+
+    def test_cannot_resize(self):
+        data = b'II*\x00' + PACKET + b'\x00' * 100
+        with open(self.filename, 'wb') as f:
+            f.write(data)
+
+        packet, roots = xmp.extract(self.filename, read_only = False)[0]
+        roots[0][''][0].object.set_value(u'Long title ' * 50)
+        self.assertRaises(xmp.XMPError, xmp.write_packet,
+                          self.filename, packet, roots[0].repr.doc)
+
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), data)
@@ -7,7 +7,10 @@
 # Distributed under an GPLv2 license, please see LICENSE in the top dir.
 
 import sys
-import inspect
+import os
+
+from RDFMetadata import model
+from . import schema
 
 class Term(object):
     """
@@ -19,54 +22,176 @@ class Term(object):
         self.desc = desc
         self.qname = qname
 
+
+class Vocabulary(object):
+    """
+    The terms of a namespace, read from an RDF Schema file the first
+    time they are needed.
+
+    Terms can be accessed as attributes, e.g. vocab.dc.title.
+    """
+    def __init__(self, ns_uri, ns_prefix, path):
+        self.NS_URI = ns_uri
+        self.NS_PREFIX = ns_prefix
+        self.path = path
+        self._terms = None
+        self._sorted_terms = None
+
+    def get_term(self, local_name):
+        """
+        Return the Term with local_name, or None if there is no such
+        term.
+        """
+        if self._terms is None:
+            self._load()
+        return self._terms.get(local_name)
+
+    def get_terms(self):
+        """
+        Return a tuple of all Term objects, sorted by local name.
+        """
+        if self._terms is None:
+            self._load()
+        return self._sorted_terms
+
+    def _load(self):
+        entries = schema.load_schema(self.path, cache_dir).get(self.NS_URI, ())
+
+        terms = []
+        for local_name, label, desc in entries:
+            terms.append(Term(
+                uri=self.NS_URI + local_name,
+                qname=model.QName(self.NS_URI, self.NS_PREFIX, local_name),
+                label=label,
+                desc=desc if desc is not None else ''))
+
+        self._sorted_terms = tuple(terms)
+        self._terms = dict((t.qname.local_name, t) for t in terms)
+
+    def __getattr__(self, name):
+        # Only called when name isn't a normal attribute
+        if name.startswith('_'):
+            raise AttributeError(name)
+        term = self.get_term(name)
+        if term is None:
+            raise AttributeError(name)
+        return term
+
+
+# Compiled vocabularies are kept here if set, which applications can
+# do to speed up their start.  By default nothing is cached.
+cache_dir = None
+
 vocabularies = {}
 
-from . import cc
-from . import dc
-from . import dcterms
-from . import rdf
-from . import xhtml
+# Incremented whenever the registered vocabularies change, so that
+# anything derived from them can be recomputed
+generation = 0
+
+def register_schema(path, ns_uri, ns_prefix):
+    """
+    Register the terms in ns_uri defined by the RDF Schema file at
+    path, using ns_prefix when adding them to documents.  The file is
+    not read until the terms are used.
+
+    Return the new Vocabulary object.
+    """
+
+    global generation
+
+    vocabulary = Vocabulary(ns_uri, ns_prefix, path)
+    vocabularies[ns_uri] = vocabulary
+    generation += 1
+    return vocabulary
+
+
+_schema_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc = register_schema(os.path.join(_schema_dir, 'cc.rdf'),
+                     "http://creativecommons.org/ns#", "cc")
+dc = register_schema(os.path.join(_schema_dir, 'dc.rdf'),
+                     "http://purl.org/dc/elements/1.1/", "dc")
+dcterms = register_schema(os.path.join(_schema_dir, 'dcterms.rdf'),
+                          "http://purl.org/dc/terms/", "dcterms")
+rdf = register_schema(os.path.join(_schema_dir, 'rdf.rdf'),
+                      "http://www.w3.org/1999/02/22-rdf-syntax-ns#", "rdf")
+xhtml = register_schema(os.path.join(_schema_dir, 'xhtml.rdf'),
+                        "http://www.w3.org/1999/xhtml/vocab#", "xhv")
 
-for module in [cc, dc, dcterms, rdf, xhtml]:
-    vocabularies[module.NS_URI] = module
 
 def get_terms(ns_uri):
     """
-    Return a list of Term objects for a given namespace URI.
+    Return a sorted tuple of Term objects for a given namespace URI.
 
     If a special URI 'common_terms' is passed, return
-    a list of frequently used metadata properties.
+    frequently used metadata properties.
     """
 
     if ns_uri == 'common_terms':
         return get_common_terms()
-    terms = []
-    for name, value in inspect.getmembers(vocabularies[ns_uri], lambda v: isinstance(v, Term)):
-        terms.append(value)
-    return terms
+    return vocabularies[ns_uri].get_terms()
 
 def get_common_terms():
     """
-    Return a list of Term objects for frequently used metadata properties.
+    Return a tuple of Term objects for frequently used metadata properties.
     """
 
-    return [
+    return (
         dc.title,
         dc.creator,
         dc.date,
         cc.attributionName,
         cc.attributionURL,
         cc.license,
-    ]
+    )
 
 def get_term(ns_uri, localname):
     """
     Return a Term object given its namespace URI and local name.
     """
 
-    ns_dic = vocabularies[ns_uri].__dict__
-    if localname in ns_dic and isinstance(ns_dic[localname], Term):
-        return ns_dic[localname]
-    else:
+    term = find_term(ns_uri, localname)
+    if term is None:
         raise LookupError("Term %s not found in vocabulary" % localname)
+    return term
+
+def find_term(ns_uri, localname):
+    """
+    Return a Term object given its namespace URI and local name,
+    or None if there is no such term.
+    """
+
+    try:
+        vocabulary = vocabularies[ns_uri]
+    except KeyError:
+        return None
+    return vocabulary.get_term(localname)
+
+def find_term_by_uri(uri):
+    """
+    Return a Term object given its full URI, or None if there is no
+    such term.
+    """
+
+    ns_uri, localname = schema.split_uri(uri)
+    return find_term(ns_uri, localname)
+
+_term_index = None
+_term_index_generation = None
+
+def search_terms(text, limit = 20):
+    """
+    Return up to limit Term objects from all registered vocabularies
+    that have a label, local name, prefixed name or URI starting with
+    text, best matches first.  See search.TermIndex.
+    """
+
+    global _term_index, _term_index_generation
+
+    if _term_index is None or _term_index_generation != generation:
+        # Only needed once the user searches for a term
+        from . import search
+        _term_index = search.TermIndex(vocabularies.values())
+        _term_index_generation = generation
 
+    return _term_index.search(text, limit)
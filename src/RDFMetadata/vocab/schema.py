@@ -0,0 +1,127 @@
+# schema - read vocabulary terms from RDF Schema files
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Artem Popov <artfwo@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""Read the labels and descriptions of terms from RDF Schema (or OWL)
+files in RDF/XML, and keep them compiled in a cache directory so the
+files don't have to be parsed every time.
+"""
+
+import sys
+import os
+import hashlib
+import marshal
+import tempfile
+
+RDFS_NS = 'http://www.w3.org/2000/01/rdf-schema#'
+
+# Bump this whenever read_schema() or the compiled format changes
+FORMAT_VERSION = 1
+
+
+def read_schema(path):
+    """Parse the RDF Schema file at path and return a dict mapping
+    namespace URIs to lists of (local_name, label, comment), sorted by
+    local name.  Only resources with an rdfs:label are included, and
+    comment is None if there is no rdfs:comment.
+    """
+
+    # Only needed when the compiled cache can't be used
+    from xml.dom import minidom
+    from RDFMetadata import model, parser
+
+    doc = minidom.parse(path)
+    root = parser.parse_RDFXML(doc = doc, root_element = doc.documentElement,
+                               strict = False, read_only = True)
+
+    namespaces = {}
+    for node in root.resource_nodes.values():
+        label = comment = None
+        for pred in node:
+            if not isinstance(pred.object, model.LiteralNode):
+                continue
+            uri = str(pred.uri)
+            if uri == RDFS_NS + 'label' and label is None:
+                label = pred.object.value
+            elif uri == RDFS_NS + 'comment' and comment is None:
+                comment = pred.object.value
+
+        if label is not None:
+            ns_uri, local_name = split_uri(str(node.uri))
+            if local_name:
+                namespaces.setdefault(ns_uri, []).append((local_name, label, comment))
+
+    for terms in namespaces.values():
+        terms.sort()
+
+    return namespaces
+
+
+def load_schema(path, cache_dir):
+    """Return the same thing as read_schema(path), but from the
+    compiled cache in cache_dir if it is up to date.  Otherwise the
+    file is parsed and the result added to the cache.
+
+    If cache_dir is None, or can't be written, nothing is cached.
+    """
+
+    if cache_dir is None:
+        return read_schema(path)
+
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (FORMAT_VERSION, sys.version_info[0], sys.version_info[1],
+             path, st.st_mtime, st.st_size)
+
+    cache_path = os.path.join(
+        cache_dir, hashlib.sha1(path.encode('utf-8')).hexdigest() + '.vocab')
+
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_stamp, namespaces = marshal.load(f)
+        if cached_stamp == stamp:
+            return namespaces
+    except (IOError, EOFError, ValueError, TypeError):
+        pass
+
+    namespaces = read_schema(path)
+
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+        # Write atomically, since other processes may read it
+        fd, tmp_path = tempfile.mkstemp(dir = cache_dir, suffix = '.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump((stamp, namespaces), f)
+            os.rename(tmp_path, cache_path)
+        except Exception:
+            _remove_file(tmp_path)
+            raise
+    except (IOError, OSError):
+        pass
+
+    return namespaces
+
+
+def _remove_file(path):
+    # In a function of its own, so that a failure doesn't replace the
+    # exception being handled by the caller
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def split_uri(uri):
+    """Split uri into a namespace URI, ending with # or /, and a local
+    name.
+    """
+
+    i = max(uri.rfind('#'), uri.rfind('/')) + 1
+    return uri[:i], uri[i:]
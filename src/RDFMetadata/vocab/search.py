@@ -0,0 +1,96 @@
+# search - find vocabulary terms by typing the start of a name
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Artem Popov <artfwo@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""Type-ahead search over the terms of a set of vocabularies.
+
+Every term is indexed under a number of lower-cased keys: its label,
+each following word of the label, its local name, its prefixed name
+(e.g. dc:title) and its full URI.  The keys are kept in a sorted list,
+so all keys starting with some text are found by bisection.
+"""
+
+import bisect
+
+# Ranks of the different kinds of matches, best first
+EXACT = 0
+LABEL = 1
+LOCAL_NAME = 2
+PREFIXED_NAME = 3
+LABEL_WORD = 4
+URI = 5
+
+
+class TermIndex(object):
+    """Index of the terms of a list of vocab.Vocabulary objects."""
+
+    def __init__(self, vocabularies):
+        entries = []
+        for vocabulary in vocabularies:
+            for term in vocabulary.get_terms():
+                for key, rank in _keys(term):
+                    entries.append((key, rank, term.label or '', term.uri, term))
+
+        entries.sort()
+        self._keys = [e[0] for e in entries]
+        self._entries = entries
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def search(self, text, limit = 20):
+        """Return up to limit terms with a key starting with text,
+        ignoring case, best matches first.  text can be unicode or a
+        UTF-8 string, e.g. from a Gtk.Entry.
+
+        Terms matching on their label come before those matching on
+        their local name, then prefixed name, a later word in the
+        label and finally the URI.  A term whose label, local name or
+        prefixed name is exactly text comes first of all.  Within each
+        rank the terms are sorted by label.
+        """
+
+        # Non-ASCII strings can't be compared with the unicode keys
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+
+        text = text.strip().lower()
+        if not text:
+            return []
+
+        start = bisect.bisect_left(self._keys, text)
+        end = bisect.bisect_left(self._keys, text + u'\uffff', start)
+
+        # Best rank for each term
+        best = {}
+        for i in range(start, end):
+            key, rank, label, uri, term = self._entries[i]
+            if key == text and rank < LABEL_WORD:
+                rank = EXACT
+            if rank < best.get(uri, (URI + 1, ))[0]:
+                best[uri] = (rank, label, uri, term)
+
+        matches = sorted(best.values())
+        return [m[3] for m in matches[:limit]]
+
+
+def _keys(term):
+    if term.label:
+        label = term.label.lower()
+        yield label, LABEL
+
+        words = label.split()
+        for i in range(1, len(words)):
+            yield ' '.join(words[i:]), LABEL_WORD
+
+    if term.qname is not None:
+        yield term.qname.local_name.lower(), LOCAL_NAME
+        yield term.qname.tag_name.lower(), PREFIXED_NAME
+
+    yield term.uri.lower(), URI
@@ -0,0 +1,401 @@
+# xmp - find and parse XMP packets in binary media files
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""Find XMP packets in JPEG, PNG, TIFF, PDF or any other files by
+scanning the raw bytes, without knowing anything about the file
+format.
+
+The file is memory-mapped a window at a time, so the operating system
+pages it in as it is scanned and only the packets themselves are
+copied into Python strings.  Memory use therefore depends on the size
+of the packets, not of the file.
+
+Packets are either wrapped in <?xpacket begin ...?> and
+<?xpacket end ...?> processing instructions, or bare <x:xmpmeta>
+elements.  Only UTF-8 packets are found, and packets in compressed
+streams (e.g. some PDF streams) can't be seen at all.
+
+Edited packets are written back with write_packet().  Wrapped packets
+are normally followed by whitespace padding, so that small changes can
+be written over the old packet without touching the rest of the file.
+"""
+
+import os
+import mmap
+import stat
+import zlib
+import struct
+import tempfile
+import contextlib
+from xml.dom import minidom
+
+from . import parser, locate
+
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+
+PACKET_HEADER = b'<?xpacket begin='
+PACKET_TRAILER = b'<?xpacket end='
+XMPMETA_START = b'<x:xmpmeta'
+XMPMETA_END = b'</x:xmpmeta>'
+
+# How far to look for the end of the processing instructions
+MAX_PI_LENGTH = 1024
+
+# How much of the file to map at a time
+WINDOW_SIZE = 64 * 1024 * 1024
+
+# Padding added when the whole file has to be rewritten, as
+# recommended by the XMP specification
+PADDING_SIZE = 2048
+
+# What comes before the packet in the file formats where it can be
+# resized
+JPEG_APP1_HEADER = b'http://ns.adobe.com/xap/1.0/\x00'
+PNG_ITXT_HEADER = b'iTXt' + b'XML:com.adobe.xmp\x00\x00\x00\x00\x00'
+
+
+class XMPError(Exception):
+    pass
+
+
+class XMPPacket(object):
+    """An XMP packet found by find_packets().  All positions are byte
+    offsets in the file, with the ends exclusive.
+
+    - start, end: the whole packet, including any xpacket processing
+      instructions
+    - content_start, content_end: the XML of the packet
+    - padding_end: the end of the whitespace padding after the XML,
+      which is the start of the trailer processing instruction.  This
+      is content_end for packets without a trailer.
+    - writable: True if the trailer allows the packet to be changed
+      in place
+    """
+
+    def __init__(self, start, end, content_start, content_end,
+                 padding_end, writable):
+        self.start = start
+        self.end = end
+        self.content_start = content_start
+        self.content_end = content_end
+        self.padding_end = padding_end
+        self.writable = writable
+
+    def __repr__(self):
+        return '<XMPPacket {0}-{1}{2}>'.format(
+            self.start, self.end, ' writable' if self.writable else '')
+
+
+class MappedFile(object):
+    """A read-only view of a file that can be searched and sliced like
+    a string.  Only window_size bytes of the file are mapped at a time,
+    so that the pages of the parts already searched can be dropped.
+    """
+
+    def __init__(self, f, window_size = WINDOW_SIZE):
+        self.f = f
+        self.size = os.fstat(f.fileno()).st_size
+        self.window_size = max(window_size, 2 * mmap.ALLOCATIONGRANULARITY)
+        self._map = None
+        self._offset = 0
+
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+    def __len__(self):
+        return self.size
+
+
+    def find(self, sub, start = 0, end = None):
+        """Return the lowest offset of sub in the range [start, end),
+        or -1 if not found.
+        """
+
+        if end is None or end > self.size:
+            end = self.size
+
+        while end - start >= len(sub):
+            window = self._map_window(start, len(sub))
+            window_end = min(end, self._offset + len(window))
+
+            pos = window.find(sub, start - self._offset, window_end - self._offset)
+            if pos >= 0:
+                return pos + self._offset
+
+            if window_end == end:
+                break
+
+            # Matches may cross into the next window
+            start = window_end - len(sub) + 1
+
+        return -1
+
+
+    def __getitem__(self, index):
+        start, stop, step = index.indices(self.size)
+        if start >= stop:
+            return b''
+
+        self.f.seek(start)
+        return self.f.read(stop - start)
+
+
+    def _map_window(self, pos, length):
+        """Return a map that includes the length bytes at pos, or up to
+        the end of the file.  It starts at self._offset.
+        """
+
+        if (self._map is None or pos < self._offset
+            or min(pos + length, self.size) > self._offset + len(self._map)):
+            self.close()
+            self._offset = pos - pos % mmap.ALLOCATIONGRANULARITY
+            self._map = mmap.mmap(
+                self.f.fileno(),
+                min(self.window_size, self.size - self._offset),
+                access = mmap.ACCESS_READ, offset = self._offset)
+
+        return self._map
+
+
+@contextlib.contextmanager
+def mapped(filename, window_size = WINDOW_SIZE):
+    """Context manager returning a MappedFile for filename."""
+
+    with open(filename, 'rb') as f:
+        buf = MappedFile(f, window_size)
+        try:
+            yield buf
+        finally:
+            buf.close()
+
+
+def find_packets(buf):
+    """Generate an XMPPacket for each packet in buf, which is a string
+    or a MappedFile, in file order.
+    """
+
+    pos = 0
+    header = buf.find(PACKET_HEADER)
+
+    while True:
+        if 0 <= header < pos:
+            header = buf.find(PACKET_HEADER, pos)
+
+        # Bare packets before the next wrapped packet
+        meta = buf.find(XMPMETA_START, pos, len(buf) if header < 0 else header)
+
+        if meta >= 0:
+            start = meta
+            packet = _bare_packet(buf, meta)
+        elif header >= 0:
+            start = header
+            packet = _wrapped_packet(buf, header)
+        else:
+            return
+
+        if packet is None:
+            # Just some bytes that happen to look like a packet
+            pos = start + 1
+        else:
+            yield packet
+            pos = packet.end
+
+
+def parse_packet(buf, packet, read_only = True):
+    """Parse the rdf:RDF elements in packet, returning a list of
+    model.Root.  Raises xml.parsers.expat.ExpatError if the packet
+    isn't well-formed.
+    """
+
+    doc = minidom.parseString(buf[packet.content_start:packet.content_end])
+    return [parser.parse_RDFXML(doc = doc, root_element = rdf,
+                                read_only = read_only)
+            for rdf in doc.getElementsByTagNameNS(RDF_NS, 'RDF')]
+
+
+def extract(filename, read_only = True, window_size = WINDOW_SIZE):
+    """Return a list of (XMPPacket, list of model.Root) for the XMP
+    packets in filename.
+    """
+
+    with mapped(filename, window_size) as buf:
+        return [(packet, parse_packet(buf, packet, read_only))
+                for packet in find_packets(buf)]
+
+
+def write_packet(filename, packet, doc, padding = PADDING_SIZE):
+    """Write doc, the DOM parsed from packet (e.g. root.repr.doc of a
+    model.Root from parse_packet()), back into filename and return
+    the new XMPPacket.
+
+    If the packet is writable and the XML fits in the packet padding,
+    only the packet bytes are overwritten.  Otherwise the whole file is
+    rewritten to a temporary file that replaces it, with padding bytes
+    of new padding.  That is only possible in JPEG and PNG files and
+    in XMP sidecar files, as other formats refer to data after the
+    packet by file offsets.  XMPError is raised for them.
+    """
+
+    data = locate.serialize_element(doc.documentElement, 'utf-8')
+
+    if packet.writable and len(data) <= packet.padding_end - packet.content_start:
+        return _write_in_place(filename, packet, data)
+    else:
+        return _rewrite_file(filename, packet, data, padding)
+
+
+def _write_in_place(filename, packet, data):
+    with open(filename, 'r+b') as f:
+        f.seek(packet.content_start)
+        f.write(data + _padding(packet.padding_end - packet.content_start - len(data)))
+        f.flush()
+        os.fsync(f.fileno())
+
+    return XMPPacket(packet.start, packet.end,
+                     packet.content_start, packet.content_start + len(data),
+                     packet.padding_end, packet.writable)
+
+
+def _rewrite_file(filename, packet, data, padding):
+    with mapped(filename) as buf:
+        header = buf[packet.start:packet.content_start]
+        trailer = buf[packet.padding_end:packet.end]
+
+        # Only pad packets that have a trailer to put it before
+        packet_data = header + data
+        if trailer:
+            packet_data += _padding(padding) + trailer
+
+        replacements = _resize_container(buf, packet, packet_data)
+
+    replacements.append((packet.start, packet.end, packet_data))
+    replacements.sort()
+
+    path = os.path.abspath(filename)
+    directory, basename = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir = directory, prefix = '.' + basename,
+                                    suffix = '.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            with open(path, 'rb') as src:
+                ranges = locate.splice(src, out, replacements)
+                mode = stat.S_IMODE(os.fstat(src.fileno()).st_mode)
+
+            out.flush()
+            os.fsync(out.fileno())
+
+        os.chmod(tmp_path, mode)
+        os.rename(tmp_path, path)
+    except Exception:
+        _remove_file(tmp_path)
+        raise
+
+    # The container fix-ups before the packet come first
+    start = ranges[sum(1 for r in replacements if r[0] < packet.start)][0]
+    content_start = start + len(header)
+    return XMPPacket(start, start + len(packet_data),
+                     content_start, content_start + len(data),
+                     start + len(packet_data) - len(trailer),
+                     packet.writable)
+
+
+def _resize_container(buf, packet, packet_data):
+    """Return the replacements needed to fix up the structure around
+    packet when it is replaced by packet_data.
+    """
+
+    # JPEG APP1 segment: marker, length, header, packet
+    pos = packet.start - len(JPEG_APP1_HEADER) - 4
+    if pos >= 0 and buf[pos + 4:packet.start] == JPEG_APP1_HEADER:
+        marker, length = struct.unpack('>2sH', buf[pos:pos + 4])
+        if marker == b'\xff\xe1' and length == packet.end - pos - 2:
+            length = len(JPEG_APP1_HEADER) + len(packet_data) + 2
+            if length > 0xffff:
+                raise XMPError('XMP packet too large for a JPEG segment')
+            return [(pos + 2, pos + 4, struct.pack('>H', length))]
+
+    # PNG iTXt chunk: length, type, keyword and flags, packet, CRC
+    pos = packet.start - len(PNG_ITXT_HEADER) - 4
+    if pos >= 0 and buf[pos + 4:packet.start] == PNG_ITXT_HEADER:
+        length, = struct.unpack('>I', buf[pos:pos + 4])
+        if length == packet.end - pos - 8:
+            chunk_data = PNG_ITXT_HEADER[4:] + packet_data
+            crc = zlib.crc32(PNG_ITXT_HEADER[:4] + chunk_data) & 0xffffffff
+            return [(pos, pos + 4, struct.pack('>I', len(chunk_data))),
+                    (packet.end, packet.end + 4, struct.pack('>I', crc))]
+
+    # Sidecar file with nothing but the packet
+    if (not buf[:packet.start].strip()
+        and len(buf) - packet.end <= MAX_PI_LENGTH
+        and not buf[packet.end:].strip()):
+        return []
+
+    raise XMPError('XMP packet padding too small, and the packet '
+                   'cannot be resized in this kind of file')
+
+
+def _remove_file(path):
+    # In a function of its own, so that a failure doesn't replace the
+    # exception being handled by the caller
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _padding(size):
+    """Return size bytes of whitespace, in lines of 100 bytes."""
+
+    if size == 0:
+        return b''
+    line = b' ' * 99 + b'\n'
+    return (line * (size // len(line) + 1))[-size:]
+
+
+def _bare_packet(buf, start):
+    end = buf.find(XMPMETA_END, start)
+    if end < 0:
+        return None
+
+    end += len(XMPMETA_END)
+    return XMPPacket(start, end, start, end, end, False)
+
+
+def _wrapped_packet(buf, start):
+    header_end = _pi_end(buf, start)
+    if header_end < 0:
+        return None
+
+    trailer = buf.find(PACKET_TRAILER, header_end)
+    if trailer < 0 or buf.find(PACKET_HEADER, header_end, trailer) >= 0:
+        return None
+
+    end = _pi_end(buf, trailer)
+    if end < 0:
+        return None
+
+    # end="w" or end='w'
+    pos = trailer + len(PACKET_TRAILER) + 1
+    writable = buf[pos:pos + 1] == b'w'
+
+    body = buf[header_end:trailer]
+    content_start = header_end + len(body) - len(body.lstrip())
+    content_end = header_end + len(body.rstrip())
+
+    return XMPPacket(start, end, content_start, content_end, trailer, writable)
+
+
+def _pi_end(buf, start):
+    end = buf.find(b'?>', start, start + MAX_PI_LENGTH)
+    if end < 0:
+        return end
+    return end + 2
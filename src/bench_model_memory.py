@@ -0,0 +1,143 @@
+#!/usr/bin/python
+
+# bench_model_memory - Report the memory used by the model layer per triple
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""Parse a generated RDF/XML document and report how long the parsing
+took and how many bytes the model objects (Root, nodes, predicates,
+literals, URIs and their containers and observer lists) use per
+triple.  The DOM and domrepr objects are not counted, and neither is
+the time spent building the DOM.
+"""
+
+import sys, argparse, types, time
+from xml.dom import minidom
+
+from RDFMetadata import parser, model
+
+DOC_TEMPLATE = '''<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:dc="http://purl.org/dc/elements/1.1/"
+         xmlns:cc="http://creativecommons.org/ns#">
+{0}
+</rdf:RDF>
+'''
+
+RESOURCE_TEMPLATE = '''
+  <rdf:Description rdf:about="http://example.org/resource/{0}">
+    <dc:title>Title {0}</dc:title>
+    <dc:date rdf:datatype="http://www.w3.org/2001/XMLSchema#date">2013-01-01</dc:date>
+    <dc:creator>
+      <rdf:Description>
+        <cc:attributionName>Person {1}</cc:attributionName>
+        <cc:attributionURL rdf:resource="http://example.org/person/{1}" />
+      </rdf:Description>
+    </dc:creator>
+    <cc:license rdf:resource="http://creativecommons.org/licenses/by/3.0/" />
+  </rdf:Description>'''
+
+
+def make_document(count):
+    return DOC_TEMPLATE.format(''.join(
+            RESOURCE_TEMPLATE.format(i, i % 100) for i in range(count)))
+
+
+def iter_model_objects(root):
+    yield root
+
+    for node in list(root.resource_nodes.values()) + list(root.blank_nodes.values()):
+        yield node
+        yield node.uri
+        for pred in node:
+            yield pred
+            yield pred.uri
+            if isinstance(pred.object, model.LiteralNode):
+                yield pred.object
+
+
+def iter_attributes(obj):
+    try:
+        d = obj.__dict__
+    except AttributeError:
+        d = None
+
+    if d is not None:
+        yield d
+        for v in d.values():
+            yield v
+
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            try:
+                yield getattr(obj, name)
+            except AttributeError:
+                pass
+
+
+def model_size(root):
+    """Return the number of bytes used by the model objects of root.
+    Containers and bound observer methods held by the objects are
+    included, but shared objects are only counted once.
+    """
+
+    seen = set()
+    total = 0
+
+    def add(obj):
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        return sys.getsizeof(obj)
+
+    for obj in iter_model_objects(root):
+        total += add(obj)
+
+        for value in iter_attributes(obj):
+            if isinstance(value, (list, tuple, dict, set)):
+                total += add(value)
+                for item in value:
+                    if isinstance(item, types.MethodType):
+                        total += add(item)
+
+    return total
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('-n', '--resources', type = int, default = 5000,
+                           help = 'number of generated resources (6 triples each)')
+    argparser.add_argument('-i', '--intern-literals', action = 'store_true',
+                           help = 'share equal literal values through a LiteralPool')
+    argparser.add_argument('-r', '--read-only', action = 'store_true',
+                           help = 'parse into a read-only model without DOM links')
+    args = argparser.parse_args()
+
+    doc = minidom.parseString(make_document(args.resources))
+
+    start = time.time()
+    root = parser.parse_RDFXML(doc = doc, root_element = doc.documentElement,
+                               intern_literals = args.intern_literals,
+                               read_only = args.read_only)
+    parse_time = time.time() - start
+
+    triples = sum(len(node) for node in root.resource_nodes.values())
+    triples += sum(len(node) for node in root.blank_nodes.values())
+
+    size = model_size(root)
+
+    sys.stdout.write('triples:          {0}\n'.format(triples))
+    sys.stdout.write('parse seconds:    {0:.2f}\n'.format(parse_time))
+    sys.stdout.write('model bytes:      {0}\n'.format(size))
+    sys.stdout.write('bytes per triple: {0:.1f}\n'.format(float(size) / triples))
+
+    if root.literal_pool is not None:
+        sys.stdout.write('literal pool:     {0}\n'.format(root.literal_pool))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/python
+
+# bench_startup - Report how long it takes to start the editor and library
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""Start fresh Python processes and report the time from launching
+each one until:
+
+- import: the library parser and vocabularies have been imported
+- model: the first rdf:RDF element of a file has been parsed into a model
+- window: the editor main window has been drawn for the first time
+
+With --imports, a single process is run for the chosen stage and the
+time spent importing each module is listed, similar to the
+-X importtime option of later Python versions.
+"""
+
+import sys, os, argparse, time, subprocess
+
+STAGES = ('import', 'model', 'window')
+
+src_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+#
+# Run in the measured process
+#
+
+def measure_import(args):
+    from RDFMetadata import parser, vocab
+
+def measure_model(args):
+    from xml.dom import minidom
+    from RDFMetadata import parser
+
+    doc = minidom.parse(args.file)
+    rdf = doc.getElementsByTagNameNS(parser.RDF_NS, 'RDF')[0]
+    parser.parse_RDFXML(doc = doc, root_element = rdf)
+
+def measure_window(args):
+    from gi.repository import Gtk
+    import rdf_editor
+
+    win = rdf_editor.MainWindow()
+
+    def on_draw(widget, cr):
+        Gtk.main_quit()
+        return False
+
+    win.connect_after('draw', on_draw)
+    win.show()
+    Gtk.main()
+
+
+class ImportTimer(object):
+    """Replacement for __import__ that records the time spent in the
+    first import of each module, including the modules it imports.
+    """
+
+    def __init__(self):
+        import __builtin__
+        self.builtins = __builtin__
+        self.original_import = __builtin__.__import__
+        self.depth = 0
+        self.timings = []
+
+    def install(self):
+        self.builtins.__import__ = self
+
+    def __call__(self, name, *args, **kwargs):
+        before = set(sys.modules)
+        self.depth += 1
+        start = time.time()
+        try:
+            return self.original_import(name, *args, **kwargs)
+        finally:
+            elapsed = time.time() - start
+            self.depth -= 1
+            if set(sys.modules) - before:
+                # from . import x has an empty name
+                fromlist = args[2] if len(args) > 2 else kwargs.get('fromlist')
+                if not name and fromlist:
+                    name = '.' + ', .'.join(fromlist)
+                self.timings.append((self.depth, name, elapsed))
+
+    def report(self, out):
+        out.write('import time: cumulative [us] | imported package\n')
+        for depth, name, elapsed in self.timings:
+            out.write('import time: {0:>17} | {1}{2}\n'.format(
+                    int(elapsed * 1e6), '  ' * depth, name))
+
+
+def run_stage(args):
+    timer = None
+    if args.imports:
+        timer = ImportTimer()
+        timer.install()
+
+    globals()['measure_' + args.measure](args)
+
+    # The parent compares this with the time it launched the process
+    sys.stdout.write('{0!r}\n'.format(time.time()))
+    sys.stdout.flush()
+
+    if timer:
+        timer.report(sys.stderr)
+
+
+#
+# Run in the benchmark process
+#
+
+def time_stage(stage, args):
+    cmd = [sys.executable, os.path.abspath(__file__),
+           '--measure', stage, '--file', args.file]
+    if args.imports:
+        cmd.append('--imports')
+
+    start = time.time()
+    output = subprocess.check_output(cmd, cwd = src_dir)
+    return float(output.strip().split()[-1]) - start
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('-n', '--runs', type = int, default = 5,
+                           help = 'number of processes to start for each stage')
+    argparser.add_argument('-s', '--stage', choices = STAGES, action = 'append',
+                           help = 'stage to measure (default: all)')
+    argparser.add_argument('-f', '--file',
+                           default = os.path.join(src_dir, 'multiple-rdf-tags.svg'),
+                           help = 'document to parse for the model stage')
+    argparser.add_argument('--imports', action = 'store_true',
+                           help = 'list the time spent importing each module')
+    argparser.add_argument('--measure', choices = STAGES, help = argparse.SUPPRESS)
+    args = argparser.parse_args()
+
+    if args.measure:
+        run_stage(args)
+        return
+
+    stages = args.stage or STAGES
+
+    if args.imports:
+        for stage in stages:
+            sys.stdout.write('{0}: {1:.3f} s\n'.format(stage, time_stage(stage, args)))
+        return
+
+    for stage in stages:
+        times = sorted(time_stage(stage, args) for i in range(args.runs))
+        sys.stdout.write('{0:8} min {1:.3f} s, median {2:.3f} s\n'.format(
+                stage + ':', times[0], times[len(times) // 2]))
+
+
+if __name__ == '__main__':
+    main()
@@ -22,28 +22,28 @@ class AddPropertyDialog(Gtk.Dialog):
         table = Gtk.Table(row_spacing=12, column_spacing=12, border_width=12)
         self.get_content_area().add(table)
 
-        table.attach(Gtk.Label(label="Namespace:", xalign=0), 0, 1, 0, 1)
-        table.attach(Gtk.Label(label="Property:", xalign=0), 0, 1, 1, 2)
+        table.attach(Gtk.Label(label="Property:", xalign=0), 0, 1, 0, 1)
         table.attach(Gtk.Label(label="Value:", xalign=0), 0, 1, 2, 3)
 
-        ns_store = Gtk.ListStore(str, str)
-        ns_store.append(['common_terms', 'Common Terms'])
-        ns_store.append([vocab.dc.NS_URI, 'Dublin Core'])
-        ns_store.append([vocab.cc.NS_URI, 'Creative Commons'])
-
+        # Search field for terms in all vocabularies, with the
+        # matches shown as a completion list.  The list is refilled
+        # with the ranked matches on each keystroke, so the completion
+        # itself shouldn't filter it.
         self.property_store = Gtk.ListStore(object, str)
-        
-        self.property_combo = Gtk.ComboBox(model=self.property_store)
-        cell = Gtk.CellRendererText()
-        self.property_combo.pack_start(cell, True)
-        self.property_combo.add_attribute(cell, 'text', 1)
-        table.attach(self.property_combo, 1, 2, 1, 2)
-
-        self.ns_combo = Gtk.ComboBox(model=ns_store)
-        cell = Gtk.CellRendererText()
-        self.ns_combo.pack_start(cell, True)
-        self.ns_combo.add_attribute(cell, 'text', 1)
-        table.attach(self.ns_combo, 1, 2, 0, 1)
+
+        self.search_entry = Gtk.Entry()
+        self.search_entry.set_placeholder_text("Search by name or URI")
+        table.attach(self.search_entry, 1, 2, 0, 1)
+
+        completion = Gtk.EntryCompletion(model=self.property_store)
+        completion.set_text_column(1)
+        completion.set_match_func(lambda *args: True, None)
+        completion.set_minimum_key_length(1)
+        completion.connect("match-selected", self.on_match_selected)
+        self.search_entry.set_completion(completion)
+
+        self.property_label = Gtk.Label(xalign=0)
+        table.attach(self.property_label, 1, 2, 1, 2)
 
         self.value_entry = Gtk.Entry()
         table.attach(self.value_entry, 1, 2, 2, 3, yoptions=Gtk.AttachOptions.EXPAND)                
@@ -65,16 +65,13 @@ class AddPropertyDialog(Gtk.Dialog):
         self.blank_checkbox = Gtk.CheckButton("Blank Node")
         adv_vbox.add(self.blank_checkbox)
         
-        self.ns_combo.connect("changed", self.on_ns_combo_changed)
-        self.property_combo.connect("changed", self.on_property_combo_changed)
+        self.search_entry.connect("changed", self.on_search_changed)
+        self.search_entry.connect("activate", self.on_search_activate)
         self.blank_checkbox.connect("toggled", self.on_blank_node_toggled)
-        self.ns_combo.set_active(0)
+        self.set_term(vocab.get_common_terms()[0])
         
         table.show_all()
 
-    def get_ns(self):
-        return self.ns_combo.get_model()[self.ns_combo.get_active_iter()][0]
-
     def get_property(self):
         ns_prefix = vocab.vocabularies[self.property_ns_entry.get_text()].NS_PREFIX
         return model.QName(self.property_ns_entry.get_text(), ns_prefix, self.property_name_entry.get_text())
@@ -86,21 +83,25 @@ class AddPropertyDialog(Gtk.Dialog):
     def get_blank_node(self):
         return self.blank_checkbox.get_active()
 
-    def on_ns_combo_changed(self, combo):
+    def set_term(self, term):
+        self.property_ns_entry.set_text(term.qname.ns_uri)
+        self.property_name_entry.set_text(term.qname.local_name)
+        self.property_label.set_text(u"{0} ({1})".format(term.label, term.qname.tag_name))
+
+    def on_search_changed(self, entry):
         self.property_store.clear()
-        ns = combo.get_model()[combo.get_active_iter()][0]
-        terms = vocab.get_terms(ns)
-        for term in terms:
-            self.property_store.append([term, term.label])
-        self.property_combo.set_active(0)
-
-    def on_property_combo_changed(self, combo):
-        if combo.get_model() and combo.get_active_iter():
-            ns_uri = combo.get_model()[combo.get_active_iter()][0].qname.ns_uri
-            self.property_ns_entry.set_text(ns_uri)
-
-            property_name = combo.get_model()[combo.get_active_iter()][0].qname.local_name
-            self.property_name_entry.set_text(property_name)
+        for term in vocab.search_terms(entry.get_text()):
+            self.property_store.append(
+                [term, u"{0} ({1})".format(term.label, term.qname.tag_name)])
+
+    def on_search_activate(self, entry):
+        # Pick the best match
+        tree_iter = self.property_store.get_iter_first()
+        if tree_iter is not None:
+            self.set_term(self.property_store[tree_iter][0])
+
+    def on_match_selected(self, completion, tree_model, tree_iter):
+        self.set_term(tree_model[tree_iter][0])
 
     def on_blank_node_toggled(self, button):
         self.value_entry.set_sensitive(not button.get_active())
\ No newline at end of file
@@ -0,0 +1,115 @@
+# Document - Documents open in the editor
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""The editor works on one of two kinds of documents:
+
+- ScannedDocument: only the rdf:RDF elements of the file are parsed,
+  each into its own DOM (see RDFMetadata.locate).  Saving copies the
+  rest of the file unchanged.
+
+- Document: the whole file is parsed into a single DOM.  Used when the
+  file can't be scanned.
+
+Both have the filename, a list of the rdf:RDF elements in rdfs, a
+compressed flag that is true for gzip-compressed files, and a
+snapshot() method.  It returns an object with a write(f) method that
+writes the uncompressed document as it was when snapshot() was
+called, and which can be called from any thread.  The result of
+write() should be passed to saved() once the file has been written.
+"""
+
+import os
+import codecs
+
+from RDFMetadata import locate, compression
+
+
+class Document(object):
+    def __init__(self, filename, dom, compressed = False):
+        self.filename = filename
+        self.dom = dom
+        self.rdfs = list(dom.getElementsByTagNameNS(locate.RDF_NS, 'RDF'))
+        self.compressed = compressed
+
+    def snapshot(self):
+        return _DOMSnapshot(self.dom.cloneNode(True))
+
+    def saved(self, filename, result, compressed):
+        self.filename = filename
+        self.compressed = compressed
+
+
+class ScannedDocument(object):
+    """locations is a list of locate.RDFLocation, and rdfs the
+    corresponding parsed elements.  For compressed files the locations
+    are offsets in the decompressed data.
+    """
+
+    def __init__(self, filename, locations, rdfs, compressed = False):
+        self.filename = filename
+        self.locations = locations
+        self.rdfs = rdfs
+        self.compressed = compressed
+        self.stamp = file_stamp(filename)
+
+    def snapshot(self):
+        return _SpliceSnapshot(
+            self.filename, self.stamp, self.compressed,
+            [(loc.start, loc.end, locate.serialize_element(rdf, loc.encoding))
+             for loc, rdf in zip(self.locations, self.rdfs)])
+
+    def saved(self, filename, ranges, compressed):
+        # The elements have moved in the new file
+        for loc, (start, end) in zip(self.locations, ranges):
+            loc.start = start
+            loc.end = end
+
+        self.filename = filename
+        self.compressed = compressed
+        self.stamp = file_stamp(filename)
+
+
+def file_stamp(f):
+    """Return something that changes when the file (a file object or
+    name) is changed.
+    """
+
+    if isinstance(f, basestring):
+        st = os.stat(f)
+    else:
+        st = os.fstat(f.fileno())
+    return (st.st_size, st.st_mtime)
+
+
+class _DOMSnapshot(object):
+    def __init__(self, dom):
+        self.dom = dom
+
+    def write(self, f):
+        self.dom.writexml(codecs.getwriter('utf-8')(f), encoding = 'utf-8')
+
+
+class _SpliceSnapshot(object):
+    def __init__(self, source, stamp, compressed, replacements):
+        self.source = source
+        self.stamp = stamp
+        self.compressed = compressed
+        self.replacements = replacements
+
+    def write(self, f):
+        with open(self.source, 'rb') as src:
+            # Everything but the rdf:RDF elements is copied from the
+            # file, so it must not have changed
+            if file_stamp(src) != self.stamp:
+                raise IOError('{0} has been changed since it was opened'.format(
+                        self.source))
+
+            if self.compressed:
+                src = compression.reader(src)
+
+            return locate.splice(src, f, self.replacements)
@@ -0,0 +1,178 @@
+# DocumentLoader - Load documents in a worker thread
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+import os
+import time
+import threading
+from xml.dom import minidom
+from xml.parsers import expat
+
+from gi.repository import GLib
+
+from RDFMetadata import locate, compression
+from editor.Document import Document, ScannedDocument
+
+# Don't flood the main loop with progress reports
+PROGRESS_INTERVAL = 0.1
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+class DocumentLoader(threading.Thread):
+    """Find and parse the rdf:RDF elements of a document in a worker
+    thread.  The elements are not parsed into models, that is left
+    until they are shown.
+
+    The file is first scanned with RDFMetadata.locate, so only the
+    rdf:RDF elements are parsed into DOMs.  If it can't be scanned, the
+    whole file is parsed instead.  Gzip-compressed files are
+    decompressed as they are read.
+
+    The callbacks are called from the main loop, with the loader as
+    the first argument:
+
+    - progress(loader, bytes_read, total_bytes)
+    - finished(loader): the result is in loader.document (see
+      editor.Document), and loader.rdfs is a list of the rdf:RDF
+      elements in document order
+    - failed(loader, error): error is the exception that stopped loading
+
+    No callbacks are called after cancel().  The DOM is not touched by
+    the loader once finished has been called.
+    """
+
+    def __init__(self, filename, progress, finished, failed):
+        super(DocumentLoader, self).__init__(name = 'DocumentLoader')
+        self.daemon = True
+
+        self.filename = filename
+        self.progress = progress
+        self.finished = finished
+        self.failed = failed
+
+        self.document = None
+        self.rdfs = None
+
+        self._cancelled = threading.Event()
+        self._last_report = 0
+        self._bytes_read = 0
+        self._total_bytes = 0
+
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+
+    def run(self):
+        try:
+            document = self._load()
+        except LoadCancelled:
+            return
+        except Exception as e:
+            self._call(self.failed, e)
+            return
+
+        self.document = document
+        self.rdfs = document.rdfs
+        self._call(self.finished)
+
+
+    def _load(self):
+        self._total_bytes = os.path.getsize(self.filename)
+
+        with open(self.filename, 'rb') as raw:
+            compressed = compression.is_compressed(raw)
+
+            f = _ProgressFile(raw, self)
+            if compressed:
+                # Seeking back restarts the decompression, so this
+                # reads the file once to scan it, once to find the
+                # element ends and once to parse the elements
+                f = compression.reader(f)
+
+            try:
+                document = self._scan(f, compressed)
+            except (locate.UnsupportedEncoding, expat.ExpatError):
+                # Parsing the elements on their own fails e.g. if they
+                # use entities declared in the DTD
+                f.seek(0)
+                self._bytes_read = 0
+                document = Document(self.filename, minidom.parse(f),
+                                    compressed = compressed)
+
+        self._report(force = True)
+
+        if self.is_cancelled():
+            raise LoadCancelled()
+
+        return document
+
+
+    def _scan(self, f, compressed):
+        locations = locate.find_rdf(f)
+
+        rdfs = []
+        for location in locations:
+            if self.is_cancelled():
+                raise LoadCancelled()
+            rdfs.append(locate.parse_location(f, location))
+
+        return ScannedDocument(self.filename, locations, rdfs,
+                               compressed = compressed)
+
+
+    def _read_to(self, pos):
+        if self.is_cancelled():
+            raise LoadCancelled()
+
+        # Progress is how far into the file it has got, even if it
+        # has to go back and read parts of it again
+        if pos > self._bytes_read:
+            self._bytes_read = pos
+            self._report()
+
+    def _report(self, force = False):
+        now = time.time()
+        if force or now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            self._call(self.progress, self._bytes_read, self._total_bytes)
+
+
+    def _call(self, func, *args):
+        GLib.idle_add(self._dispatch, func, args)
+
+    def _dispatch(self, func, args):
+        if not self.is_cancelled():
+            func(self, *args)
+
+        # Don't call again
+        return False
+
+
+class _ProgressFile(object):
+    """Wrap a file to tell the loader how far it has been read."""
+
+    def __init__(self, f, loader):
+        self.f = f
+        self.loader = loader
+
+    def read(self, size = -1):
+        data = self.f.read(size)
+        self.loader._read_to(self.f.tell())
+        return data
+
+    def tell(self):
+        return self.f.tell()
+
+    def seek(self, offset, whence = 0):
+        self.f.seek(offset, whence)
@@ -0,0 +1,200 @@
+# DocumentSaver - Save documents in a worker thread
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+import os
+import stat
+import time
+import tempfile
+import threading
+
+from gi.repository import GLib
+
+from RDFMetadata import compression
+
+# Don't flood the main loop with progress reports
+PROGRESS_INTERVAL = 0.1
+
+WRITE_BUFFER_SIZE = 256 * 1024
+
+# os.umask() can only be read by setting it, so do that before there
+# are any other threads
+_umask = os.umask(0)
+os.umask(_umask)
+
+
+class SaveCancelled(Exception):
+    pass
+
+
+class DocumentSaver(threading.Thread):
+    """Write a document snapshot (see editor.Document) to a file in a
+    worker thread.  The document itself can be changed while it is
+    being saved.  The file is replaced atomically once all of the
+    snapshot has been written, see write_document().
+
+    If compress_level is set, the file is gzip-compressed with that
+    level as it is written.
+
+    When finished, the result of the snapshot write() is in result.
+
+    The callbacks are called from the main loop, with the saver as
+    the first argument:
+
+    - progress(saver, bytes_written)
+    - finished(saver)
+    - failed(saver, error): error is the exception that stopped saving
+
+    No callbacks are called after cancel(), and the file is left as it
+    was unless it has already been replaced.
+    """
+
+    def __init__(self, snapshot, filename, progress, finished, failed,
+                 compress_level = None):
+        super(DocumentSaver, self).__init__(name = 'DocumentSaver')
+
+        # Not a daemon thread, so that a save in progress is completed
+        # before the program exits
+
+        self.filename = filename
+        self.progress = progress
+        self.finished = finished
+        self.failed = failed
+        self.compress_level = compress_level
+
+        self.snapshot = snapshot
+        self.result = None
+
+        self._cancelled = threading.Event()
+        self._last_report = 0
+        self._bytes_written = 0
+
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+
+    def run(self):
+        try:
+            self.result = write_document(
+                self.snapshot, self.filename,
+                wrap_file = lambda f: _ProgressFile(f, self),
+                compress_level = self.compress_level)
+        except SaveCancelled:
+            return
+        except Exception as e:
+            self._call(self.failed, e)
+            return
+
+        self._call(self.finished)
+
+
+    def _write(self, count):
+        if self.is_cancelled():
+            raise SaveCancelled()
+
+        self._bytes_written += count
+        now = time.time()
+        if now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            self._call(self.progress, self._bytes_written)
+
+
+    def _call(self, func, *args):
+        GLib.idle_add(self._dispatch, func, args)
+
+    def _dispatch(self, func, args):
+        if not self.is_cancelled():
+            func(self, *args)
+
+        # Don't call again
+        return False
+
+
+def write_document(snapshot, filename, wrap_file = None, compress_level = None):
+    """Write a document snapshot to filename, returning the result of
+    the snapshot write() method.
+
+    The XML is written to a temporary file in the same directory,
+    which is synced to disk and then renamed to filename.  If anything
+    goes wrong the temporary file is removed, and any existing file is
+    left untouched.
+
+    If wrap_file is set, it is called with the file object and should
+    return a file-like object to write to.  If compress_level is set,
+    the output is gzip-compressed with that level.
+    """
+
+    path = os.path.abspath(filename)
+    directory, basename = os.path.split(path)
+
+    fd, tmp_path = tempfile.mkstemp(dir = directory, prefix = '.' + basename,
+                                    suffix = '.tmp')
+    try:
+        with os.fdopen(fd, 'wb', WRITE_BUFFER_SIZE) as f:
+            out = f if wrap_file is None else wrap_file(f)
+            if compress_level is None:
+                result = snapshot.write(out)
+            else:
+                with compression.writer(out, compress_level) as gz:
+                    result = snapshot.write(gz)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.chmod(tmp_path, _file_mode(path))
+        os.rename(tmp_path, path)
+    except Exception:
+        _remove_file(tmp_path)
+        raise
+
+    # Make the rename itself durable
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+    return result
+
+
+def _file_mode(path):
+    """Return the permissions for a saved file: those of the existing
+    file, or the default for new files.
+    """
+
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_umask
+
+
+def _remove_file(path):
+    # In a function of its own, so that a failure doesn't replace the
+    # exception being handled by the caller
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class _ProgressFile(object):
+    """Wrap a file to tell the saver how much has been written."""
+
+    def __init__(self, f, saver):
+        self.f = f
+        self.saver = saver
+
+    def write(self, data):
+        self.saver._write(len(data))
+        self.f.write(data)
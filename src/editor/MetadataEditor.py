@@ -6,50 +6,74 @@
 #
 # Distributed under an GPLv2 license, please see LICENSE in the top dir.
 
-import sys, os.path
-from gi.repository import Gtk
-from gi.repository.GdkPixbuf import Pixbuf
+from gi.repository import Gtk, GLib
 
 from RDFMetadata import model
 from RDFMetadata import vocab
+from RDFMetadata.journal import Journal
 
-editor_dir = os.path.dirname(os.path.realpath(sys.argv[0]))
+from editor import icons
+from editor.RDFTreeModel import RDFTreeModel
 
-icon_resource = Pixbuf.new_from_file(os.path.join(editor_dir, 'icons', 'resource.svg'))
-icon_resource_ref = Pixbuf.new_from_file(os.path.join(editor_dir, 'icons', 'resource_ref.svg'))
-icon_blank = Pixbuf.new_from_file(os.path.join(editor_dir, 'icons', 'blank.svg'))
-icon_blank_ref = Pixbuf.new_from_file(os.path.join(editor_dir, 'icons', 'blank_ref.svg'))
-icon_literal = Pixbuf.new_from_file(os.path.join(editor_dir, 'icons', 'literal.svg'))
+# Icon names for the row types
+row_type_icons = {
+    'Resource': 'resource',
+    'Literal': 'literal',
+    'Resource ref': 'resource_ref',
+    'Blank node': 'blank',
+    'Blank node ref': 'blank_ref',
+}
 
 
+# Display labels for property QNames, shared by all editors.  None
+# means that the property isn't in any vocabulary.
+property_labels = {}
+property_labels_generation = None
+
+def get_property_label(qname):
+    global property_labels_generation
+
+    if property_labels_generation != vocab.generation:
+        property_labels.clear()
+        property_labels_generation = vocab.generation
+
+    try:
+        return property_labels[qname]
+    except KeyError:
+        pass
+
+    term = vocab.find_term(qname.ns_uri, qname.local_name)
+    if term is None:
+        label = None
+    else:
+        label = "{0}:{1}".format(term.qname.ns_prefix, term.label)
+
+    property_labels[qname] = label
+    return label
+
 def property_name_data_func(column, cell, tree_model, iter, user_data):
-    uri = tree_model[iter][0].uri
+    obj = tree_model[iter][0]
+    if obj is None:
+        return
+
+    uri = obj.uri
     if isinstance(uri, model.QName):
-        try:
-            term = vocab.get_term(uri.ns_uri, uri.local_name)
-            prefix = term.qname.ns_prefix
-            cell.set_property('text', "{0}:{1}".format(prefix, term.label))
-        except LookupError:
-            pass
+        label = get_property_label(uri)
+        if label is not None:
+            cell.set_property('text', label)
 
 def type_icon_data_func(column, cell, tree_model, iter, user_data):
     property_type = tree_model[iter][3]
-    if property_type == 'Resource':
-        pixbuf = icon_resource
-    elif property_type == 'Literal':
-        pixbuf = icon_literal
-    elif property_type == 'Resource ref':
-        pixbuf = icon_resource_ref
-    elif property_type == 'Blank node':
-        pixbuf = icon_blank
-    elif property_type == 'Blank node ref':
-        pixbuf = icon_blank_ref
-    else:
-        assert "shouldn't be reached"
+    pixbuf = icons.get_pixbuf(row_type_icons[property_type])
     cell.set_property('pixbuf', pixbuf)
 
+# How many rows to show expanded, at most, when opening a document
+# and when expanding all rows
+INITIAL_EXPAND_LIMIT = 500
+EXPAND_ALL_LIMIT = 10000
+
 class MetadataEditor(object):
-    def __init__(self, root, app):
+    def __init__(self, root, app, journal = None):
         self.widget = Gtk.ScrolledWindow(shadow_type = Gtk.ShadowType.IN)
 
         self.root = root
@@ -57,16 +81,23 @@ class MetadataEditor(object):
 
         self.root.register_observer(self._model_observer)
 
-        # Tree store columns:
-        # 0: model.RDFNode object, 1: property, 2: value, 3: row type
-        self.tree_store = Gtk.TreeStore(object, str, str, str)
+        # The journal may outlive the editor, if owned by the caller
+        self.own_journal = journal is None
+        if self.own_journal:
+            journal = Journal(root)
+        self.journal = journal
+        self.journal.register_observer(self._journal_observer)
 
-        self.added_to_tree_store = set()
+        # Tree model columns:
+        # 0: model.RDFNode object, 1: property, 2: value, 3: row type
+        self.tree_model = RDFTreeModel(root)
 
-        self._populate_tree_store(root)
+        # Model events are applied to the tree when idle
+        self.pending_events = []
+        self.flush_source = None
 
         # Set up display of the tree
-        self.tree_view = Gtk.TreeView(self.tree_store)
+        self.tree_view = Gtk.TreeView(self.tree_model)
 
         column = Gtk.TreeViewColumn("Property")
 
@@ -79,7 +110,6 @@ class MetadataEditor(object):
         column.pack_start(render, True)
         column.set_attributes(render, text=1)
         
-        column.set_sort_column_id(1)
         self.tree_view.append_column(column)
         column.set_cell_data_func(render, property_name_data_func)
 
@@ -88,7 +118,7 @@ class MetadataEditor(object):
         column = Gtk.TreeViewColumn("Value", render, text = 2)
         self.tree_view.append_column(column)
 
-        self.tree_view.expand_all()
+        self.expand_rows(INITIAL_EXPAND_LIMIT)
 
         self.tree_view.get_selection().connect(
             'changed', self._on_tree_selection_changed)
@@ -96,6 +126,24 @@ class MetadataEditor(object):
         
         self.widget.add(self.tree_view)
 
+    def close(self):
+        """Stop listening to the model and journal, and destroy the
+        widget.  The editor can't be used after this.
+        """
+
+        self.root.unregister_observer(self._model_observer)
+        self.journal.unregister_observer(self._journal_observer)
+        if self.own_journal:
+            self.journal.close()
+
+        if self.flush_source is not None:
+            GLib.source_remove(self.flush_source)
+            self.flush_source = None
+        self.pending_events = []
+
+        self.widget.destroy()
+
+
     # used by app.update_ui()
     def add_enabled(self):
         tree_model, tree_iter = self.tree_view.get_selection().get_selected()
@@ -117,107 +165,44 @@ class MetadataEditor(object):
 
         return isinstance(obj, model.Predicate) 
 
+    def expand_rows(self, limit):
+        """Expand rows breadth first, until about limit rows are shown.
+        """
 
-    def _populate_tree_store(self, root):
-        # Always start with the default resource, if it exists
-        res = root.get("")
-        if res:
-            self._add_resource_to_tree(res)
-
-        # Add the rest
-        for res in root.itervalues():
-            if res.uri != "":
-                self._add_resource_to_tree(res)
-
-    def _add_resource_to_tree(self, res, pos = None):
-        if res.uri:
-            label = str(res.uri)
-        else:
-            label = '(default)'
-
-        # Don't add resource nodes with no properties to the list
-        if res.predicates:
-            res_iter = self.tree_store.append(None, [res, label, '', 'Resource'])
-
-            # Add the predicates and their target objects
-            for pred in res:
-                self._add_predicate_to_tree(pred, res_iter)
-
-            return res_iter
-        else:
-            return None
-    
-
-    def _add_predicate_to_tree(self, pred, parent):
-        if isinstance(pred.object, model.LiteralNode):
-            i = self.tree_store.append(
-                parent,
-                [pred, str(pred.uri), str(pred.object.value), 'Literal'])
-
-        elif isinstance(pred.object, model.ResourceNode):
-            i = self.tree_store.append(
-                parent,
-                [pred, str(pred.uri), str(pred.object.uri), 'Resource ref'])
-
-        elif isinstance(pred.object, model.BlankNode):
-            node = pred.object
-
-            if node in self.added_to_tree_store:
-                # Only external IDs should be possible to add more than once
-                assert node.uri.external
-
-                # Just add reference second time around
-                i = self.tree_store.append(
-                    parent,
-                    [pred, str(pred.uri), str(node.uri), 'Blank node ref'])
-            else:
-                self.added_to_tree_store.add(node)
-
-                if node.uri.external:
-                    uri = str(node.uri)
-                else:
-                    uri = ''
-
-                i = self.tree_store.append(
-                    parent,
-                    [pred, str(pred.uri), uri, 'Blank node'])
-
-                # Add the predicates and their target objects
-                for node_pred in node:
-                    self._add_predicate_to_tree(node_pred, i)
-
-        return i
-
-    def _lookup_tree_object(self, obj, start_iter = None):
-        if start_iter is None:
-            i = self.tree_store.get_iter_first()
-        else:
-            i = start_iter
-
+        queue = []
+        i = self.tree_model.get_iter_first()
         while i is not None:
-            o = self.tree_store[i][0]
-            if (o is obj or
-                (isinstance(o, model.Predicate)
-                 and o.object is obj
-                 and isinstance(obj, model.BlankNode))):
-                return i
+            queue.append(i)
+            i = self.tree_model.iter_next(i)
 
-            if self.tree_store.iter_has_child(i):
-                o = self._lookup_tree_object(obj, self.tree_store.iter_children(i))
-                if o is not None:
-                    return o
+        shown = len(queue)
+        pos = 0
+        while pos < len(queue) and shown < limit:
+            i = queue[pos]
+            pos += 1
 
-            i = self.tree_store.iter_next(i)
+            if not self.tree_model.iter_has_child(i):
+                continue
 
-        return None
+            self.tree_view.expand_row(self.tree_model.get_path(i), False)
+
+            child = self.tree_model.iter_children(i)
+            while child is not None:
+                queue.append(child)
+                shown += 1
+                child = self.tree_model.iter_next(child)
 
 
     def _on_tree_selection_changed(self, selection):
+        self.journal.checkpoint()
+        self.app.update_ui()
+
+    def _journal_observer(self, event):
         self.app.update_ui()
 
     def _on_value_edited(self, render, path, text):
-        i = self.tree_store.get_iter(path)
-        node = self.tree_store[i][0]
+        i = self.tree_model.get_iter(path)
+        node = self.tree_model[i][0]
 
         if isinstance(node, model.Predicate):
             obj = node.object
@@ -226,77 +211,83 @@ class MetadataEditor(object):
 
 
     def _model_observer(self, event):
-        if isinstance(event, model.PredicateAdded):
-            tree_iter = self._lookup_tree_object(event.node)
-            if tree_iter:
-                i = self._add_predicate_to_tree(event.predicate, tree_iter)
+        # Queue the event, so that a burst of events (e.g. from
+        # editing a literal or undoing a transaction) results in a
+        # single update of the tree
+        self.pending_events.append(event)
+        if self.flush_source is None:
+            self.flush_source = GLib.idle_add(self._flush_model_events)
+
+
+    def _flush_model_events(self):
+        self.flush_source = None
+
+        events = coalesce_model_events(self.pending_events)
+        self.pending_events = []
+
+        self.tree_model.update(events)
+
+        # Show new resources and blank nodes, and select the latest
+        # added predicate
+        added = None
+        for event in events:
+            if isinstance(event, model.PredicateAdded):
+                added = event
+            elif isinstance(event, model.ResourceNodeAdded):
+                self._expand_object(event.node)
+            elif isinstance(event, model.PredicateObjectChanged):
+                if isinstance(event.predicate.object, model.BlankNode):
+                    self._expand_object(event.predicate.object)
+
+        if added is not None:
+            i = self.tree_model.find_iter(added.predicate, added.node)
+            if i is not None:
+                parent = self.tree_model.iter_parent(i)
+                self.tree_view.expand_to_path(self.tree_model.get_path(parent))
                 self.tree_view.get_selection().select_iter(i)
 
-        elif isinstance(event, model.PredicateObjectChanged):
-            tree_iter = self._lookup_tree_object(event.predicate)
-            if tree_iter:
-                self._update_predicate(tree_iter, event.predicate)
+        # Don't call again
+        return False
+
 
+    def _expand_object(self, obj):
+        i = self.tree_model.find_iter(obj)
+        if i is not None and self.tree_model.iter_has_child(i):
+            self.tree_view.expand_row(self.tree_model.get_path(i), False)
+
+
+def coalesce_model_events(events):
+    """Return the events that must be applied to the tree, in order,
+    to bring it up to date after all of EVENTS.
+
+    Since the rows are updated from the current state of the model,
+    only the first PredicateObjectChanged for each predicate is kept.
+    Predicates that were both added and removed are ignored entirely.
+    """
+
+    added = set()
+    removed = set()
+    for event in events:
+        if isinstance(event, model.PredicateAdded):
+            added.add(event.predicate)
         elif isinstance(event, model.PredicateRemoved):
-            tree_iter = self._lookup_tree_object(event.predicate)
-            if tree_iter:
-                # TODO: if there's still subrows here for an inlined
-                # blank node, they should be moved to another
-                # reference of the blank node.  Unlikely to happen,
-                # though.
-                self.tree_store.remove(tree_iter)
-
-        elif isinstance(event, model.ResourceNodeRemoved):
-            tree_iter = self._lookup_tree_object(event.node)
-            if tree_iter:
-                self.tree_store.remove(tree_iter)
-                
-        elif isinstance(event, model.ResourceNodeAdded):
-            tree_iter = self._add_resource_to_tree(event.node)
-
-            # Show the new node
-            if tree_iter is not None:
-                path = self.tree_store.get_path(tree_iter)
-                self.tree_view.expand_row(path, True)
-
-        # Blank nodes are added by reference from a predicate, and removed
-        # from the predicate they belong to
-
-
-    def _update_predicate(self, tree_iter, predicate):
-        if isinstance(predicate.object, model.LiteralNode):
-            self.tree_store[tree_iter][2] = predicate.object.value
-            self.tree_store[tree_iter][3] = 'Literal'
-
-        elif isinstance(predicate.object, model.ResourceNode):
-            self.tree_store[tree_iter][2] = str(predicate.object.uri)
-            self.tree_store[tree_iter][3] = 'Resource ref'
-
-        elif isinstance(predicate.object, model.BlankNode):
-            node = predicate.object
-            if node in self.added_to_tree_store:
-                # Only external IDs should be possible to add more than once
-                assert node.uri.external
-
-                # Just set a reference
-                self.tree_store[tree_iter][2] = str(node.uri)
-                self.tree_store[tree_iter][3] = 'Blank node ref'
-
-            else:
-                self.added_to_tree_store.add(node)
-
-                if node.uri.external:
-                    uri = str(node.uri)
-                else:
-                    uri = ''
-
-                self.tree_store[tree_iter][2] = uri
-                self.tree_store[tree_iter][3] = 'Blank node'
-
-                # Add the predicates and their target objects
-                for node_pred in node:
-                    self._add_predicate_to_tree(node_pred, tree_iter)
-
-                # Show the new node
-                path = self.tree_store.get_path(tree_iter)
-                self.tree_view.expand_row(path, True)
+            removed.add(event.predicate)
+
+    ignored = added & removed
+    changed = set()
+    result = []
+
+    for event in events:
+        pred = getattr(event, 'predicate', None)
+        if pred is not None:
+            if pred in ignored:
+                continue
+
+            if isinstance(event, model.PredicateObjectChanged):
+                if pred in changed or pred in removed:
+                    continue
+                changed.add(pred)
+
+        result.append(event)
+
+    return result
@@ -0,0 +1,490 @@
+# RDFTreeModel - Gtk.TreeModel reading its rows from a model.Root
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""A tree model that gets the row values straight from the model
+objects, instead of copying them into a Gtk.TreeStore.
+
+The top-level rows are the resource nodes that have any predicates,
+with their predicates as child rows.  A predicate referring to a blank
+node has the predicates of that node as child rows, unless the node is
+already shown below another predicate.
+
+Rows are only created when the view asks for them, and the rows below
+a node are dropped again when the view no longer shows them (e.g. when
+the node is collapsed).
+"""
+
+from gi.repository import GObject, Gtk
+
+from RDFMetadata import model
+
+# Columns
+COLUMN_OBJECT = 0    # model.ResourceNode or model.Predicate
+COLUMN_PROPERTY = 1
+COLUMN_VALUE = 2
+COLUMN_TYPE = 3      # Row type, e.g. 'Resource' or 'Literal'
+
+column_types = (GObject.TYPE_PYOBJECT, str, str, str)
+
+
+class _Row(object):
+    """A row that has been asked for by the view.
+
+    obj is a ResourceNode for top-level rows and a Predicate for the
+    rows below them.  inlined is the BlankNode shown below a predicate
+    row, if any.  children is None until the child rows are needed.
+
+    has_child is what the view was last told about the row having
+    children, and refs is the number of references the view holds to
+    the row.
+    """
+
+    __slots__ = ('id', 'obj', 'parent', 'index', 'children', 'inlined',
+                 'has_child', 'refs', 'child_refs')
+
+    def __init__(self, row_id, obj, parent):
+        self.id = row_id
+        self.obj = obj
+        self.parent = parent
+        self.index = 0
+        self.children = None
+        self.inlined = None
+        self.has_child = False
+        self.refs = 0
+        self.child_refs = 0
+
+
+class RDFTreeModel(GObject.GObject, Gtk.TreeModel):
+    __gtype_name__ = 'RDFTreeModel'
+
+    def __init__(self, root):
+        GObject.GObject.__init__(self)
+
+        self.root = root
+        self.stamp = 0x52444621
+
+        # Row IDs are never reused, so iters to dropped rows are
+        # detected rather than referring to another row
+        self._next_id = 1
+        self._rows = {}
+
+        # Map from ResourceNode and Predicate objects to their rows,
+        # and from BlankNode objects to the row they are shown below
+        self._obj_rows = {}
+        self._inlining_rows = {}
+
+        # Invisible parent of the top-level rows
+        self._top = _Row(0, None, None)
+
+
+    #
+    # Updating from the model
+    #
+
+    def update(self, events):
+        """Bring the rows up to date with the current state of the
+        model, after the model events in the list events.
+        """
+
+        top_changed = False
+        subjects = set()
+        predicates = set()
+
+        for event in events:
+            if isinstance(event, (model.ResourceNodeAdded, model.ResourceNodeRemoved)):
+                top_changed = True
+
+            elif isinstance(event, (model.PredicateAdded, model.PredicateRemoved)):
+                subjects.add(event.node)
+
+                # Resource nodes are only shown if they have predicates
+                if isinstance(event.node, model.ResourceNode):
+                    top_changed = True
+
+            elif isinstance(event, model.PredicateObjectChanged):
+                predicates.add(event.predicate)
+
+        if top_changed:
+            self._sync_children(self._top)
+
+        for pred in predicates:
+            row = self._obj_rows.get(pred)
+            if row is not None:
+                self._update_inlined(row)
+                self.row_changed(self._path(row), self._iter(row))
+                self._sync_children(row)
+
+        for node in subjects:
+            row = self._subject_row(node)
+            if row is not None:
+                self._sync_children(row)
+
+
+    def find_iter(self, obj, subject = None):
+        """Return an iter for the row of obj, which can be a
+        ResourceNode, a Predicate or an inlined BlankNode, or None if
+        there is no such row.
+
+        If obj is a predicate of subject, its row is created if the
+        row of subject exists.
+        """
+
+        if isinstance(obj, model.BlankNode):
+            row = self._inlining_rows.get(obj)
+        else:
+            row = self._obj_rows.get(obj)
+
+        if row is None and subject is not None:
+            parent = self._subject_row(subject)
+            if parent is not None:
+                for child in self._get_children(parent):
+                    if child.obj is obj:
+                        row = child
+                        break
+
+        if row is None:
+            return None
+        return self._iter(row)
+
+
+    def _sync_children(self, row):
+        """Update the child rows of row to match the model, telling
+        the view about the changes.
+        """
+
+        if row.children is not None:
+            wanted = self._child_objects(row)
+            wanted_set = set(wanted)
+            children = row.children
+
+            for i in range(len(children) - 1, -1, -1):
+                if children[i].obj not in wanted_set:
+                    self._delete_child(row, i)
+
+            for i, obj in enumerate(wanted):
+                if i < len(children) and children[i].obj is obj:
+                    continue
+
+                # Moved rows are removed and added again
+                for j in range(i + 1, len(children)):
+                    if children[j].obj is obj:
+                        self._delete_child(row, j)
+                        break
+
+                child = self._new_row(obj, row)
+                children.insert(i, child)
+                _renumber(children, i)
+
+                path = self._path(child)
+                tree_iter = self._iter(child)
+                self.row_inserted(path, tree_iter)
+                if child.has_child:
+                    self.row_has_child_toggled(path, tree_iter)
+
+        if row is not self._top:
+            has_child = self._has_child(row)
+            if has_child != row.has_child:
+                row.has_child = has_child
+                self.row_has_child_toggled(self._path(row), self._iter(row))
+
+
+    def _delete_child(self, row, index):
+        child = row.children[index]
+        path = self._path(child)
+
+        del row.children[index]
+        _renumber(row.children, index)
+        row.child_refs -= child.refs
+        self._drop_row(child)
+
+        self.row_deleted(path)
+
+
+    #
+    # Rows
+    #
+
+    def _new_row(self, obj, parent):
+        row = _Row(self._next_id, obj, parent)
+        self._next_id += 1
+
+        self._rows[row.id] = row
+        self._obj_rows[obj] = row
+        if isinstance(obj, model.Predicate):
+            self._update_inlined(row)
+
+        row.has_child = self._has_child(row)
+        return row
+
+
+    def _drop_row(self, row):
+        if row.children is not None:
+            for child in row.children:
+                self._drop_row(child)
+            row.children = None
+
+        del self._rows[row.id]
+        if self._obj_rows.get(row.obj) is row:
+            del self._obj_rows[row.obj]
+        if row.inlined is not None:
+            del self._inlining_rows[row.inlined]
+            row.inlined = None
+
+
+    def _update_inlined(self, row):
+        """Show the blank node object of a predicate row below it, if
+        it isn't already shown somewhere else.
+        """
+
+        node = row.obj.object
+        if row.inlined is node:
+            return
+
+        if row.inlined is not None:
+            del self._inlining_rows[row.inlined]
+            row.inlined = None
+
+        if isinstance(node, model.BlankNode):
+            other = self._inlining_rows.get(node)
+            if other is None or other.obj.object is not node:
+                if other is not None:
+                    other.inlined = None
+                self._inlining_rows[node] = row
+                row.inlined = node
+
+
+    def _subject_row(self, node):
+        """Return the row that has the predicates of node as children."""
+
+        if isinstance(node, model.BlankNode):
+            return self._inlining_rows.get(node)
+        else:
+            return self._obj_rows.get(node)
+
+
+    def _child_objects(self, row):
+        if row is self._top:
+            # New resources are added after the existing ones
+            resources = self.root.resource_nodes
+            objs = []
+            if row.children is not None:
+                for child in row.children:
+                    res = child.obj
+                    if resources.get(res.uri) is res and res.predicates:
+                        objs.append(res)
+
+            # Always start with the default resource, if it exists
+            res = resources.get('')
+            if res is not None and res.predicates and res not in objs:
+                objs.append(res)
+
+            shown = set(objs)
+            for res in resources.itervalues():
+                if res.uri != '' and res.predicates and res not in shown:
+                    objs.append(res)
+
+            return objs
+
+        if isinstance(row.obj, model.ResourceNode):
+            return list(row.obj)
+
+        if row.inlined is not None:
+            return list(row.inlined)
+
+        return []
+
+
+    def _get_children(self, row):
+        if row.children is None:
+            row.children = [self._new_row(obj, row)
+                            for obj in self._child_objects(row)]
+            _renumber(row.children, 0)
+        return row.children
+
+
+    def _has_child(self, row):
+        if row.children is not None:
+            return bool(row.children)
+
+        if isinstance(row.obj, model.ResourceNode):
+            return bool(row.obj.predicates)
+
+        return row.inlined is not None and bool(row.inlined.predicates)
+
+
+    def _release_children(self, row):
+        """Drop the child rows of row, which are no longer shown."""
+
+        if row.children is not None:
+            for child in row.children:
+                self._drop_row(child)
+            row.children = None
+            row.child_refs = 0
+
+
+    def _iter(self, row):
+        tree_iter = Gtk.TreeIter()
+        tree_iter.stamp = self.stamp
+        tree_iter.user_data = row.id
+        return tree_iter
+
+    def _row(self, tree_iter):
+        if tree_iter is None:
+            return self._top
+        return self._rows[tree_iter.user_data]
+
+    def _path(self, row):
+        indices = []
+        while row is not self._top:
+            indices.append(row.index)
+            row = row.parent
+        indices.reverse()
+        return Gtk.TreePath(indices)
+
+
+    def _value(self, row, column):
+        obj = row.obj
+
+        if column == COLUMN_OBJECT:
+            return obj
+
+        if isinstance(obj, model.ResourceNode):
+            if column == COLUMN_PROPERTY:
+                if obj.uri:
+                    return str(obj.uri)
+                else:
+                    return '(default)'
+            elif column == COLUMN_VALUE:
+                return ''
+            else:
+                return 'Resource'
+
+        if column == COLUMN_PROPERTY:
+            return str(obj.uri)
+
+        node = obj.object
+        if isinstance(node, model.LiteralNode):
+            value, row_type = node.value, 'Literal'
+
+        elif isinstance(node, model.ResourceNode):
+            value, row_type = str(node.uri), 'Resource ref'
+
+        elif row.inlined is node:
+            if node.uri.external:
+                value = str(node.uri)
+            else:
+                value = ''
+            row_type = 'Blank node'
+
+        else:
+            value, row_type = str(node.uri), 'Blank node ref'
+
+        if column == COLUMN_VALUE:
+            return value
+        else:
+            return row_type
+
+
+    #
+    # Gtk.TreeModel interface
+    #
+
+    def do_get_flags(self):
+        return 0
+
+    def do_get_n_columns(self):
+        return len(column_types)
+
+    def do_get_column_type(self, index):
+        return column_types[index]
+
+    def do_get_iter(self, path):
+        row = self._top
+        for index in path.get_indices():
+            children = self._get_children(row)
+            if index >= len(children):
+                return (False, None)
+            row = children[index]
+
+        if row is self._top:
+            return (False, None)
+        return (True, self._iter(row))
+
+    def do_get_path(self, tree_iter):
+        return self._path(self._row(tree_iter))
+
+    def do_get_value(self, tree_iter, column):
+        return self._value(self._row(tree_iter), column)
+
+    def do_iter_next(self, tree_iter):
+        row = self._row(tree_iter)
+        siblings = row.parent.children
+        if row.index + 1 < len(siblings):
+            tree_iter.user_data = siblings[row.index + 1].id
+            return True
+        else:
+            return False
+
+    def do_iter_previous(self, tree_iter):
+        row = self._row(tree_iter)
+        if row.index > 0:
+            tree_iter.user_data = row.parent.children[row.index - 1].id
+            return True
+        else:
+            return False
+
+    def do_iter_children(self, parent):
+        return self.do_iter_nth_child(parent, 0)
+
+    def do_iter_has_child(self, tree_iter):
+        return self._has_child(self._row(tree_iter))
+
+    def do_iter_n_children(self, tree_iter):
+        row = self._row(tree_iter)
+        if row is not self._top and not self._has_child(row):
+            return 0
+        return len(self._get_children(row))
+
+    def do_iter_nth_child(self, parent, n):
+        row = self._row(parent)
+        if row is not self._top and not self._has_child(row):
+            return (False, None)
+
+        children = self._get_children(row)
+        if n < len(children):
+            return (True, self._iter(children[n]))
+        else:
+            return (False, None)
+
+    def do_iter_parent(self, child):
+        parent = self._row(child).parent
+        if parent is self._top:
+            return (False, None)
+        return (True, self._iter(parent))
+
+    def do_ref_node(self, tree_iter):
+        row = self._rows.get(tree_iter.user_data)
+        if row is not None:
+            row.refs += 1
+            row.parent.child_refs += 1
+
+    def do_unref_node(self, tree_iter):
+        row = self._rows.get(tree_iter.user_data)
+        if row is not None:
+            row.refs -= 1
+            parent = row.parent
+            parent.child_refs -= 1
+
+            # The view has let go of all rows on this level
+            if parent.child_refs == 0 and parent is not self._top:
+                self._release_children(parent)
+
+
+def _renumber(rows, start):
+    for i in range(start, len(rows)):
+        rows[i].index = i
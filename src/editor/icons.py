@@ -0,0 +1,85 @@
+# icons - Lazily loaded icons for the editor
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+"""The editor icons are SVG files, which are slow to render.  They
+are only loaded when first used, and the rendered pixbufs are saved
+as PNG files in a cache directory for the next time the editor is
+started.
+"""
+
+import sys
+import os
+import hashlib
+import tempfile
+
+from gi.repository import GLib
+from gi.repository.GdkPixbuf import Pixbuf
+
+icon_dir = os.path.join(os.path.dirname(os.path.realpath(sys.argv[0])), 'icons')
+
+# Rendered icons are kept here, or not at all if set to None
+cache_dir = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+    'rdfmetadata', 'icons')
+
+_pixbufs = {}
+
+def get_pixbuf(name):
+    """Return the Pixbuf for the icon name (e.g. 'resource')."""
+
+    try:
+        return _pixbufs[name]
+    except KeyError:
+        pixbuf = _pixbufs[name] = _load(os.path.join(icon_dir, name + '.svg'))
+        return pixbuf
+
+
+def _load(path):
+    if cache_dir is None:
+        return Pixbuf.new_from_file(path)
+
+    # The cache file name changes whenever the SVG file does
+    st = os.stat(path)
+    stamp = '{0}\n{1}\n{2}'.format(path, st.st_mtime, st.st_size)
+    cache_path = os.path.join(
+        cache_dir, hashlib.sha1(stamp.encode('utf-8')).hexdigest() + '.png')
+
+    try:
+        return Pixbuf.new_from_file(cache_path)
+    except GLib.GError:
+        pass
+
+    pixbuf = Pixbuf.new_from_file(path)
+
+    # Write atomically, so another editor never reads a partial file
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+        fd, tmp_path = tempfile.mkstemp(dir = cache_dir, suffix = '.tmp')
+        os.close(fd)
+        try:
+            pixbuf.savev(tmp_path, 'png', [], [])
+            os.rename(tmp_path, cache_path)
+        except Exception:
+            _remove_file(tmp_path)
+            raise
+    except (EnvironmentError, GLib.GError):
+        # Not cached, but the icon is still usable
+        pass
+
+    return pixbuf
+
+
+def _remove_file(path):
+    # In a function of its own, so that a failure doesn't replace the
+    # exception being handled by the caller
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
@@ -10,18 +10,17 @@
 # Distributed under an GPLv2 license, please see LICENSE in the top dir.
 
 
-import sys, argparse
-from gi.repository import Gtk
+import sys, os, argparse, collections
+from gi.repository import Gtk, GObject
 
-from RDFMetadata import parser
-from RDFMetadata import model
+from RDFMetadata import model, parser, namespaces, compression, vocab
+from RDFMetadata.journal import Journal
 
-from editor.MetadataEditor import MetadataEditor
+from editor.MetadataEditor import MetadataEditor, EXPAND_ALL_LIMIT
 from editor.AddPropertyDialog import AddPropertyDialog
+from editor.DocumentLoader import DocumentLoader
+from editor.DocumentSaver import DocumentSaver
 
-
-# Temporary: move into proper file loaders
-from xml.dom import minidom
 import xml.parsers.expat
 
 ui_info = \
@@ -35,6 +34,9 @@ ui_info = \
       <menuitem action='Quit'/>
     </menu>
     <menu action='EditMenu'>
+      <menuitem action='Undo'/>
+      <menuitem action='Redo'/>
+      <separator/>
       <menuitem action='AddProperty'/>
       <menuitem action='RemoveProperty'/>
     </menu>
@@ -43,6 +45,9 @@ ui_info = \
     <toolitem action='FileOpen'/>
     <toolitem action='FileSave'/>
     <separator/>
+    <toolitem action='Undo'/>
+    <toolitem action='Redo'/>
+    <separator/>
     <toolitem action='ExpandAll'/>
     <toolitem action='CollapseAll'/>
     <separator/>
@@ -51,10 +56,15 @@ ui_info = \
   </toolbar>
 </ui>'''
 
+# How many editor pages to keep around for rdf:RDF elements that
+# aren't shown.  Their models and undo history are kept even when the
+# page is dropped.
+MAX_EDITOR_PAGES = 8
+
 class MainWindow(Gtk.Window):
     __gtype_name__ = "MainWindow"
 
-    def __init__(self):
+    def __init__(self, compress_level = compression.DEFAULT_LEVEL):
         super(MainWindow, self).__init__(title = 'RDF Metadata Editor')
 
         action_entries = [
@@ -76,6 +86,14 @@ class MainWindow(Gtk.Window):
              "_Quit", "<control>Q",
              "Quit",
              self.on_quit),
+            ("Undo", Gtk.STOCK_UNDO,
+             "_Undo", "<control>Z",
+             "Undo",
+             self.on_undo),
+            ("Redo", Gtk.STOCK_REDO,
+             "_Redo", "<control><shift>Z",
+             "Redo",
+             self.on_redo),
             ("ExpandAll", Gtk.STOCK_ZOOM_IN,
              "_Expand all", None,
              "Expand All",
@@ -111,14 +129,25 @@ class MainWindow(Gtk.Window):
         toolbar = menu_manager.get_widget("/Toolbar")
         vbox.pack_start(toolbar, False, False, 0)
 
+        # Shown while a document is loading or saving
+        self.load_bar = Gtk.InfoBar()
+        self.load_bar.add_button(Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL)
+        self.load_bar.connect('response', self._on_load_bar_response)
+        load_box = self.load_bar.get_content_area()
+        self.load_label = Gtk.Label(xalign=0)
+        load_box.pack_start(self.load_label, False, False, 0)
+        self.load_progress = Gtk.ProgressBar(show_text=True)
+        load_box.pack_start(self.load_progress, True, True, 0)
+        vbox.pack_start(self.load_bar, False, False, 0)
+
         self.paned = Gtk.Paned.new(Gtk.Orientation.HORIZONTAL)        
         vbox.add(self.paned)
 
-        # Liststore columns: editor, page, Name to be displayed, Tooltip string
-        self.node_store = Gtk.ListStore(object, int, str)
+        # Liststore columns: rdf:RDF element, Name to be displayed
+        self.node_store = Gtk.ListStore(object, str)
         self.node_view = Gtk.TreeView(model=self.node_store)
 
-        column = Gtk.TreeViewColumn("SVG Nodes", Gtk.CellRendererText(), text=2)
+        column = Gtk.TreeViewColumn("SVG Nodes", Gtk.CellRendererText(), text=1)
         self.node_view.append_column(column)
         self.node_view.get_selection().connect('changed', self._on_node_view_selection_changed)
 
@@ -130,11 +159,23 @@ class MainWindow(Gtk.Window):
         self.paned.add2(self.notebook)
 
         vbox.show_all()
+        self.load_bar.hide()
         self.set_default_size(800, 600)
         self.paned.set_position(200)
 
         self.filename = None
-        self.doc = None
+        self.document = None
+        self.compress_level = compress_level
+        self.loader = None
+        self.saver = None
+
+        # rdf:RDF elements are parsed when first shown.  Map from
+        # element to (model.Root, Journal).
+        self.models = {}
+
+        # Editors for the parsed elements, least recently shown first
+        self.editors = collections.OrderedDict()
+
         self.update_ui()
     
     # hacked to return self.node_view selection in the process of moving to Gtk.Notebook
@@ -142,72 +183,163 @@ class MainWindow(Gtk.Window):
     def _get_active_editor(self):
         tree_model, tree_iter = self.node_view.get_selection().get_selected()
         if tree_iter:
-            return tree_model[tree_iter][0]
+            return self.editors.get(tree_model[tree_iter][0])
         return None
 
+    def _get_model(self, rdf):
+        """Return (model.Root, Journal) for an rdf:RDF element,
+        parsing it if necessary.
+        """
+        try:
+            return self.models[rdf]
+        except KeyError:
+            root = parser.parse_RDFXML(doc = rdf.ownerDocument, root_element = rdf)
+            entry = self.models[rdf] = (root, Journal(root))
+            return entry
+
+    def _show_editor(self, rdf):
+        """Show the editor page for an rdf:RDF element, creating it if
+        necessary.  Pages that haven't been shown for a while are
+        dropped.
+        """
+        try:
+            editor = self.editors.pop(rdf)
+        except KeyError:
+            root, journal = self._get_model(rdf)
+            editor = MetadataEditor(root, self, journal = journal)
+            self.notebook.append_page(editor.widget, tab_label=None)
+            editor.widget.show_all()
+
+        # Most recently shown last
+        self.editors[rdf] = editor
+        self.notebook.set_current_page(self.notebook.page_num(editor.widget))
+
+        while len(self.editors) > MAX_EDITOR_PAGES:
+            old_rdf, old_editor = self.editors.popitem(last = False)
+            self._close_editor(old_editor)
+
+    def _close_editor(self, editor):
+        self.notebook.remove_page(self.notebook.page_num(editor.widget))
+        editor.close()
+
+    def _close_document(self):
+        for editor in self.editors.values():
+            self._close_editor(editor)
+        self.editors.clear()
+
+        for root, journal in self.models.values():
+            journal.close()
+        self.models.clear()
+
+        self.node_store.clear()
+
     # enable/disable certain actions depending on the document state
     def update_ui(self):
-        self.actions.get_action("AddProperty").set_sensitive(self.doc is not None)
-        self.actions.get_action("FileSaveAs").set_sensitive(self.doc is not None)
-        self.actions.get_action("FileSave").set_sensitive(self.filename is not None)
+        # Only one file operation at a time
+        idle = self.loader is None and self.saver is None
+
+        self.actions.get_action("AddProperty").set_sensitive(self.document is not None)
+        self.actions.get_action("FileOpen").set_sensitive(idle)
+        self.actions.get_action("FileSaveAs").set_sensitive(idle and self.document is not None)
+        self.actions.get_action("FileSave").set_sensitive(idle and self.filename is not None)
 
         editor = self._get_active_editor()
         if editor:
             self.actions.get_action("AddProperty").set_sensitive(editor.add_enabled())
             self.actions.get_action("RemoveProperty").set_sensitive(editor.remove_enabled())
+            self.actions.get_action("Undo").set_sensitive(editor.journal.can_undo())
+            self.actions.get_action("Redo").set_sensitive(editor.journal.can_redo())
         else:
             self.actions.get_action("AddProperty").set_sensitive(False)
             self.actions.get_action("RemoveProperty").set_sensitive(False)
+            self.actions.get_action("Undo").set_sensitive(False)
+            self.actions.get_action("Redo").set_sensitive(False)
 
             
+    def _show_error(self, text):
+        dialog = Gtk.MessageDialog(self, Gtk.DialogFlags.MODAL, Gtk.MessageType.ERROR,
+            Gtk.ButtonsType.OK, "Error")
+        dialog.format_secondary_text(text)
+        dialog.run()
+        dialog.destroy()
+
     def load_file(self, filename):
-        try:
-            doc = minidom.parse(filename)
-            # Use whatever rdf:RDF elements there is
-            rdfs = doc.getElementsByTagNameNS("http://www.w3.org/1999/02/22-rdf-syntax-ns#", 'RDF')
-        except xml.parsers.expat.ExpatError, e:
-            dialog = Gtk.MessageDialog(self, Gtk.DialogFlags.MODAL, Gtk.MessageType.ERROR,
-                Gtk.ButtonsType.OK, "Error")
-            dialog.format_secondary_text(str(e))
-            dialog.run()
-            dialog.destroy()
-            return
+        """Start loading a file in the background.  The current
+        document is kept until the new one has been loaded.
+        """
 
-        if not rdfs:
-            dialog = Gtk.MessageDialog(self, Gtk.DialogFlags.MODAL, Gtk.MessageType.ERROR,
-                Gtk.ButtonsType.OK, "Error")
-            dialog.format_secondary_text("No RDFs found.")
-            dialog.run()
-            dialog.destroy()
-            return
+        self.cancel_load()
 
-        self.node_store.clear()
-        for i in range(self.notebook.get_n_pages()):
-            self.notebook.remove_page(i)
+        self.loader = DocumentLoader(filename,
+                                     progress = self._on_load_progress,
+                                     finished = self._on_load_finished,
+                                     failed = self._on_load_failed)
+
+        self.load_label.set_text("Loading {0}".format(os.path.basename(filename)))
+        self.load_progress.set_fraction(0)
+        self.load_progress.set_text('')
+        self.load_bar.show()
 
-        self.doc = doc
-        self.filename = filename
-        for i, rdf in enumerate(rdfs):
-            model_root = parser.parse_RDFXML(doc=doc, root_element=rdf)
-            metadata_editor = MetadataEditor(model_root, self)
-            page = self.notebook.append_page(metadata_editor.widget, tab_label=None)
+        self.loader.start()
+        self.update_ui()
+
+    def cancel_load(self):
+        if self.loader:
+            self.loader.cancel()
+            self.loader = None
+            self.load_bar.hide()
+            self.update_ui()
+
+    def _on_load_bar_response(self, info_bar, response):
+        if response == Gtk.ResponseType.CANCEL:
+            self.cancel_load()
+            self.cancel_save()
+
+    def _on_load_progress(self, loader, bytes_read, total_bytes):
+        if total_bytes:
+            self.load_progress.set_fraction(float(bytes_read) / total_bytes)
+            self.load_progress.set_text("{0} of {1} kB".format(
+                    bytes_read // 1024, total_bytes // 1024))
+
+    def _on_load_failed(self, loader, error):
+        self.loader = None
+        self.load_bar.hide()
+        self.update_ui()
 
+        if isinstance(error, (xml.parsers.expat.ExpatError, EnvironmentError)):
+            self._show_error(str(error))
+        else:
+            raise error
+
+    def _on_load_finished(self, loader):
+        self.loader = None
+        self.load_bar.hide()
+
+        if not loader.rdfs:
+            self._show_error("No RDFs found.")
+            self.update_ui()
+            return
+
+        self._close_document()
+
+        self.document = loader.document
+        self.filename = loader.filename
+        for rdf in loader.rdfs:
             # get parentNode twice as rdfs are found under the /object/metadata/rdf path
             actual_node = rdf.parentNode.parentNode
             actual_id = actual_node.getAttribute('id')
-            self.node_store.append([metadata_editor, page,
+            self.node_store.append([rdf,
                 "{1} ({0})".format(actual_node.localName, actual_id)])
-            metadata_editor.widget.show_all()
 
-        # select first item, for _get_active_editor
+        # select first item, which creates its editor
         self.node_view.get_selection().select_iter(self.node_store.get_iter_first())
         self.update_ui()
 
     def _on_node_view_selection_changed(self, selection):
         tree_model, tree_iter = selection.get_selected()
         if tree_iter:
-            page = tree_model[tree_iter][1]
-            self.notebook.set_current_page(page)
+            self._show_editor(tree_model[tree_iter][0])
+        self.update_ui()
 
 
     def on_file_open(self, action):
@@ -222,10 +354,76 @@ class MainWindow(Gtk.Window):
             self.load_file(dialog.get_filename())
         dialog.destroy()
 
+    def _consolidate_namespaces(self):
+        for row in self.node_store:
+            rdf = row[0]
+            if rdf in self.models:
+                root, journal = self.models[rdf]
+                with journal.transaction('Consolidate Namespaces'):
+                    root.repr.consolidate_namespaces()
+            else:
+                # Not parsed, so there is no model or undo history to update
+                namespaces.consolidate(rdf)
+
+    def save_file(self, filename):
+        """Start saving the document to filename in the background.
+        Changes made after this are not included in the saved file.
+        """
+
+        self._consolidate_namespaces()
+
+        # Keep compressed files compressed, and compress new .svgz files
+        if (compression.is_compressed_name(filename)
+            or (filename == self.document.filename and self.document.compressed)):
+            compress_level = self.compress_level
+        else:
+            compress_level = None
+
+        self.saver = DocumentSaver(self.document.snapshot(), filename,
+                                   progress = self._on_save_progress,
+                                   finished = self._on_save_finished,
+                                   failed = self._on_save_failed,
+                                   compress_level = compress_level)
+
+        self.load_label.set_text("Saving {0}".format(os.path.basename(filename)))
+        self.load_progress.set_fraction(0)
+        self.load_progress.set_text('')
+        self.load_bar.show()
+
+        self.saver.start()
+        self.update_ui()
+
+    def cancel_save(self):
+        if self.saver:
+            self.saver.cancel()
+            self.saver = None
+            self.load_bar.hide()
+            self.update_ui()
+
+    def _on_save_progress(self, saver, bytes_written):
+        self.load_progress.pulse()
+        self.load_progress.set_text("{0} kB".format(bytes_written // 1024))
+
+    def _on_save_failed(self, saver, error):
+        self.saver = None
+        self.load_bar.hide()
+        self.update_ui()
+
+        if isinstance(error, EnvironmentError):
+            self._show_error(str(error))
+        else:
+            raise error
+
+    def _on_save_finished(self, saver):
+        self.saver = None
+        self.load_bar.hide()
+        self.document.saved(saver.filename, saver.result,
+                            saver.compress_level is not None)
+        self.filename = saver.filename
+        self.update_ui()
+
     def on_file_save(self, action):
-        f = open(self.filename,"wb")
-        self.doc.writexml(f)
-        f.close()
+        self.save_file(self.filename)
 
     def on_file_save_as(self, action):
         dialog = Gtk.FileChooserDialog(title="Save File",
@@ -236,16 +434,13 @@ class MainWindow(Gtk.Window):
         response = dialog.run()
         #filename = dialog.get_filename()
         if response == Gtk.ResponseType.OK:
-            f = open(dialog.get_filename(),"wb")
-            self.doc.writexml(f)
-            f.close()
-            self.filename = dialog.get_filename()
+            self.save_file(dialog.get_filename())
         dialog.destroy()
 
     def on_expand_all(self, action):
         editor = self._get_active_editor()
         if editor:
-            editor.tree_view.expand_all()
+            editor.expand_rows(EXPAND_ALL_LIMIT)
 
     def on_collapse_all(self, action):
         editor = self._get_active_editor()
@@ -265,7 +460,7 @@ class MainWindow(Gtk.Window):
             tree_model, tree_iter = editor.tree_view.get_selection().get_selected()
             assert tree_iter is not None
 
-            obj = editor.tree_store[tree_iter][0]
+            obj = editor.tree_model[tree_iter][0]
 
             if isinstance(obj, model.SubjectNode):
                 pass
@@ -276,13 +471,14 @@ class MainWindow(Gtk.Window):
                 assert False, 'attempting to add property to a non-SubjectNode'
 
             # Make sure the row is expanded
-            path = editor.tree_store.get_path(tree_iter)
+            path = editor.tree_model.get_path(tree_iter)
             editor.tree_view.expand_row(path, False)
 
-            if dialog.get_blank_node():
-                obj.add_predicate_blank(dialog.get_property())
-            else:
-                obj.add_predicate_literal(dialog.get_property(), dialog.get_value(), None)
+            with editor.journal.transaction('Add Property'):
+                if dialog.get_blank_node():
+                    obj.add_predicate_blank(dialog.get_property())
+                else:
+                    obj.add_predicate_literal(dialog.get_property(), dialog.get_value(), None)
         dialog.destroy()
             
 
@@ -294,22 +490,47 @@ class MainWindow(Gtk.Window):
         tree_model, tree_iter = editor.tree_view.get_selection().get_selected()
         assert tree_iter is not None
 
-        obj = editor.tree_store[tree_iter][0]
-        obj.remove()
+        obj = editor.tree_model[tree_iter][0]
+        with editor.journal.transaction('Remove Property'):
+            obj.remove()
+
+    def on_undo(self, action):
+        editor = self._get_active_editor()
+        if editor and editor.journal.can_undo():
+            editor.journal.undo()
+
+    def on_redo(self, action):
+        editor = self._get_active_editor()
+        if editor and editor.journal.can_redo():
+            editor.journal.redo()
         
 
     def on_quit(self, action):
+        self.cancel_load()
         self.destroy()
 
     def do_destroy(self, *args):
         Gtk.main_quit()
 
 if __name__ == '__main__':
+    # Needed for the document loader thread with older PyGObject
+    GObject.threads_init()
+
     argparser = argparse.ArgumentParser()
     argparser.add_argument('input_file', nargs='?')
+    argparser.add_argument('--compress-level', type = int,
+                           default = compression.DEFAULT_LEVEL,
+                           choices = range(1, 10), metavar = '1-9',
+                           help = 'gzip level when saving compressed files '
+                           '(default: {0})'.format(compression.DEFAULT_LEVEL))
     args = argparser.parse_args()
 
-    win = MainWindow()
+    # Keep the vocabularies compiled between runs
+    vocab.cache_dir = os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+        'rdfmetadata', 'vocab')
+
+    win = MainWindow(compress_level = args.compress_level)
     win.show()
 
     if args.input_file:
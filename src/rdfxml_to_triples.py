@@ -1,6 +1,6 @@
 #!/usr/bin/python
 
-# rdfxml_to_triples - Parse RDF/XML on stdin and output N-Triples
+# rdfxml_to_triples - Parse RDF/XML and output N-Triples
 #
 # Copyright 2013 Commons Machinery http://commonsmachinery.se/
 #
@@ -8,31 +8,148 @@
 #
 # Distributed under an GPLv2 license, please see LICENSE in the top dir.
 
-import sys
-from RDFMetadata import parser
+import sys, argparse, itertools
+from RDFMetadata import parser, locate, compression
+from RDFMetadata.cache import ParseCache
 
 #from RDFMetadata import observer
 #observer.global_observer = observer.log_observer
 
 from xml.dom import minidom
+from xml.parsers import expat
 
 def main():
-    doc = minidom.parse(sys.stdin)
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('input_file', nargs = '?',
+                           help = 'file to read instead of stdin.  Both '
+                           'may be gzip-compressed (e.g. .svgz)')
+    argparser.add_argument('--cache-dir',
+                           help = 'reuse parsed graphs from this directory')
+    argparser.add_argument('--cache-size', type = int, default = 64,
+                           help = 'maximum cache size in MB (default: 64)')
+    args = argparser.parse_args()
 
-    # Use whatever rdf:RDF elements there is
-    rdfs = doc.getElementsByTagNameNS("http://www.w3.org/1999/02/22-rdf-syntax-ns#", 'RDF')
+    cache = None
+    if args.cache_dir:
+        cache = ParseCache(args.cache_dir, args.cache_size * 1024 * 1024)
 
-    if not rdfs:
-        sys.exit('no RDF found')
+    if args.input_file:
+        with open(args.input_file, 'rb') as f:
+            graphs = parse_file(f, cache)
+    elif is_seekable(sys.stdin):
+        graphs = parse_file(sys.stdin, cache)
+    else:
+        graphs = parse_stream(read_stdin(), cache)
 
-    for rdf in rdfs:
-        sys.stdout.write('### {0}\n\n'.format(get_element_path(rdf)))
-        root = parser.parse_RDFXML(doc = doc, root_element = rdf)
+    if not graphs:
+        sys.exit('no RDF found')
 
+    for path, root in graphs:
+        sys.stdout.write('### {0}\n\n'.format(path))
         sys.stdout.write(str(root))
         sys.stdout.write('\n')
 
 
+def is_seekable(f):
+    try:
+        f.seek(0, 1)
+        return True
+    except IOError:
+        return False
+
+
+def parse_file(f, cache):
+    """Return the graphs in the seekable binary file f, which may be
+    compressed, using cache if it isn't None.
+    """
+
+    if compression.is_compressed(f):
+        f = compression.reader(f)
+
+    if cache is None:
+        return parse_graphs(find_elements(f))
+
+    key = cache.file_key(f)
+    graphs = cache.get(key)
+    if graphs is None:
+        f.seek(0)
+        graphs = parse_graphs(find_elements(f))
+        cache.put(key, graphs)
+    return graphs
+
+
+def parse_stream(chunks, cache):
+    """Return the graphs in the document read from chunks, an iterable
+    of strings, using cache if it isn't None.
+
+    The data can only be read once, so the rdf:RDF elements are always
+    parsed into DOMs.  The cache only saves building the models.
+    """
+
+    key_hash = ParseCache.content_hash()
+
+    def hash_chunks():
+        for data in chunks:
+            key_hash.update(data)
+            yield data
+
+    try:
+        rdfs = [rdf for location, rdf in locate.read_rdf(hash_chunks())]
+    except (locate.UnsupportedEncoding, expat.ExpatError) as e:
+        # The fallback of parsing the whole document needs all of it
+        sys.exit('cannot read the RDF from a pipe: {0}\n'
+                 'Try giving the file as an argument instead.'.format(e))
+
+    if cache is None:
+        return parse_graphs(rdfs)
+
+    key = key_hash.hexdigest()
+    graphs = cache.get(key)
+    if graphs is None:
+        graphs = parse_graphs(rdfs)
+        cache.put(key, graphs)
+    return graphs
+
+
+def read_stdin():
+    """Generate the data on stdin, which can be a pipe, decompressing
+    it if necessary.  Only a chunk at a time is held in memory.
+    """
+
+    chunks = iter(lambda: sys.stdin.read(compression.READ_SIZE), b'')
+    first = next(chunks, b'')
+    chunks = itertools.chain([first], chunks)
+
+    if first.startswith(compression.GZIP_MAGIC):
+        chunks = compression.decompress_stream(chunks)
+
+    return chunks
+
+
+def find_elements(f):
+    """Return the rdf:RDF elements in the seekable binary file f."""
+
+    # Only parse the rdf:RDF elements into DOMs, unless the document
+    # can't be handled that way
+    try:
+        return [locate.parse_location(f, loc) for loc in locate.find_rdf(f)]
+    except (locate.UnsupportedEncoding, expat.ExpatError):
+        f.seek(0)
+        doc = minidom.parse(f)
+        return doc.getElementsByTagNameNS(locate.RDF_NS, 'RDF')
+
+
+def parse_graphs(rdfs):
+    """Return a list of (element path, read-only model.Root) for each
+    of the rdf:RDF elements rdfs.
+    """
+
+    return [(get_element_path(rdf),
+             parser.parse_RDFXML(doc = rdf.ownerDocument, root_element = rdf,
+                                 read_only = True))
+            for rdf in rdfs]
+
+
 def get_element_path(element):
     if element.nodeType != element.ELEMENT_NODE:
         return ''
@@ -0,0 +1,71 @@
+#!/usr/bin/python
+
+# xmp_to_triples - Output the XMP metadata of media files as N-Triples
+#
+# Copyright 2013 Commons Machinery http://commonsmachinery.se/
+#
+# Authors: Peter Liljenberg <peter@commonsmachinery.se>
+#
+# Distributed under an GPLv2 license, please see LICENSE in the top dir.
+
+import os, sys, argparse
+from RDFMetadata import xmp
+
+from xml.parsers import expat
+
+def main():
+    argparser = argparse.ArgumentParser(
+        description = 'Find the XMP packets in JPEG, PNG, TIFF, PDF or '
+        'other files, and output their RDF as N-Triples.')
+    argparser.add_argument('paths', nargs = '+', metavar = 'PATH',
+                           help = 'file, or directory to search recursively')
+    argparser.add_argument('-l', '--list', action = 'store_true',
+                           help = 'only list the packets, without parsing them')
+    args = argparser.parse_args()
+
+    errors = 0
+    for filename in iter_files(args.paths):
+        try:
+            with xmp.mapped(filename) as buf:
+                for packet in xmp.find_packets(buf):
+                    if args.list:
+                        list_packet(filename, packet)
+                    else:
+                        output_packet(filename, packet,
+                                      xmp.parse_packet(buf, packet))
+
+        except (EnvironmentError, expat.ExpatError) as e:
+            sys.stderr.write('{0}: {1}\n'.format(filename, e))
+            errors += 1
+
+    if errors:
+        sys.exit(1)
+
+
+def iter_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    yield os.path.join(dirpath, filename)
+        else:
+            yield path
+
+
+def list_packet(filename, packet):
+    sys.stdout.write('{0}\t{1}\t{2}\t{3}\t{4}\n'.format(
+            filename, packet.start, packet.end - packet.start,
+            packet.padding_end - packet.content_end,
+            'w' if packet.writable else 'r'))
+
+
+def output_packet(filename, packet, roots):
+    for root in roots:
+        sys.stdout.write('### {0}@{1}\n\n'.format(filename, packet.start))
+        sys.stdout.write(str(root))
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()